@@ -2,26 +2,122 @@
 import logging
 
 from pathlib import Path
+import voluptuous as vol
 from homeassistant.components.http import StaticPathConfig
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.const import (
+    ATTR_LATITUDE,
+    ATTR_LONGITUDE,
+    CONF_ENTITY_ID,
+    EVENT_HOMEASSISTANT_STOP,
+    Platform,
+)
+from homeassistant.core import (
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
 import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN, CONF_MASSIF, CONF_TOKEN
-from .coordinator import MeteoFranceMontagneDataUpdateCoordinator
+from .const import (
+    DOMAIN,
+    CONF_MASSIF,
+    CONF_TOKEN,
+    CONF_LOCAL_IMAGES,
+    CONF_TOKEN_POOL,
+    CONF_HISTORY_RETENTION,
+    DEFAULT_HISTORY_RETENTION,
+    MAX_HISTORY_RETENTION,
+    CONF_PARSE_PROFILE,
+    CONF_PARSE_SECTIONS,
+    DEFAULT_PARSE_PROFILE,
+    PARSE_PROFILES,
+    PARSE_SECTIONS,
+    ARCHIVE_FILENAME,
+    IMAGE_SPILL_DIR,
+    IMPORT_BATCH_SIZE,
+    SERVICE_IMPORT_BULLETINS,
+    SERVICE_QUERY_HISTORY,
+    QUERY_HISTORY_MAX_LIMIT,
+    SERVICE_LOOKUP_MASSIF,
+    EVENT_IMPORT_PROGRESS,
+)
+from .api import async_get_massif_index
+from .archive import AGGREGATIONS, METRICS, ArchiveRecorder, BulletinArchive
+from .coordinator import MassifRegistry
+from .entity import StateWriter
+from .history import HistoryStore
+from .image_store import ImageStore
+from .importer import import_bulletins
+from .pool import TokenPool
+from .session import async_get_session
+from .variants import ImageVariantCache
+from .views import MeteoFranceMontagneImageView
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.IMAGE, Platform.SENSOR]
+PLATFORMS = [Platform.BINARY_SENSOR, Platform.IMAGE, Platform.SENSOR]
+# API configuration entries only have their connectivity sensor
+API_PLATFORMS = [Platform.BINARY_SENSOR]
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
+IMPORT_BULLETINS_SCHEMA = vol.Schema({
+    vol.Required("path"): cv.string,
+    vol.Optional("workers"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    vol.Optional("batch_size", default=IMPORT_BATCH_SIZE): vol.All(
+        vol.Coerce(int), vol.Range(min=1)),
+})
+
+QUERY_HISTORY_SCHEMA = vol.Schema({
+    vol.Optional("massif", default=[]): vol.All(cv.ensure_list, [cv.string]),
+    vol.Required("start"): cv.date,
+    vol.Required("end"): cv.date,
+    vol.Required("metric"): vol.In(list(METRICS)),
+    vol.Optional("aggregation", default="daily"): vol.In(list(AGGREGATIONS)),
+    vol.Optional("limit", default=100): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=QUERY_HISTORY_MAX_LIMIT)),
+    vol.Optional("offset", default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
+})
+
+LOOKUP_MASSIF_SCHEMA = vol.All(
+    vol.Schema({
+        vol.Optional(CONF_ENTITY_ID): cv.entity_id,
+        vol.Inclusive(ATTR_LATITUDE, "coordinates"): cv.latitude,
+        vol.Inclusive(ATTR_LONGITUDE, "coordinates"): cv.longitude,
+    }),
+    cv.has_at_most_one_key(CONF_ENTITY_ID, ATTR_LATITUDE),
+)
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Météo-France Montagne component."""
     hass.data.setdefault(DOMAIN, {})
+    hass.data[DOMAIN]["image_variants"] = ImageVariantCache(hass)
+    hass.data[DOMAIN]["image_entities"] = {}
+    hass.data[DOMAIN]["states"] = StateWriter(hass)
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, hass.data[DOMAIN]["states"].async_flush)
+    hass.data[DOMAIN]["tokens"] = TokenPool(hass, async_get_session(hass))
+
+    # Images of every massif, spilled to disk over the memory budget
+    images = ImageStore(hass, hass.config.path(IMAGE_SPILL_DIR))
+    await hass.async_add_executor_job(images.setup)
+    hass.data[DOMAIN]["images"] = images
+    hass.data[DOMAIN]["massifs"] = MassifRegistry(hass, hass.data[DOMAIN]["tokens"], images)
+
+    # Every bulletin received is archived, batched off the event loop
+    archive = BulletinArchive(hass.config.path(ARCHIVE_FILENAME))
+    await hass.async_add_executor_job(archive.open)
+    recorder = ArchiveRecorder(hass, archive)
+    hass.data[DOMAIN]["archive"] = recorder
+
+    async def async_close_archive(_event: Event) -> None:
+        await recorder.async_close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_close_archive)
 
     should_cache = True
     files_path: Path = Path(__file__).parent / "resources"
@@ -30,6 +126,94 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         StaticPathConfig("/api/meteofrance_montagne/resources",
                          str(files_path), should_cache),
     ])
+    hass.http.register_view(MeteoFranceMontagneImageView(hass))
+
+    async def async_import_bulletins(call: ServiceCall) -> None:
+        """Import archived bulletins in the background."""
+        path = call.data["path"]
+        if not hass.config.is_allowed_path(path):
+            raise ServiceValidationError(f"Path {path} is not allowed")
+
+        def progress(summary):
+            hass.bus.fire(EVENT_IMPORT_PROGRESS, {"path": path, **summary})
+
+        async def async_run_import():
+            summary = await hass.async_add_executor_job(
+                import_bulletins,
+                path,
+                hass.config.path(ARCHIVE_FILENAME),
+                call.data.get("workers"),
+                call.data["batch_size"],
+                progress,
+            )
+            _LOGGER.info("Bulletin import from %s finished: %s", path, summary)
+            hass.bus.async_fire(EVENT_IMPORT_PROGRESS, {"path": path, "done": True, **summary})
+
+        hass.async_create_background_task(
+            async_run_import(), f"{DOMAIN}_import_bulletins")
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_IMPORT_BULLETINS, async_import_bulletins,
+        schema=IMPORT_BULLETINS_SCHEMA)
+
+    async def async_query_history(call: ServiceCall) -> ServiceResponse:
+        """Query the bulletin archive."""
+        start, end = call.data["start"], call.data["end"]
+        if start > end:
+            raise ServiceValidationError("start must be before end")
+
+        # Make sure recently received bulletins are included
+        await recorder.async_flush()
+        result = await hass.async_add_executor_job(
+            archive.query_history,
+            call.data["massif"],
+            start.isoformat(),
+            end.isoformat(),
+            call.data["metric"],
+            call.data["aggregation"],
+            call.data["limit"],
+            call.data["offset"],
+        )
+        return {
+            "metric": call.data["metric"],
+            "aggregation": call.data["aggregation"],
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            **result,
+        }
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_QUERY_HISTORY, async_query_history,
+        schema=QUERY_HISTORY_SCHEMA, supports_response=SupportsResponse.ONLY)
+
+    async def async_lookup_massif(call: ServiceCall) -> ServiceResponse:
+        """Find the massif containing, or nearest to, a location."""
+        if entity_id := call.data.get(CONF_ENTITY_ID):
+            state = hass.states.get(entity_id)
+            if state is None or ATTR_LATITUDE not in state.attributes:
+                raise ServiceValidationError(f"{entity_id} has no location")
+            latitude = state.attributes[ATTR_LATITUDE]
+            longitude = state.attributes[ATTR_LONGITUDE]
+        else:
+            # Defaults to the home zone
+            latitude = call.data.get(ATTR_LATITUDE, hass.config.latitude)
+            longitude = call.data.get(ATTR_LONGITUDE, hass.config.longitude)
+
+        apis = hass.data[DOMAIN]["tokens"].candidates()
+        if not apis:
+            raise ServiceValidationError("No API token configured")
+        index = await async_get_massif_index(hass, apis[0])
+
+        massif = index.nearest(latitude, longitude)
+        return {
+            ATTR_LATITUDE: latitude,
+            ATTR_LONGITUDE: longitude,
+            "massif": massif,
+        }
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_LOOKUP_MASSIF, async_lookup_massif,
+        schema=LOOKUP_MASSIF_SCHEMA, supports_response=SupportsResponse.ONLY)
 
     return True
 
@@ -37,8 +221,9 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Météo-France Montagne from a config entry."""
 
-    # If this is an API configuration entry (parent), nothing to set up
+    # API configuration entry (parent): only its connectivity sensor
     if CONF_TOKEN in entry.data:
+        await hass.config_entries.async_forward_entry_setups(entry, API_PLATFORMS)
         return True
 
     # Get the token from the parent entry
@@ -52,33 +237,67 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _LOGGER.error("No token found in parent entry")
         return False
 
-    session = async_get_clientsession(hass)
-
-    coordinator = MeteoFranceMontagneDataUpdateCoordinator(
-        hass,
-        session,
+    # A massif configured under several API entries is fetched only once
+    coordinator = await hass.data[DOMAIN]["massifs"].async_subscribe(
+        entry.entry_id,
         entry.data[CONF_MASSIF],
         entry.data["massif_name"],
-        token
+        token,
+        entry.options.get(CONF_LOCAL_IMAGES, []),
+        _parse_sections(entry.options),
+        entry.options.get(CONF_TOKEN_POOL, False),
+        # Entries saved before the retention was capped may exceed it
+        min(entry.options.get(CONF_HISTORY_RETENTION, DEFAULT_HISTORY_RETENTION),
+            MAX_HISTORY_RETENTION),
     )
 
-    await coordinator.async_config_entry_first_refresh()
-
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     return True
 
 
+def _parse_sections(options) -> list[str] | None:
+    """Return the bulletin sections to parse for a massif (None for all)."""
+    profile = options.get(CONF_PARSE_PROFILE, DEFAULT_PARSE_PROFILE)
+    if profile == "custom":
+        return options.get(CONF_PARSE_SECTIONS, PARSE_SECTIONS)
+    return PARSE_PROFILES.get(profile)
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a massif entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the stored history of a massif no other entry uses."""
+    if CONF_TOKEN in entry.data:
+        return
+
+    massif_id = entry.data[CONF_MASSIF]
+    if any(
+        other.data.get(CONF_MASSIF) == massif_id
+        for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    ):
+        return
+    await HistoryStore(hass, massif_id).async_remove()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    # If this is an API configuration entry (parent), nothing to unload
+    # API configuration entry (parent): only its connectivity sensor
     if CONF_TOKEN in entry.data:
-        return True
+        return await hass.config_entries.async_unload_platforms(entry, API_PLATFORMS)
 
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        await hass.data[DOMAIN]["massifs"].async_unsubscribe(
+            entry.entry_id, entry.data[CONF_MASSIF])
 
     return unload_ok
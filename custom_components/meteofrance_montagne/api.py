@@ -1,33 +1,95 @@
 """API for Météo-France Montagne."""
 import aiohttp
 import asyncio
+import io
 import logging
-import json
+import ijson
 from lxml import etree
 
 
-from .const import TIMEOUT, BASE_URL
+from .const import DOMAIN, TIMEOUT, BASE_URL, HISTORY_SECTIONS
+from .geo import MassifIndex
+from .transport import SessionTransport
 
 from homeassistant.core import HomeAssistant
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class MeteoFranceMontagneApiError(Exception):
+    """HTTP error returned by the API."""
+
+    def __init__(self, message, status=None):
+        """Initialize the error with the HTTP status."""
+        super().__init__(message)
+        self.status = status
+
+
+class MeteoFranceMontagneAuthError(MeteoFranceMontagneApiError):
+    """Token rejected by the API (401)."""
+
+
+class MeteoFranceMontagneRateLimitError(MeteoFranceMontagneApiError):
+    """Token quota exceeded (429)."""
+
+
+async def _async_load_massifs(hass: HomeAssistant, api) -> dict:
+    """Fetch the massif list once per run, building both of its views.
+
+    The spatial index and the departments are built from the same download,
+    whichever is asked first, so the GeoJSON is neither fetched twice nor
+    kept in memory.
+    """
+    data = hass.data.setdefault(DOMAIN, {})
+    async with data.setdefault("massif_list_lock", asyncio.Lock()):
+        if "massif_index" not in data:
+            content = await api.massif_list()
+            data["massif_index"], data["massif_list"] = await asyncio.gather(
+                hass.async_add_executor_job(MassifIndex.from_geojson, content),
+                hass.async_add_executor_job(api.massifs_by_department, content),
+            )
+    return data
+
+
+async def async_get_massif_index(hass: HomeAssistant, api) -> MassifIndex:
+    """Return the massif spatial index, fetched and built once per run."""
+    return (await _async_load_massifs(hass, api))["massif_index"]
+
+
+async def async_get_massif_list(hass: HomeAssistant, api) -> dict:
+    """Return the massifs by department, fetched once per run."""
+    return (await _async_load_massifs(hass, api))["massif_list"]
+
+
 class MeteoFranceMontagneApi:
 
-    def __init__(self, session: aiohttp.ClientSession, hass: HomeAssistant, token: str):
-        """Initialize the API."""
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        hass: HomeAssistant,
+        token: str,
+        stats=None,
+        transport=None
+    ):
+        """Initialize the API.
+
+        stats, if given, is the token's TokenStats: requests then wait for
+        quota headroom and their outcome is recorded. transport sends the
+        requests, the session by default (see transport.py for cassettes).
+        """
         self.session = session
         self.hass = hass
         self.token = token
+        self.stats = stats
+        self.transport = transport or SessionTransport(session)
+        # Cleared once the API rejects HEAD requests
+        self._probe_head = True
 
-    def organize_by_department(self, json_data):
-        """Organize massifs by department."""
+    def organize_properties(self, properties_list):
+        """Organize massifs by department from their GeoJSON properties."""
         department_map = {}
 
-        for feature in json_data['features']:
-            properties = feature['properties']
-
+        for properties in properties_list:
             # Debug log if needed
             if not department_map:  # Log only for the first one
                 _LOGGER.debug("Properties keys: %s", list(properties.keys()))
@@ -53,10 +115,26 @@ class MeteoFranceMontagneApi:
 
         return department_map
 
-    def parse_bulletin_xml(self, xml_doc):
-        """Parse XML bulletin and convert to JSON structure."""
+    @staticmethod
+    def parse_bulletin_xml(xml_doc, sections=None):
+        """Parse XML bulletin and convert to JSON structure.
+
+        sections restricts parsing to a subset of PARSE_SECTIONS (None parses
+        everything). Skipped subtrees are never walked: current-day sections
+        keep their empty defaults and skipped history keys are left out.
+        """
         root = xml_doc
 
+        def wanted(section):
+            """Return True if a section must be parsed."""
+            return sections is None or section in sections
+
+        def find(parent, tag, section):
+            """Find a child element only if its section is wanted."""
+            if parent is None or not wanted(section):
+                return None
+            return parent.find(tag)
+
         def get_attr(element, attr, default=''):
             """Get attribute value or default."""
             value = element.get(attr, default)
@@ -77,8 +155,16 @@ class MeteoFranceMontagneApi:
                     return None
             return None
 
+        def to_bool_or_null(value):
+            """Convert 'true'/'false' to bool or None."""
+            if value == 'true':
+                return True
+            if value == 'false':
+                return False
+            return None
+
         # Parse CARTOUCHERISQUE
-        cartouche = root.find('CARTOUCHERISQUE')
+        cartouche = find(root, 'CARTOUCHERISQUE', 'risque')
         risque_elem = cartouche.find('RISQUE') if cartouche is not None else None
         pente_elem = cartouche.find('PENTE') if cartouche is not None else None
 
@@ -106,20 +192,20 @@ class MeteoFranceMontagneApi:
                 'commentaire': get_text(cartouche.find('CommentaireRisqueJ2')) if cartouche is not None else ''
             },
             'pentes_particulieres': {
-                'NE': to_int_or_null(get_attr(pente_elem, 'NE')) if pente_elem is not None else None,
-                'E': to_int_or_null(get_attr(pente_elem, 'E')) if pente_elem is not None else None,
-                'SE': to_int_or_null(get_attr(pente_elem, 'SE')) if pente_elem is not None else None,
-                'S': to_int_or_null(get_attr(pente_elem, 'S')) if pente_elem is not None else None,
-                'SW': to_int_or_null(get_attr(pente_elem, 'SW')) if pente_elem is not None else None,
-                'W': to_int_or_null(get_attr(pente_elem, 'W')) if pente_elem is not None else None,
-                'NW': to_int_or_null(get_attr(pente_elem, 'NW')) if pente_elem is not None else None,
-                'N': to_int_or_null(get_attr(pente_elem, 'N')) if pente_elem is not None else None,
+                'NE': to_bool_or_null(get_attr(pente_elem, 'NE')) if pente_elem is not None else None,
+                'E': to_bool_or_null(get_attr(pente_elem, 'E')) if pente_elem is not None else None,
+                'SE': to_bool_or_null(get_attr(pente_elem, 'SE')) if pente_elem is not None else None,
+                'S': to_bool_or_null(get_attr(pente_elem, 'S')) if pente_elem is not None else None,
+                'SW': to_bool_or_null(get_attr(pente_elem, 'SW')) if pente_elem is not None else None,
+                'W': to_bool_or_null(get_attr(pente_elem, 'W')) if pente_elem is not None else None,
+                'NW': to_bool_or_null(get_attr(pente_elem, 'NW')) if pente_elem is not None else None,
+                'N': to_bool_or_null(get_attr(pente_elem, 'N')) if pente_elem is not None else None,
                 'commentaire': get_attr(pente_elem, 'COMMENTAIRE') if pente_elem is not None else ''
             }
         }
 
         # Parse STABILITE
-        stabilite_elem = root.find('STABILITE')
+        stabilite_elem = find(root, 'STABILITE', 'stabilite')
         situations_avalancheuses = []
         if stabilite_elem is not None:
             sitaval = stabilite_elem.find('SitAvalTyp')
@@ -138,11 +224,11 @@ class MeteoFranceMontagneApi:
         }
 
         # Parse QUALITE
-        qualite_elem = root.find('QUALITE')
+        qualite_elem = find(root, 'QUALITE', 'qualite')
         qualite = get_text(qualite_elem.find('TEXTE')) if qualite_elem is not None else ''
 
         # Parse ENNEIGEMENT
-        enneigement_elem = root.find('ENNEIGEMENT')
+        enneigement_elem = find(root, 'ENNEIGEMENT', 'enneigement')
         niveaux = []
         if enneigement_elem is not None:
             for niveau in enneigement_elem.findall('NIVEAU'):
@@ -156,12 +242,11 @@ class MeteoFranceMontagneApi:
             'date': get_attr(enneigement_elem, 'DATE') if enneigement_elem is not None else '',
             'limite_sud': to_int_or_null(get_attr(enneigement_elem, 'LimiteSud')) if enneigement_elem is not None else None,
             'limite_nord': to_int_or_null(get_attr(enneigement_elem, 'LimiteNord')) if enneigement_elem is not None else None,
-            'niveaux': niveaux,
-            'historique': []  # Will be filled later from BSH
+            'niveaux': niveaux
         }
 
         # Parse NEIGEFRAICHE
-        neige_fraiche_elem = root.find('NEIGEFRAICHE')
+        neige_fraiche_elem = find(root, 'NEIGEFRAICHE', 'neige_fraiche')
         mesures = []
         if neige_fraiche_elem is not None:
             for neige24h in neige_fraiche_elem.findall('NEIGE24H'):
@@ -173,12 +258,11 @@ class MeteoFranceMontagneApi:
 
         neige_fraiche = {
             'altitude_ss': to_int_or_null(get_attr(neige_fraiche_elem, 'ALTITUDESS')) if neige_fraiche_elem is not None else None,
-            'mesures': mesures,
-            'historique': []  # Will be filled later from BSH
+            'mesures': mesures
         }
 
         # Parse METEO (prévisions)
-        meteo_elem = root.find('METEO')
+        meteo_elem = find(root, 'METEO', 'meteo')
         echeances = []
         if meteo_elem is not None:
             for echeance in meteo_elem.findall('ECHEANCE'):
@@ -197,12 +281,12 @@ class MeteoFranceMontagneApi:
                 })
 
         # Parse BSH (Bilan de Saison Hivernal - Historique)
-        bsh_elem = root.find('BSH')
+        bsh_elem = root.find('BSH') if any(wanted(section) for section in HISTORY_SECTIONS) else None
 
         # Parse METEO historique
         echeances_historique = []
         if bsh_elem is not None:
-            bsh_meteo_elem = bsh_elem.find('METEO')
+            bsh_meteo_elem = find(bsh_elem, 'METEO', 'historique_meteo')
             if bsh_meteo_elem is not None:
                 for echeance in bsh_meteo_elem.findall('ECHEANCE'):
                     echeances_historique.append({
@@ -222,7 +306,7 @@ class MeteoFranceMontagneApi:
         # Parse RISQUES historique
         risques_historique = []
         if bsh_elem is not None:
-            risques_elem = bsh_elem.find('RISQUES')
+            risques_elem = find(bsh_elem, 'RISQUES', 'historique_risque')
             if risques_elem is not None:
                 for risque_jour in risques_elem.findall('RISQUE'):
                     risques_historique.append({
@@ -233,7 +317,7 @@ class MeteoFranceMontagneApi:
         # Parse ENNEIGEMENTS historique
         enneigements_historique = []
         if bsh_elem is not None:
-            enneigements_elem = bsh_elem.find('ENNEIGEMENTS')
+            enneigements_elem = find(bsh_elem, 'ENNEIGEMENTS', 'historique_enneigement')
             if enneigements_elem is not None:
                 for enneigement_jour in enneigements_elem.findall('ENNEIGEMENT'):
                     niveaux_hist = []
@@ -253,7 +337,7 @@ class MeteoFranceMontagneApi:
         # Parse NEIGEFRAICHE historique
         neige_fraiche_historique = []
         if bsh_elem is not None:
-            neige_fraiche_hist_elem = bsh_elem.find('NEIGEFRAICHE')
+            neige_fraiche_hist_elem = find(bsh_elem, 'NEIGEFRAICHE', 'historique_neige_fraiche')
             if neige_fraiche_hist_elem is not None:
                 for neige24h in neige_fraiche_hist_elem.findall('NEIGE24H'):
                     neige_fraiche_historique.append({
@@ -266,14 +350,18 @@ class MeteoFranceMontagneApi:
             'altitude_vent_1': to_int_or_null(get_attr(meteo_elem, 'ALTITUDEVENT1')) if meteo_elem is not None else None,
             'altitude_vent_2': to_int_or_null(get_attr(meteo_elem, 'ALTITUDEVENT2')) if meteo_elem is not None else None,
             'commentaire': get_text(meteo_elem.find('COMMENTAIRE')) if meteo_elem is not None else '',
-            'echeances': echeances,
-            'echeances_historique': echeances_historique
+            'echeances': echeances
         }
 
         # Add historical data to their respective sections
-        risque['historique'] = risques_historique
-        enneigement['historique'] = enneigements_historique
-        neige_fraiche['historique'] = neige_fraiche_historique
+        if wanted('historique_meteo'):
+            meteo['echeances_historique'] = echeances_historique
+        if wanted('historique_risque'):
+            risque['historique'] = risques_historique
+        if wanted('historique_enneigement'):
+            enneigement['historique'] = enneigements_historique
+        if wanted('historique_neige_fraiche'):
+            neige_fraiche['historique'] = neige_fraiche_historique
 
         # Build final structure
         result = {
@@ -295,27 +383,51 @@ class MeteoFranceMontagneApi:
 
         return result
 
-    async def list_massif(self):
-        """Get list of massifs organized by department."""
-        response = await self.call_api(f"{BASE_URL}/liste-massifs")
-        if response is None:
-            raise Exception("Failed to fetch massifs list from API")
-        json_data = self.as_json(response)
-        by_department = self.organize_by_department(json_data)
-        return by_department
+    async def massif_list(self):
+        """Get the massif list GeoJSON, as bytes."""
+        return await self.call_api(f"{BASE_URL}/liste-massifs")
+
+    def massifs_by_department(self, content):
+        """Organize massifs by department from the massif list GeoJSON.
+
+        The properties are streamed straight from the bytes: the polygons,
+        most of the document, are tokenized but never built into objects
+        (and their numbers are read as floats, much cheaper than Decimals).
+        Tokenizing is still blocking, so this runs in an executor.
+        """
+        properties = ijson.items(io.BytesIO(content), "features.item.properties", use_float=True)
+        return self.organize_properties(properties)
 
-    async def bulletin(self, massif):
+    async def bulletin(self, massif, sections=None):
         """Get avalanche bulletin for a massif."""
         response = await self.call_api(f"{BASE_URL}/massif/BRA?id-massif={massif}&format=xml")
         try:
             xml_doc = etree.fromstring(response)
-            result = self.parse_bulletin_xml(xml_doc)
+            result = self.parse_bulletin_xml(xml_doc, sections)
             return result
 
         except etree.XMLSyntaxError as e:
             _LOGGER.error("XML parsing error: %s", str(e))
             return None
 
+    async def probe(self):
+        """Check the token with the cheapest authenticated request.
+
+        A HEAD request on the massif list transfers no body. A 405 says
+        nothing about the token, so the massif list is then fetched with a
+        documented GET, for this probe and the next ones.
+        """
+        url = f"{BASE_URL}/liste-massifs"
+        if self._probe_head:
+            try:
+                await self.call_api(url, method="HEAD")
+                return
+            except MeteoFranceMontagneApiError as err:
+                if err.status != 405:
+                    raise
+            self._probe_head = False
+        await self.call_api(url)
+
     async def image(self, image_type, massif):
         """Get image for a massif."""
         url = f"{BASE_URL}/massif/image/{image_type}?id-massif={massif}"
@@ -340,14 +452,10 @@ class MeteoFranceMontagneApi:
     async def sept_derniers_jours(self, massif):
         return await self.image("sept-derniers-jours", massif)
 
-    def as_json(self, bytes_data):
-        """Convert bytes data to JSON."""
-        string_data = bytes_data.decode('utf-8')
-        json_data = json.loads(string_data)
-        return json_data
-
-    async def call_api(self, url):
+    async def call_api(self, url, method="GET"):
         """Fetch data from a given URL."""
+        if self.stats:
+            await self.stats.async_acquire()
         try:
             timeout = aiohttp.ClientTimeout(total=TIMEOUT)
             _LOGGER.debug("Executing URL fetch: %s", url)
@@ -355,30 +463,42 @@ class MeteoFranceMontagneApi:
                 "accept": "*/*",
                 "apikey": self.token
             }
-            async with self.session.get(url, timeout=timeout, headers=headers) as response:
-                if response.status == 401:
-                    _LOGGER.error("Authentication failed (401). Check your API token.")
-                    raise Exception("Invalid API token (401 Unauthorized)")
-                if response.status != 200:
-                    _LOGGER.error(
-                        "HTTP request failed with status: %s for url: %s",
-                        response.status,
-                        url,
-                    )
-                    raise Exception(f"HTTP {response.status} error")
-                return await response.read()
+            response = await self.transport.request(method, url, headers, timeout)
+            if self.stats:
+                self.stats.record(response.status, response.header("Retry-After"))
+            if response.status == 401:
+                _LOGGER.error("Authentication failed (401). Check your API token.")
+                raise MeteoFranceMontagneAuthError(
+                    "Invalid API token (401 Unauthorized)", response.status)
+            if response.status == 429:
+                _LOGGER.warning("API quota exceeded (429) for url: %s", url)
+                raise MeteoFranceMontagneRateLimitError(
+                    "HTTP 429 error", response.status)
+            if response.status != 200:
+                _LOGGER.error(
+                    "HTTP request failed with status: %s for url: %s",
+                    response.status,
+                    url,
+                )
+                raise MeteoFranceMontagneApiError(
+                    f"HTTP {response.status} error", response.status)
+            return response.body
 
         except aiohttp.ClientError as e:
+            if self.stats:
+                self.stats.record(None)
             _LOGGER.error(
                 "Client error during HTTP request for url: %s. Exception: %s", url, e)
             raise
         except asyncio.TimeoutError:
+            if self.stats:
+                self.stats.record(None)
             _LOGGER.error(
                 "Timeout error while fetching data from url: %s", url)
             raise
+        except MeteoFranceMontagneApiError:
+            raise
         except Exception as e:
-            if "Invalid API token" in str(e) or "HTTP" in str(e):
-                raise
             _LOGGER.error(
                 "Unexpected exception with url: %s. Exception: %s", url, e)
             raise
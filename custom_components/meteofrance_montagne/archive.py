@@ -0,0 +1,449 @@
+"""Local SQLite archive of parsed Météo-France Montagne bulletins."""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import ARCHIVE_COMMIT_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bulletins (
+    massif TEXT NOT NULL,
+    date_bulletin TEXT NOT NULL,
+    amendement INTEGER NOT NULL DEFAULT 0,
+    massif_name TEXT,
+    date_validite TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (massif, date_bulletin, amendement)
+);
+CREATE TABLE IF NOT EXISTS imported_sources (
+    source TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS risques (
+    massif TEXT NOT NULL,
+    date_bulletin TEXT NOT NULL,
+    date TEXT NOT NULL,
+    zone INTEGER NOT NULL,
+    valeur INTEGER,
+    evolution TEXT,
+    altitude_min INTEGER,
+    altitude_max INTEGER,
+    PRIMARY KEY (massif, date_bulletin, zone)
+);
+CREATE INDEX IF NOT EXISTS risques_massif_date ON risques (massif, date);
+CREATE TABLE IF NOT EXISTS risques_jour (
+    massif TEXT NOT NULL,
+    date TEXT NOT NULL,
+    risque_max INTEGER,
+    date_bulletin TEXT NOT NULL,
+    PRIMARY KEY (massif, date)
+);
+CREATE TABLE IF NOT EXISTS enneigement (
+    massif TEXT NOT NULL,
+    date TEXT NOT NULL,
+    limite_nord INTEGER,
+    limite_sud INTEGER,
+    date_bulletin TEXT NOT NULL,
+    PRIMARY KEY (massif, date)
+);
+CREATE TABLE IF NOT EXISTS enneigement_niveaux (
+    massif TEXT NOT NULL,
+    date TEXT NOT NULL,
+    altitude INTEGER NOT NULL,
+    nord INTEGER,
+    sud INTEGER,
+    date_bulletin TEXT NOT NULL,
+    PRIMARY KEY (massif, date, altitude)
+);
+CREATE TABLE IF NOT EXISTS neige_fraiche (
+    massif TEXT NOT NULL,
+    date TEXT NOT NULL,
+    min INTEGER,
+    max INTEGER,
+    date_bulletin TEXT NOT NULL,
+    PRIMARY KEY (massif, date)
+);
+CREATE TABLE IF NOT EXISTS echeances (
+    massif TEXT NOT NULL,
+    date_bulletin TEXT NOT NULL,
+    date TEXT NOT NULL,
+    iso_0 INTEGER,
+    pluie_neige INTEGER,
+    temps_sensible INTEGER,
+    mer_nuages INTEGER,
+    vent_force_1 INTEGER,
+    vent_direction_1 TEXT,
+    vent_force_2 INTEGER,
+    vent_direction_2 TEXT,
+    PRIMARY KEY (massif, date_bulletin, date)
+);
+CREATE INDEX IF NOT EXISTS echeances_massif_date ON echeances (massif, date);
+"""
+
+
+def _day(value):
+    """Return the YYYY-MM-DD part of an ISO date."""
+    return value[:10] if value else value
+
+
+def _int(value):
+    """Return value as int, or None."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_bulletin(bulletin):
+    """Split a parsed bulletin into rows for the indexed tables.
+
+    Daily rows come from the current sections and from the BSH history
+    resent with each bulletin. They end with the date of the bulletin, so
+    that a day covered again is only overwritten by a more recent one.
+    """
+    massif = bulletin.get("id", "")
+    date_bulletin = bulletin.get("dateBulletin", "")
+    risque = bulletin.get("risque") or {}
+    enneigement = bulletin.get("enneigement") or {}
+    neige_fraiche = bulletin.get("neige_fraiche") or {}
+    meteo = bulletin.get("meteo") or {}
+
+    rows = {
+        "risques": [],
+        "risques_jour": [],
+        "enneigement": [],
+        "enneigement_niveaux": [],
+        "neige_fraiche": [],
+        "echeances": [],
+    }
+
+    # Risk per altitude zone, for the day the bulletin is valid
+    date = _day(bulletin.get("dateValidite") or date_bulletin)
+    altitude = risque.get("altitude_limite")
+    for zone, key in ((1, "risque_1"), (2, "risque_2")):
+        zone_data = risque.get(key) or {}
+        if zone == 2 and altitude is None:
+            continue
+        if not zone_data.get("valeur"):
+            continue
+        rows["risques"].append((
+            massif, date_bulletin, date, zone,
+            _int(zone_data.get("valeur")), zone_data.get("evolution") or None,
+            altitude if zone == 2 else None,
+            altitude if zone == 1 else None,
+        ))
+    if risque.get("risque_max"):
+        rows["risques_jour"].append(
+            (massif, date, _int(risque.get("risque_max")), date_bulletin))
+    for jour in risque.get("historique", []):
+        rows["risques_jour"].append(
+            (massif, _day(jour["date"]), _int(jour["risque_max"]), date_bulletin))
+
+    for jour in enneigement.get("historique", []) + [enneigement]:
+        if not jour.get("date"):
+            continue
+        day = _day(jour["date"])
+        rows["enneigement"].append(
+            (massif, day, jour.get("limite_nord"), jour.get("limite_sud"), date_bulletin))
+        for niveau in jour.get("niveaux", []):
+            if niveau.get("altitude") is None:
+                continue
+            rows["enneigement_niveaux"].append(
+                (massif, day, niveau["altitude"], niveau.get("nord"), niveau.get("sud"),
+                 date_bulletin))
+
+    for mesure in neige_fraiche.get("historique", []) + neige_fraiche.get("mesures", []):
+        if mesure.get("date"):
+            rows["neige_fraiche"].append(
+                (massif, _day(mesure["date"]), mesure.get("min"), mesure.get("max"),
+                 date_bulletin))
+
+    for echeance in meteo.get("echeances_historique", []) + meteo.get("echeances", []):
+        if not echeance.get("date"):
+            continue
+        vent = echeance.get("vent") or {}
+        rows["echeances"].append((
+            massif, date_bulletin, echeance["date"],
+            echeance.get("iso_0"), echeance.get("pluie_neige"),
+            echeance.get("temps_sensible"), echeance.get("mer_nuages"),
+            vent.get("force_1"), vent.get("direction_1") or None,
+            vent.get("force_2"), vent.get("direction_2") or None,
+        ))
+
+    return rows
+
+
+def _upsert(table, key, columns):
+    """Return the insert of a daily table, keeping the most recent bulletin.
+
+    Bulletins may be written in any order, so a row is only replaced by
+    one of a bulletin at least as recent (an amendment has the date of
+    the bulletin it amends).
+    """
+    values = ", ".join("?" * (len(key) + len(columns) + 1))
+    updates = ", ".join(f"{column} = excluded.{column}" for column in columns)
+    return (
+        f"INSERT INTO {table} VALUES ({values}) "
+        f"ON CONFLICT ({', '.join(key)}) DO UPDATE SET {updates}, "
+        "date_bulletin = excluded.date_bulletin "
+        f"WHERE excluded.date_bulletin >= {table}.date_bulletin"
+    )
+
+
+# Per-bulletin tables keep the last amendment, daily tables the value of
+# the most recent bulletin
+INSERTS = {
+    "risques": "INSERT OR IGNORE INTO risques VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    "risques_jour": _upsert("risques_jour", ("massif", "date"), ("risque_max",)),
+    "enneigement": _upsert("enneigement", ("massif", "date"), ("limite_nord", "limite_sud")),
+    "enneigement_niveaux": _upsert(
+        "enneigement_niveaux", ("massif", "date", "altitude"), ("nord", "sud")),
+    "neige_fraiche": _upsert("neige_fraiche", ("massif", "date"), ("min", "max")),
+    "echeances": "INSERT OR IGNORE INTO echeances VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+}
+BULLETIN_TABLES = ("risques", "echeances")
+
+
+# Daily series exposed by query_history. Each query yields (massif, day,
+# value) rows; forecasts keep the most recent bulletin for each echeance.
+METRICS = {
+    "risque_max": (
+        "SELECT massif, date AS day, risque_max AS value FROM risques_jour "
+        "WHERE {where}"
+    ),
+    "limite_nord": (
+        "SELECT massif, date AS day, limite_nord AS value FROM enneigement "
+        "WHERE {where}"
+    ),
+    "limite_sud": (
+        "SELECT massif, date AS day, limite_sud AS value FROM enneigement "
+        "WHERE {where}"
+    ),
+    "neige_fraiche_min": (
+        "SELECT massif, date AS day, min AS value FROM neige_fraiche "
+        "WHERE {where}"
+    ),
+    "neige_fraiche_max": (
+        "SELECT massif, date AS day, max AS value FROM neige_fraiche "
+        "WHERE {where}"
+    ),
+    "iso_0": (
+        "SELECT massif, substr(date, 1, 10) AS day, MAX(iso_0) AS value FROM echeances e "
+        "WHERE {where} AND iso_0 != -1 AND date_bulletin = ("
+        "SELECT MAX(date_bulletin) FROM echeances WHERE massif = e.massif AND date = e.date) "
+        "GROUP BY massif, day"
+    ),
+    "pluie_neige": (
+        "SELECT massif, substr(date, 1, 10) AS day, MAX(pluie_neige) AS value FROM echeances e "
+        "WHERE {where} AND pluie_neige != -1 AND date_bulletin = ("
+        "SELECT MAX(date_bulletin) FROM echeances WHERE massif = e.massif AND date = e.date) "
+        "GROUP BY massif, day"
+    ),
+}
+
+AGGREGATIONS = {
+    "daily": None,
+    "max": "MAX",
+    "min": "MIN",
+    "sum": "SUM",
+    "avg": "AVG",
+}
+
+
+class BulletinArchive:
+    """Append-only archive of parsed bulletins.
+
+    All methods are blocking and must be called from an executor.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the archive."""
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        """Open the database and create the schema if needed."""
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.path, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.executescript(SCHEMA)
+        return self
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def imported_sources(self):
+        """Return the set of sources already imported."""
+        with self._lock:
+            rows = self._conn.execute("SELECT source FROM imported_sources")
+            return {row[0] for row in rows}
+
+    def write_batch(self, bulletins, sources=()):
+        """Store a batch of bulletins in a single transaction.
+
+        Sources are marked as imported in the same transaction, so an
+        interrupted import resumes exactly after the last committed batch.
+        Daily values end up with the most recent bulletin covering each
+        day, whatever the order of the batches. An amendment replaces the
+        rows of the bulletin it amends, whichever of them is written first.
+        """
+        bulletins = sorted(bulletins, key=lambda bulletin: (
+            bulletin.get("dateBulletin", ""),
+            bool(bulletin.get("amendement")),
+            bulletin.get("dateDiffusion") or "",
+        ))
+        # ((massif, date_bulletin), rows of every table), in date order
+        rows = []
+        # (massif, date_bulletin) -> (amended, rows of the per-bulletin tables)
+        forecasts = {}
+        for bulletin in bulletins:
+            key = (bulletin.get("id", ""), bulletin.get("dateBulletin", ""))
+            amended = bool(bulletin.get("amendement"))
+            normalized = normalize_bulletin(bulletin)
+            if amended or key not in forecasts:
+                forecasts[key] = (amended, {table: normalized[table] for table in BULLETIN_TABLES})
+            rows.append((key, normalized))
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO bulletins "
+                "(massif, date_bulletin, amendement, massif_name, date_validite, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        bulletin.get("id", ""),
+                        bulletin.get("dateBulletin", ""),
+                        int(bool(bulletin.get("amendement"))),
+                        bulletin.get("massif", ""),
+                        bulletin.get("dateValidite", ""),
+                        json.dumps(bulletin, ensure_ascii=False, separators=(",", ":")),
+                    )
+                    for bulletin in bulletins
+                ],
+            )
+            # Originals amended by a bulletin already archived, which has
+            # the same date and must not be overwritten
+            superseded = {
+                key for key, (amended, _rows) in forecasts.items()
+                if not amended and self._conn.execute(
+                    "SELECT 1 FROM bulletins WHERE massif = ? AND date_bulletin = ? "
+                    "AND amendement = 1",
+                    key,
+                ).fetchone()
+            }
+            for table in INSERTS:
+                if table in BULLETIN_TABLES:
+                    continue
+                self._conn.executemany(INSERTS[table], [
+                    row
+                    for key, normalized in rows
+                    if key not in superseded
+                    for row in normalized[table]
+                ])
+            for key, (amended, table_rows) in forecasts.items():
+                if key in superseded:
+                    continue
+                if amended:
+                    for table in BULLETIN_TABLES:
+                        self._conn.execute(
+                            f"DELETE FROM {table} WHERE massif = ? AND date_bulletin = ?", key)
+                for table in BULLETIN_TABLES:
+                    self._conn.executemany(INSERTS[table], table_rows[table])
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO imported_sources (source) VALUES (?)",
+                [(source,) for source in sources],
+            )
+
+    def query_history(self, massifs, start, end, metric, aggregation="daily", limit=100, offset=0):
+        """Return a page of a metric between two dates (inclusive).
+
+        Daily aggregation returns one row per massif and day; other
+        aggregations return one row per massif over the whole range.
+        """
+        where = "date >= ? AND date <= ?"
+        params = [start, f"{end}T23:59:59"]
+        if massifs:
+            where += f" AND massif IN ({', '.join('?' * len(massifs))})"
+            params.extend(massifs)
+        series = f"SELECT * FROM ({METRICS[metric].format(where=where)}) WHERE value IS NOT NULL"
+
+        function = AGGREGATIONS[aggregation]
+        if function is None:
+            query = f"SELECT massif, day, value FROM ({series}) ORDER BY massif, day"
+            columns = ("massif", "date", "value")
+        else:
+            query = (
+                f"SELECT massif, {function}(value), COUNT(*) FROM ({series}) "
+                "GROUP BY massif ORDER BY massif"
+            )
+            columns = ("massif", "value", "days")
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM ({query})", params).fetchone()[0]
+            rows = self._conn.execute(f"{query} LIMIT ? OFFSET ?", [*params, limit, offset]).fetchall()
+
+        return {
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "results": [dict(zip(columns, row)) for row in rows],
+        }
+
+
+class ArchiveRecorder:
+    """Queue received bulletins and write them to the archive in batches.
+
+    Writes run in an executor, at most once per commit delay, so that
+    several massifs refreshing together share a single transaction.
+    """
+
+    def __init__(self, hass: HomeAssistant, archive: BulletinArchive) -> None:
+        """Initialize the recorder."""
+        self.hass = hass
+        self.archive = archive
+        self._queue = []
+        self._unsub_commit = None
+
+    @callback
+    def async_add(self, bulletin) -> None:
+        """Queue a bulletin for archiving."""
+        self._queue.append(bulletin)
+        if self._unsub_commit is None:
+            self._unsub_commit = async_call_later(
+                self.hass, ARCHIVE_COMMIT_DELAY, self._async_commit)
+
+    async def _async_commit(self, _now=None) -> None:
+        """Write queued bulletins."""
+        self._unsub_commit = None
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Write queued bulletins now."""
+        if not self._queue:
+            return
+        batch, self._queue = self._queue, []
+        try:
+            await self.hass.async_add_executor_job(self.archive.write_batch, batch)
+        except sqlite3.Error as err:
+            _LOGGER.error("Error writing %s bulletins to the archive: %s", len(batch), err)
+
+    async def async_close(self) -> None:
+        """Flush pending bulletins and close the archive."""
+        if self._unsub_commit is not None:
+            self._unsub_commit()
+            self._unsub_commit = None
+        await self.async_flush()
+        await self.hass.async_add_executor_job(self.archive.close)
@@ -0,0 +1,106 @@
+"""Platform for Météo-France Montagne binary sensor integration."""
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN, ASPECTS, CONF_TOKEN, PROBE_INTERVAL
+from .entity import MeteoFranceMontagneEntity
+from .health import async_get_health_probe
+
+# Only the API connectivity sensor polls
+SCAN_INTERVAL = timedelta(seconds=PROBE_INTERVAL)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the Météo-France Montagne binary sensors."""
+    # API configuration entry (parent): connectivity of its token
+    if CONF_TOKEN in entry.data:
+        async_add_entities([MeteoFranceMontagneApiSensor(entry)], True)
+        return
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    async_add_entities(
+        MeteoFranceMontagnePenteSensor(coordinator, aspect)
+        for aspect in ASPECTS
+    )
+
+
+class MeteoFranceMontagnePenteSensor(MeteoFranceMontagneEntity, BinarySensorEntity):
+    """Whether slopes of an aspect are particularly dangerous.
+
+    On (unsafe) for the aspects flagged in the bulletin's slope rose.
+    """
+
+    _attr_device_class = BinarySensorDeviceClass.SAFETY
+
+    def __init__(self, coordinator, aspect: str) -> None:
+        """Initialize the binary sensor."""
+        super().__init__(coordinator)
+        self.coordinator = coordinator
+        self._aspect = aspect
+        self._data_keys = (f"risque.pentes_particulieres.{aspect}",)
+        self._attr_name = f"{coordinator.massif_name} Pente Dangereuse {aspect}"
+        self._attr_unique_id = f"{coordinator.massif_id}_pente_{aspect.lower()}"
+        self._attr_icon = "mdi:compass-rose"
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True if the slopes of this aspect are dangerous."""
+        if not self.coordinator.data or "risque" not in self.coordinator.data:
+            return None
+        pentes = self.coordinator.data["risque"].get("pentes_particulieres") or {}
+        return pentes.get(self._aspect)
+
+
+class MeteoFranceMontagneApiSensor(BinarySensorEntity):
+    """Connectivity of the API with the token of an API entry."""
+
+    _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, entry: ConfigEntry) -> None:
+        """Initialize the binary sensor."""
+        self._token = entry.data[CONF_TOKEN]
+        self._attr_name = entry.title
+        self._attr_unique_id = f"{entry.entry_id}_api"
+        self._result = {}
+
+    async def async_update(self) -> None:
+        """Probe the API (shared with the config flows within the TTL)."""
+        self._result = await async_get_health_probe(self.hass).async_probe(self._token)
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True if the API is reachable and accepts the token.
+
+        A rate-limited token is valid, it is only out of quota for now.
+        """
+        if not self._result:
+            return None
+        return self._result["ok"] or self._result["error"] == "rate_limited"
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes."""
+        return {
+            "erreur": self._result.get("error"),
+            "statut_http": self._result.get("status"),
+            "latence_ms": self._result.get("latency_ms"),
+            "quota_restant": self._result.get("headroom"),
+            "last_check": self._result.get("checked_at"),
+        }
@@ -1,19 +1,61 @@
 """Config flow for Météo-France Montagne integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.data_entry_flow import FlowResult
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-from .api import MeteoFranceMontagneApi
-from .const import DOMAIN, CONF_TOKEN, CONF_MASSIF, API_PORTAL_URL
+from homeassistant.const import CONF_LATITUDE, CONF_LOCATION, CONF_LONGITUDE
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.data_entry_flow import FlowResult, FlowResultType
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.selector import LocationSelector, LocationSelectorConfig
+
+from .api import MeteoFranceMontagneApi, async_get_massif_index, async_get_massif_list
+from .health import async_get_health_probe
+from .session import async_get_session
+from .const import (
+    DOMAIN,
+    CONF_TOKEN,
+    CONF_MASSIF,
+    API_PORTAL_URL,
+    CONF_IMAGE_VARIANT,
+    CONF_THUMBNAIL_SIZE,
+    CONF_LOCAL_IMAGES,
+    CONF_PARSE_PROFILE,
+    CONF_PARSE_SECTIONS,
+    CONF_TOKEN_POOL,
+    CONF_HISTORY_RETENTION,
+    DEFAULT_HISTORY_RETENTION,
+    MAX_HISTORY_RETENTION,
+    DEFAULT_PARSE_PROFILE,
+    PARSE_PROFILES,
+    PARSE_SECTIONS,
+    DEFAULT_IMAGE_VARIANT,
+    DEFAULT_THUMBNAIL_SIZE,
+    IMAGE_VARIANTS,
+    LOCAL_IMAGE_TYPES,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Source of the flows creating the massifs selected along with the first one
+SOURCE_ADD_MASSIF = "add_massif"
+
+
+async def _async_validate_token(hass: HomeAssistant, token: str) -> str | None:
+    """Return the form error for a token, None if it is accepted."""
+    result = await async_get_health_probe(hass).async_probe(token)
+    if result["error"] == "invalid_auth":
+        return "invalid_auth"
+    if result["error"] == "cannot_connect":
+        _LOGGER.error("Error validating token: HTTP status %s", result["status"])
+        return "cannot_connect"
+    # Out of quota, but valid
+    return None
+
 
 class MeteoFranceMontagneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Météo-France Montagne."""
@@ -26,6 +68,22 @@ class MeteoFranceMontagneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._selected_department = None
         self._parent_entry_id = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> MeteoFranceMontagneOptionsFlow:
+        """Get the options flow for a massif entry."""
+        return MeteoFranceMontagneOptionsFlow()
+
+    @classmethod
+    @callback
+    def async_supports_options_flow(
+        cls, config_entry: config_entries.ConfigEntry
+    ) -> bool:
+        """Only massif entries (children) have options."""
+        return CONF_TOKEN not in config_entry.data
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -52,20 +110,15 @@ class MeteoFranceMontagneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             token = user_input[CONF_TOKEN]
 
-            # Validate token by trying to fetch data
-            try:
-                session = async_get_clientsession(self.hass)
-                api = MeteoFranceMontagneApi(session, self.hass, token)
-                await api.rose_pentes(2)  # Test API call
-
+            # Validate token with the lightest authenticated request
+            if error := await _async_validate_token(self.hass, token):
+                errors["base"] = error
+            else:
                 # Create the API configuration entry
                 return self.async_create_entry(
                     title="API Météo-France Montagne",
                     data={CONF_TOKEN: token},
                 )
-            except Exception as err:
-                _LOGGER.error("Error validating token: %s", err)
-                errors["base"] = "cannot_connect"
 
         return self.async_show_form(
             step_id="api",
@@ -93,12 +146,12 @@ class MeteoFranceMontagneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         # If only one API config, use it automatically
         if len(api_entries) == 1:
             self._parent_entry_id = api_entries[0].entry_id
-            return await self.async_step_department()
+            return await self.async_step_method()
 
         # Multiple API configs - let user choose
         if user_input is not None:
             self._parent_entry_id = user_input["api"]
-            return await self.async_step_department()
+            return await self.async_step_method()
 
         return self.async_show_form(
             step_id="select_api",
@@ -110,6 +163,57 @@ class MeteoFranceMontagneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             })
         )
 
+    async def async_step_method(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Choose between locating the massif and picking it by name."""
+        return self.async_show_menu(
+            step_id="method",
+            menu_options=["location", "department"],
+        )
+
+    async def async_step_location(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Add the massif containing, or nearest to, a location."""
+        errors = {}
+
+        parent_entry = self.hass.config_entries.async_get_entry(self._parent_entry_id)
+        if not parent_entry:
+            return self.async_abort(reason="no_api")
+
+        if user_input is not None:
+            location = user_input[CONF_LOCATION]
+            try:
+                session = async_get_session(self.hass)
+                api = MeteoFranceMontagneApi(session, self.hass, parent_entry.data.get(CONF_TOKEN))
+                index = await async_get_massif_index(self.hass, api)
+            except Exception as err:
+                _LOGGER.error("Error fetching massifs: %s", err)
+                errors["base"] = "cannot_connect"
+            else:
+                massif = index.nearest(location[CONF_LATITUDE], location[CONF_LONGITUDE])
+                if massif is None:
+                    errors["base"] = "no_massif"
+                else:
+                    department = massif["departments"][0] if massif["departments"] else ""
+                    return await self._async_create_massif_entry(
+                        massif["code"], massif["title"], department)
+
+        return self.async_show_form(
+            step_id="location",
+            data_schema=vol.Schema({
+                vol.Required(
+                    CONF_LOCATION,
+                    default={
+                        CONF_LATITUDE: self.hass.config.latitude,
+                        CONF_LONGITUDE: self.hass.config.longitude,
+                    },
+                ): LocationSelector(LocationSelectorConfig(radius=False)),
+            }),
+            errors=errors,
+        )
+
     async def async_step_department(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -126,9 +230,9 @@ class MeteoFranceMontagneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is None:
             # Fetch departments list
             try:
-                session = async_get_clientsession(self.hass)
+                session = async_get_session(self.hass)
                 api = MeteoFranceMontagneApi(session, self.hass, token)
-                self._departments_data = await api.list_massif()
+                self._departments_data = await async_get_massif_list(self.hass, api)
 
                 return self.async_show_form(
                     step_id="department",
@@ -153,46 +257,126 @@ class MeteoFranceMontagneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_massif(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Handle massif selection."""
+        """Handle massif selection, one or several massifs at once."""
         errors = {}
+        massifs = self._departments_data[self._selected_department]
 
-        if user_input is None:
-            # Show massifs for selected department
-            massifs = self._departments_data[self._selected_department]
-            massif_titles = [massif["title"] for massif in massifs]
-
-            return self.async_show_form(
-                step_id="massif",
-                data_schema=vol.Schema({
-                    vol.Required("massif"): vol.In(sorted(massif_titles))
-                }),
-                errors=errors,
-            )
+        if user_input is not None:
+            # Find corresponding codes, in the department's order
+            selected = [
+                massif for massif in massifs if massif["title"] in user_input["massif"]
+            ]
+            if not selected:
+                errors["base"] = "no_massif_selected"
+            else:
+                # This flow creates the first entry, a flow of its own each
+                # other massif: their entries are set up, and first refreshed,
+                # in parallel
+                results = await asyncio.gather(
+                    *(
+                        self.hass.config_entries.flow.async_init(
+                            DOMAIN,
+                            context={"source": SOURCE_ADD_MASSIF},
+                            data={
+                                "code": massif["code"],
+                                "department": self._selected_department,
+                                "parent_entry_id": self._parent_entry_id,
+                            },
+                        )
+                        for massif in selected[1:]
+                    ),
+                    return_exceptions=True,
+                )
+                skipped = []
+                for massif, result in zip(selected[1:], results):
+                    if isinstance(result, Exception):
+                        _LOGGER.error("Error adding massif %s: %s", massif["title"], result)
+                        skipped.append(massif["title"])
+                    elif result["type"] != FlowResultType.CREATE_ENTRY:
+                        _LOGGER.warning(
+                            "Massif %s not added: %s", massif["title"], result.get("reason"))
+                        skipped.append(massif["title"])
+                return await self._async_create_massif_entry(
+                    selected[0]["code"], selected[0]["title"], self._selected_department,
+                    skipped)
+
+        # Show massifs for selected department, those not configured yet
+        configured = {
+            entry.unique_id for entry in self._async_current_entries(include_ignore=False)
+        }
+        massif_titles = {
+            massif["title"]: massif["title"]
+            for massif in sorted(massifs, key=lambda massif: massif["title"])
+            if f"{self._parent_entry_id}_{massif['code']}" not in configured
+        }
+        if not massif_titles:
+            return self.async_abort(reason="already_configured")
 
-        else:
-            # User selected a massif
-            title = user_input["massif"]
-            name = self._selected_department + " - " + title
-
-            # Find corresponding code
-            selected_massif = next(
-                massif for massif in self._departments_data[self._selected_department]
-                if massif["title"] == title
-            )
-
-            # Check for duplicates
-            await self.async_set_unique_id(f"{self._parent_entry_id}_{selected_massif['code']}")
-            self._abort_if_unique_id_configured()
-
-            # Create child entry
-            return self.async_create_entry(
-                title=name,
-                data={
-                    CONF_MASSIF: selected_massif["code"],
-                    "massif_name": title,
-                    "parent_entry_id": self._parent_entry_id,
-                },
-            )
+        return self.async_show_form(
+            step_id="massif",
+            data_schema=vol.Schema({
+                vol.Required("massif"): cv.multi_select(massif_titles)
+            }),
+            errors=errors,
+        )
+
+    async def async_step_add_massif(self, data: dict[str, Any]) -> FlowResult:
+        """Create the entry of a massif selected along with others.
+
+        Only started by the massif step, for a massif of the department list
+        and an API entry.
+        """
+        parent_entry = self.hass.config_entries.async_get_entry(data["parent_entry_id"])
+        if not parent_entry or CONF_TOKEN not in parent_entry.data:
+            return self.async_abort(reason="no_api")
+        self._parent_entry_id = parent_entry.entry_id
+
+        # Served from the massif list cached by the massif step
+        session = async_get_session(self.hass)
+        api = MeteoFranceMontagneApi(session, self.hass, parent_entry.data[CONF_TOKEN])
+        try:
+            departments = await async_get_massif_list(self.hass, api)
+        except Exception as err:
+            _LOGGER.error("Error fetching massifs: %s", err)
+            return self.async_abort(reason="cannot_connect")
+
+        massif = next(
+            (
+                massif for massif in departments.get(data["department"], [])
+                if massif["code"] == data["code"]
+            ),
+            None,
+        )
+        if massif is None:
+            return self.async_abort(reason="unknown_massif")
+        return await self._async_create_massif_entry(
+            massif["code"], massif["title"], data["department"])
+
+    async def _async_create_massif_entry(
+        self, code: str, title: str, department: str, skipped: list[str] | None = None
+    ) -> FlowResult:
+        """Create the entry (child) of a massif.
+
+        Massifs selected along with it that were not added are listed in the
+        message shown once the entry is created.
+        """
+        name = f"{department} - {title}" if department else title
+
+        # Check for duplicates
+        await self.async_set_unique_id(f"{self._parent_entry_id}_{code}")
+        self._abort_if_unique_id_configured()
+
+        # Create child entry
+        return self.async_create_entry(
+            title=name,
+            data={
+                CONF_MASSIF: code,
+                "massif_name": title,
+                "parent_entry_id": self._parent_entry_id,
+            },
+            description="massifs_skipped" if skipped else None,
+            description_placeholders={"massifs": ", ".join(skipped)} if skipped else None,
+        )
 
     async def async_step_reconfigure(
         self, user_input: dict[str, Any] | None = None
@@ -209,11 +393,9 @@ class MeteoFranceMontagneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             token = user_input[CONF_TOKEN]
 
             # Validate token
-            try:
-                session = async_get_clientsession(self.hass)
-                api = MeteoFranceMontagneApi(session, self.hass, token)
-                await api.rose_pentes(2)  # Test API call
-
+            if error := await _async_validate_token(self.hass, token):
+                errors["base"] = error
+            else:
                 # Update the entry
                 self.hass.config_entries.async_update_entry(
                     entry,
@@ -221,9 +403,6 @@ class MeteoFranceMontagneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 )
                 await self.hass.config_entries.async_reload(entry.entry_id)
                 return self.async_abort(reason="reconfigure_successful")
-            except Exception as err:
-                _LOGGER.error("Error validating token: %s", err)
-                errors["base"] = "cannot_connect"
 
         return self.async_show_form(
             step_id="reconfigure",
@@ -232,3 +411,59 @@ class MeteoFranceMontagneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }),
             errors=errors,
         )
+
+
+class MeteoFranceMontagneOptionsFlow(config_entries.OptionsFlow):
+    """Handle options of a massif entry."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the massif options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Required(
+                    CONF_IMAGE_VARIANT,
+                    default=options.get(CONF_IMAGE_VARIANT, DEFAULT_IMAGE_VARIANT),
+                ): vol.In(list(IMAGE_VARIANTS)),
+                vol.Required(
+                    CONF_THUMBNAIL_SIZE,
+                    default=options.get(CONF_THUMBNAIL_SIZE, DEFAULT_THUMBNAIL_SIZE),
+                ): vol.All(vol.Coerce(int), vol.Range(min=32, max=2048)),
+                vol.Optional(
+                    CONF_LOCAL_IMAGES,
+                    default=options.get(CONF_LOCAL_IMAGES, []),
+                ): cv.multi_select({
+                    image_type: image_type.replace("_", " ").title()
+                    for image_type in LOCAL_IMAGE_TYPES
+                }),
+                vol.Required(
+                    CONF_PARSE_PROFILE,
+                    default=options.get(CONF_PARSE_PROFILE, DEFAULT_PARSE_PROFILE),
+                ): vol.In(list(PARSE_PROFILES)),
+                vol.Optional(
+                    CONF_PARSE_SECTIONS,
+                    default=options.get(CONF_PARSE_SECTIONS, PARSE_SECTIONS),
+                ): cv.multi_select({
+                    section: section.replace("_", " ").capitalize()
+                    for section in PARSE_SECTIONS
+                }),
+                vol.Required(
+                    CONF_TOKEN_POOL,
+                    default=options.get(CONF_TOKEN_POOL, False),
+                ): bool,
+                vol.Required(
+                    CONF_HISTORY_RETENTION,
+                    default=min(
+                        options.get(CONF_HISTORY_RETENTION, DEFAULT_HISTORY_RETENTION),
+                        MAX_HISTORY_RETENTION,
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_HISTORY_RETENTION)),
+            }),
+        )
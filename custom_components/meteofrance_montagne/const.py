@@ -7,6 +7,8 @@ CONF_MASSIF = "massif"
 CONF_TOKEN = "token"
 DEFAULT_TOKEN = ""
 UPDATE_INTERVAL = 1
+# Bulletin dates are published in French local time
+BULLETIN_TIME_ZONE = "Europe/Paris"
 IMAGE_TYPES = [
     "rose_pentes",
     "montagne_risques",
@@ -17,6 +19,80 @@ IMAGE_TYPES = [
 ]
 # Note: sept_derniers_jours_portrait existe dans le XML mais n'est pas accessible via l'API images
 
+# Bulletin parse profiles: sections parsed for a massif
+CONF_PARSE_PROFILE = "parse_profile"
+CONF_PARSE_SECTIONS = "parse_sections"
+DEFAULT_PARSE_PROFILE = "full"
+CURRENT_SECTIONS = [
+    "risque",
+    "stabilite",
+    "qualite",
+    "enneigement",
+    "neige_fraiche",
+    "meteo",
+]
+HISTORY_SECTIONS = [
+    "historique_risque",
+    "historique_enneigement",
+    "historique_neige_fraiche",
+    "historique_meteo",
+]
+PARSE_SECTIONS = CURRENT_SECTIONS + HISTORY_SECTIONS
+PARSE_PROFILES = {
+    "full": None,  # everything
+    "lean": CURRENT_SECTIONS,  # today's risk and forecast, no BSH history
+    "custom": None,  # CONF_PARSE_SECTIONS
+}
+
+# Image variants served by the image entities, transcoded once per image
+# content. Thumbnails are downscaled to CONF_THUMBNAIL_SIZE pixels.
+CONF_IMAGE_VARIANT = "image_variant"
+CONF_THUMBNAIL_SIZE = "thumbnail_size"
+DEFAULT_IMAGE_VARIANT = "original"
+DEFAULT_THUMBNAIL_SIZE = 320
+IMAGE_VARIANTS = {
+    "original": {"format": "PNG", "thumbnail": False},
+    "webp": {"format": "WEBP", "thumbnail": False},
+    "thumbnail": {"format": "PNG", "thumbnail": True},
+    "thumbnail_webp": {"format": "WEBP", "thumbnail": True},
+}
+IMAGE_VARIANT_CACHE_SIZE = 32 * 1024 * 1024  # bytes
+
+# Original images kept in memory, the least recently used ones are spilled
+# to IMAGE_SPILL_DIR (in the configuration directory) and read when served
+IMAGE_STORE_MEMORY = 8 * 1024 * 1024  # bytes
+IMAGE_SPILL_DIR = ".meteofrance_montagne_images"
+
+# Images that can be rendered locally from the bulletin instead of downloaded
+CONF_LOCAL_IMAGES = "local_images"
+LOCAL_IMAGE_TYPES = [
+    "rose_pentes",
+    "montagne_enneigement",
+]
+
+# Token pool: spread massif refreshes over every configured token
+CONF_TOKEN_POOL = "token_pool"
+TOKEN_QUOTA = 50  # requests per period and token
+TOKEN_QUOTA_PERIOD = 60  # seconds
+TOKEN_UNAUTHORIZED_COOLDOWN = 3600  # seconds before retrying a rejected token
+TOKEN_ERROR_DECAY = 0.2  # weight of the last request in the error rate
+
+# Dedicated HTTP session to the API
+HTTP_KEEPALIVE_TIMEOUT = 60  # seconds, covers a bulletin and its images
+HTTP_DNS_CACHE_TTL = 300  # seconds
+# A massif refresh sends its bulletin, then its images, one at a time, so
+# this is the number of massifs fetched at once. It does not limit the
+# request rate: TokenStats holds every token to TOKEN_QUOTA per period.
+HTTP_LIMIT_PER_HOST = 4
+
+# API health probe: results are shared for a short time between the config
+# flows and the connectivity sensor of each API entry, polled every interval
+PROBE_TTL = 60  # seconds
+PROBE_INTERVAL = 300  # seconds
+
+# Slope aspects of the bulletin's slope rose, clockwise from north
+ASPECTS = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
+
 # European avalanche risk scale (1-5)
 AVALANCHE_RISK = {
     "1": "Faible",
@@ -70,3 +146,25 @@ WEATHER_CONDITIONS = {
     90: "Orages",
     99: "Violents orages"
 }
+
+# Rolling history store, beyond the window resent by each bulletin
+CONF_HISTORY_RETENTION = "history_retention"
+DEFAULT_HISTORY_RETENTION = 14  # days
+# The history is published in state attributes, longer periods are served
+# by the archive (query_history service)
+MAX_HISTORY_RETENTION = 30  # days
+HISTORY_SAVE_DELAY = 30  # seconds
+
+# Entity states updated within this delay are written together
+STATE_WRITE_DELAY = 1  # seconds
+
+# Local bulletin archive (SQLite, stored in the config directory)
+ARCHIVE_FILENAME = "meteofrance_montagne.db"
+ARCHIVE_COMMIT_DELAY = 10  # seconds
+IMPORT_BATCH_SIZE = 200
+SERVICE_IMPORT_BULLETINS = "import_bulletins"
+SERVICE_QUERY_HISTORY = "query_history"
+QUERY_HISTORY_MAX_LIMIT = 1000
+SERVICE_LOOKUP_MASSIF = "lookup_massif"
+EVENT_IMPORT_PROGRESS = "meteofrance_montagne_import_progress"
+EVENT_BULLETIN_CHANGED = "meteofrance_montagne_bulletin_changed"
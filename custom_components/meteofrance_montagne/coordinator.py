@@ -1,91 +1,394 @@
 """Coordinator for fetching Météo-France Montagne data."""
+import asyncio
 from datetime import timedelta, datetime
 import logging
+import time
+import zlib
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-import aiohttp
 import homeassistant.util.dt as dt_util
 
 from .api import MeteoFranceMontagneApi
-from .const import DOMAIN, UPDATE_INTERVAL
+from .pool import TokenPool
+from .const import (
+    DOMAIN,
+    IMAGE_TYPES,
+    UPDATE_INTERVAL,
+    EVENT_BULLETIN_CHANGED,
+    DEFAULT_HISTORY_RETENTION,
+)
+from .diff import diff_paths
+from .history import HistoryStore
+from .image_store import ImageStore
+from .render import render_image
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class MeteoFranceMontagneDataUpdateCoordinator(DataUpdateCoordinator):
-    """Class to coordinate data updates."""
+    """Class to coordinate data updates for a massif.
+
+    A massif configured under several API entries is refreshed once for all
+    of them, falling back to the other entries' tokens on error. In pool
+    mode, any configured token can be used, the least loaded first.
+
+    Images are kept in the image store: the data holds their digests, each
+    one holding a reference released when the image is replaced.
+    """
 
     def __init__(
         self,
         hass: HomeAssistant,
-        session: aiohttp.ClientSession,
+        pool: TokenPool,
+        images: ImageStore,
         massif_id: str,
         massif_name: str,
-        token: str
     ) -> None:
         """Initialize."""
-        self.api = MeteoFranceMontagneApi(session, hass, token)
+        self.pool = pool
+        self.images = images
         self.massif_id = massif_id
         self.massif_name = massif_name
+        # Config entries sharing this massif, in subscription order
+        self.subscribers = {}
+        self.tokens = []
+        self.pool_mode = False
+        self.local_images = []
+        self.sections = None
         self.updated_at = None
+        # Data paths changed by the last refresh (None: everything)
+        self.changed_paths = None
+        # Seconds spent on the last bulletin and its images
+        self.timings = {}
+        self._images_task = None
+        # Seconds into the update interval at which this massif refreshes
+        self.phase = 0.0
+        self.history = HistoryStore(hass, massif_id)
 
         super().__init__(
             hass,
             _LOGGER,
+            # Shared between config entries, so not bound to any of them
+            config_entry=None,
             name=DOMAIN,
             update_interval=timedelta(hours=UPDATE_INTERVAL),
         )
 
+    def add_subscriber(
+        self,
+        entry_id: str,
+        token: str,
+        local_images: list[str] | None = None,
+        sections: list[str] | None = None,
+        pool_mode: bool = False,
+        history_retention: int = DEFAULT_HISTORY_RETENTION
+    ) -> bool:
+        """Add a config entry to the massif, return True if the fetch changed."""
+        self.subscribers[entry_id] = {
+            "token": token,
+            "local_images": local_images or [],
+            "sections": sections,
+            "pool_mode": pool_mode,
+            "history_retention": history_retention,
+        }
+        return self._merge_subscribers()
+
+    def remove_subscriber(self, entry_id: str) -> bool:
+        """Remove a config entry from the massif, return True if the fetch changed."""
+        self.subscribers.pop(entry_id, None)
+        return self._merge_subscribers()
+
+    def _merge_subscribers(self) -> bool:
+        """Merge the subscribers' tokens and options into a single fetch."""
+        subscribers = list(self.subscribers.values())
+        self.tokens = []
+        for subscriber in subscribers:
+            if subscriber["token"] not in self.tokens:
+                self.tokens.append(subscriber["token"])
+        self.pool_mode = any(subscriber["pool_mode"] for subscriber in subscribers)
+        self.history.retention = max(
+            [subscriber["history_retention"] for subscriber in subscribers],
+            default=DEFAULT_HISTORY_RETENTION,
+        )
+
+        # Images are rendered locally only if every subscriber wants them so
+        local_images = [
+            image_type for image_type in (subscribers[0]["local_images"] if subscribers else [])
+            if all(image_type in subscriber["local_images"] for subscriber in subscribers)
+        ]
+        # Sections are parsed if any subscriber needs them
+        sections = None
+        if subscribers and all(subscriber["sections"] is not None for subscriber in subscribers):
+            sections = sorted({
+                section for subscriber in subscribers for section in subscriber["sections"]
+            })
+
+        changed = local_images != self.local_images or sections != self.sections
+        self.local_images = local_images
+        self.sections = sections
+        if changed:
+            # Force a full fetch, images included, on the next refresh
+            self.updated_at = None
+        return changed
+
+    def set_phase(self, phase: float) -> None:
+        """Move the refreshes of this massif to a new phase of the interval."""
+        self.phase = phase
+        self.update_interval = self._next_refresh_delay()
+        if self._listeners:
+            self._schedule_refresh()
+
+    def _next_refresh_delay(self) -> timedelta:
+        """Return the delay until the next refresh slot of this massif."""
+        interval = UPDATE_INTERVAL * 3600
+        delay = (self.phase - dt_util.utcnow().timestamp()) % interval
+        return timedelta(seconds=delay or interval)
+
     async def _async_update_data(self):
-        """Fetch data from API."""
+        """Fetch data from API, falling back to the next token on error."""
         try:
-            bulletin = await self.api.bulletin(self.massif_id)
-            bulletin_date = bulletin["dateBulletin"]
-            bulletin_datetime = datetime.fromisoformat(bulletin_date)
-
-            # Check if bulletin date has changed since last update
-            if self.updated_at is not None and bulletin_datetime == self.updated_at:
-                _LOGGER.debug(
-                    "Bulletin date unchanged (%s) for massif %s, skipping image download",
-                    bulletin_date,
-                    self.massif_name
-                )
-                # Return existing data without re-downloading images
-                if self.data:
-                    return self.data
+            apis = self._candidates()
+            for index, api in enumerate(apis):
+                try:
+                    return await self._async_fetch(api)
+                except Exception as error:
+                    _LOGGER.warning(
+                        "Error fetching massif %s with token %s/%s: %s",
+                        self.massif_name,
+                        index + 1,
+                        len(apis),
+                        error
+                    )
 
-            # Bulletin has changed or first fetch, download everything
+            _LOGGER.error("Error fetching data for massif %s", self.massif_name)
+            self.changed_paths = None
+            self._release_images(self.data)
+            return None
+        finally:
+            # Stay on this massif's slot whatever the refresh duration
+            self.update_interval = self._next_refresh_delay()
+
+    def _candidates(self) -> list[MeteoFranceMontagneApi]:
+        """Return the API clients to try, in order."""
+        return self.pool.candidates(None if self.pool_mode else self.tokens)
+
+    async def _async_fetch(self, api: MeteoFranceMontagneApi):
+        """Fetch the bulletin with one token, images are loaded afterwards."""
+        started = time.monotonic()
+        bulletin = await api.bulletin(self.massif_id, self.sections)
+        bulletin_date = bulletin["dateBulletin"]
+        bulletin_datetime = datetime.fromisoformat(bulletin_date)
+
+        # Check if bulletin date has changed since last update
+        if self.updated_at is not None and bulletin_datetime == self.updated_at:
             _LOGGER.debug(
-                "Bulletin date changed (old: %s, new: %s) for massif %s, downloading images",
-                self.updated_at,
-                bulletin_datetime,
+                "Bulletin date unchanged (%s) for massif %s, skipping image download",
+                bulletin_date,
                 self.massif_name
             )
-            self.updated_at = bulletin_datetime
-
-            # Fetch different images
-            images = {
-                "rose_pentes": await self.api.rose_pentes(self.massif_id),
-                "montagne_risques": await self.api.montagne_risques(self.massif_id),
-                "montagne_enneigement": await self.api.montagne_enneigement(self.massif_id),
-                "graphe_neige_fraiche": await self.api.graphe_neige_fraiche(self.massif_id),
-                "apercu_meteo": await self.api.apercu_meteo(self.massif_id),
-                "sept_derniers_jours": await self.api.sept_derniers_jours(self.massif_id)
-            }
-
-            return {
-                "date": bulletin_date,
-                "risque": bulletin["risque"],
-                "qualite": bulletin["qualite"],
-                "enneigement": bulletin["enneigement"],
-                "neige_fraiche": bulletin["neige_fraiche"],
-                "stabilite": bulletin["stabilite"],
-                "meteo": bulletin["meteo"],
-                "massif_name": self.massif_name,
-                **images
-            }
-
-        except Exception as error:
-            _LOGGER.error("Error fetching data: %s", error)
-            return None
+            # Return existing data without re-downloading images
+            if self.data:
+                self.changed_paths = []
+                return self.data
+
+        # Bulletin has changed or first fetch, download everything
+        _LOGGER.debug(
+            "Bulletin date changed (old: %s, new: %s) for massif %s, downloading images",
+            self.updated_at,
+            bulletin_datetime,
+            self.massif_name
+        )
+        self.updated_at = bulletin_datetime
+
+        # Keep every new bulletin in the local archive
+        if archive := self.hass.data.get(DOMAIN, {}).get("archive"):
+            archive.async_add(bulletin)
+
+        # Accumulate the history beyond the bulletin window
+        bulletin = self.history.merge(bulletin)
+
+        # Images rendered locally are ready now. Downloaded ones keep their
+        # previous content (None at startup) until the background download
+        # completes, so that the refresh does not wait for them.
+        previous = self.data or {}
+        images = {}
+        for image_type in IMAGE_TYPES:
+            if image_type in self.local_images:
+                images[image_type] = await self.images.async_put(
+                    render_image(image_type, bulletin))
+            else:
+                images[image_type] = previous.get(image_type)
+        self._release_images(previous, self.local_images)
+
+        data = {
+            "date": bulletin_date,
+            "date_validite": bulletin["dateValidite"],
+            "risque": bulletin["risque"],
+            "qualite": bulletin["qualite"],
+            "enneigement": bulletin["enneigement"],
+            "neige_fraiche": bulletin["neige_fraiche"],
+            "stabilite": bulletin["stabilite"],
+            "meteo": bulletin["meteo"],
+            "massif_name": self.massif_name,
+            **images
+        }
+
+        if self.data:
+            self.changed_paths = diff_paths(self.data, data)
+            if self.changed_paths:
+                self.hass.bus.async_fire(EVENT_BULLETIN_CHANGED, {
+                    "massif": self.massif_id,
+                    "massif_name": self.massif_name,
+                    "date": bulletin_date,
+                    "changed": self.changed_paths,
+                })
+        else:
+            self.changed_paths = None
+
+        self.timings["bulletin"] = round(time.monotonic() - started, 3)
+        self._start_image_download(bulletin_date)
+        return data
+
+    def _start_image_download(self, bulletin_date: str) -> None:
+        """Download the bulletin images in the background."""
+        if self._images_task:
+            self._images_task.cancel()
+        # Not started eagerly: the refresh must store the bulletin data first
+        self._images_task = self.hass.async_create_background_task(
+            self._async_download_images(bulletin_date),
+            f"{DOMAIN} {self.massif_name} images",
+            eager_start=False,
+        )
+
+    async def _async_download_images(self, bulletin_date: str) -> None:
+        """Download every image not rendered locally, then update entities."""
+        started = time.monotonic()
+        images = {}
+        try:
+            for image_type in IMAGE_TYPES:
+                if image_type not in self.local_images:
+                    content = await self._async_download_image(image_type)
+                    images[image_type] = (
+                        None if content is None else await self.images.async_put(content))
+        except asyncio.CancelledError:
+            self._release_images(images)
+            raise
+        self.timings["images"] = round(time.monotonic() - started, 3)
+        _LOGGER.debug(
+            "Massif %s loaded: bulletin in %ss, images in %ss",
+            self.massif_name,
+            self.timings["bulletin"],
+            self.timings["images"]
+        )
+
+        if None in images.values():
+            # Retry everything on the next refresh
+            self.updated_at = None
+        if not self.data or self.data["date"] != bulletin_date:
+            self._release_images(images)
+            return
+
+        images = {key: value for key, value in images.items() if value is not None}
+        self._release_images(self.data, images)
+        data = {**self.data, **images}
+        self.changed_paths = diff_paths(self.data, data)
+        if self.changed_paths:
+            # Not async_set_updated_data: the refresh schedule is left as is
+            self.data = data
+            self.async_update_listeners()
+
+    async def _async_download_image(self, image_type: str) -> bytes | None:
+        """Download an image, falling back to the next token on error."""
+        for api in self._candidates():
+            try:
+                return await getattr(api, image_type)(self.massif_id)
+            except Exception as error:
+                _LOGGER.warning(
+                    "Error downloading %s for massif %s: %s",
+                    image_type,
+                    self.massif_name,
+                    error
+                )
+        return None
+
+    def _release_images(self, data: dict | None, image_types=IMAGE_TYPES) -> None:
+        """Release the images held by data, for the given image types."""
+        for image_type in image_types:
+            self.images.async_release((data or {}).get(image_type))
+
+    async def async_shutdown(self) -> None:
+        """Cancel any image download in progress and release the images."""
+        if self._images_task:
+            self._images_task.cancel()
+            self._images_task = None
+        self._release_images(self.data)
+        await super().async_shutdown()
+
+
+class MassifRegistry:
+    """Integration-wide coordinators, one per massif code."""
+
+    def __init__(self, hass: HomeAssistant, pool: TokenPool, images: ImageStore) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.pool = pool
+        self.images = images
+        self.coordinators = {}
+
+    async def async_subscribe(
+        self,
+        entry_id: str,
+        massif_id: str,
+        massif_name: str,
+        token: str,
+        local_images: list[str] | None = None,
+        sections: list[str] | None = None,
+        pool_mode: bool = False,
+        history_retention: int = DEFAULT_HISTORY_RETENTION
+    ) -> MeteoFranceMontagneDataUpdateCoordinator:
+        """Return the massif coordinator, refreshed for this entry."""
+        coordinator = self.coordinators.get(massif_id)
+        if coordinator is None:
+            coordinator = MeteoFranceMontagneDataUpdateCoordinator(
+                self.hass, self.pool, self.images, massif_id, massif_name)
+            self.coordinators[massif_id] = coordinator
+            coordinator.add_subscriber(
+                entry_id, token, local_images, sections, pool_mode, history_retention)
+            await coordinator.history.async_load()
+            self._spread()
+            await coordinator.async_refresh()
+        elif coordinator.add_subscriber(
+                entry_id, token, local_images, sections, pool_mode, history_retention):
+            # The entry needs more than what is fetched so far
+            await coordinator.async_refresh()
+        return coordinator
+
+    async def async_unsubscribe(self, entry_id: str, massif_id: str) -> None:
+        """Remove an entry from its massif, shutting down unused coordinators."""
+        coordinator = self.coordinators.get(massif_id)
+        if coordinator is None:
+            return
+        changed = coordinator.remove_subscriber(entry_id)
+        if not coordinator.subscribers:
+            await coordinator.async_shutdown()
+            del self.coordinators[massif_id]
+            self._spread()
+        elif changed:
+            await coordinator.async_request_refresh()
+
+    def _spread(self) -> None:
+        """Spread the massif refreshes evenly over the update interval.
+
+        Massifs are ranked by a hash of their code, so each one keeps the
+        same slot across restarts as long as the configured set is the same.
+        """
+        interval = UPDATE_INTERVAL * 3600
+        ordered = sorted(
+            self.coordinators.values(),
+            # Codes are numbers in entries created from the massif list
+            key=lambda coordinator: (
+                zlib.crc32(str(coordinator.massif_id).encode()), str(coordinator.massif_id)),
+        )
+        for index, coordinator in enumerate(ordered):
+            coordinator.set_phase(index * interval / len(ordered))
@@ -0,0 +1,42 @@
+"""Diagnostics support for Météo-France Montagne."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_TOKEN
+
+TO_REDACT = {CONF_TOKEN}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = hass.data[DOMAIN]
+    diagnostics = {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "http": data["http_stats"].as_dict() if "http_stats" in data else None,
+        "tokens": data["tokens"].as_dict(),
+        "images": data["images"].as_dict(),
+        "states": data["states"].as_dict(),
+    }
+
+    if coordinator := data.get(entry.entry_id):
+        diagnostics["massif"] = {
+            "massif_id": coordinator.massif_id,
+            "subscribers": len(coordinator.subscribers),
+            "pool_mode": coordinator.pool_mode,
+            "phase": coordinator.phase,
+            "last_update_success": coordinator.last_update_success,
+            "bulletin_date": coordinator.data.get("date") if coordinator.data else None,
+            "timings": coordinator.timings,
+        }
+
+    return diagnostics
@@ -0,0 +1,39 @@
+"""Structural diff of parsed bulletins."""
+
+
+def diff_paths(old, new, prefix=""):
+    """Return the dotted paths that differ between two bulletin structures.
+
+    Dicts are compared key by key; any other value (lists included) is
+    compared as a whole and reported under its own path, which keeps the
+    result compact when a history list shifts by one day.
+    """
+    if old is new:
+        return []
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        changed = []
+        for key in old.keys() | new.keys():
+            path = f"{prefix}.{key}" if prefix else str(key)
+            if key not in old or key not in new:
+                changed.append(path)
+            else:
+                changed.extend(diff_paths(old[key], new[key], path))
+        return sorted(changed)
+
+    if old != new:
+        return [prefix]
+    return []
+
+
+def paths_match(changed_paths, keys):
+    """Return True if a changed path touches one of the given keys.
+
+    A key matches a changed path equal to it, below it, or above it (when a
+    whole parent was replaced).
+    """
+    for path in changed_paths:
+        for key in keys:
+            if path == key or path.startswith(f"{key}.") or key.startswith(f"{path}."):
+                return True
+    return False
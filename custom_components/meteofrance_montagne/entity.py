@@ -0,0 +1,132 @@
+"""Base entity for the Météo-France Montagne integration."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN, STATE_WRITE_DELAY
+from .diff import paths_match
+
+
+class StateWriter:
+    """Write the states of updated entities together, once per burst.
+
+    Entities are queued on coordinator updates. Once the update that queued
+    them is dispatched, a single entity is written at once unless a burst is
+    in progress; several entities, or any entity within STATE_WRITE_DELAY
+    of the last write, are written after that delay, so that massifs
+    refreshing together are written in a single pass. Home Assistant drops
+    the writes that change neither state nor attributes.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the writer."""
+        self.hass = hass
+        self._pending: dict[MeteoFranceMontagneEntity, None] = {}
+        self._dispatch = None
+        self._unsub_write = None
+        self._last_write = None
+        self.written = 0
+
+    @callback
+    def async_schedule(self, entity: MeteoFranceMontagneEntity) -> None:
+        """Queue an entity for the next write."""
+        self._pending[entity] = None
+        if self._dispatch is None and self._unsub_write is None:
+            # Decide once every listener of the current update has run
+            self._dispatch = self.hass.loop.call_soon(self._async_dispatch)
+
+    @callback
+    def _async_dispatch(self) -> None:
+        """Write a lone entity now, or wait for the rest of the burst."""
+        self._dispatch = None
+        now = self.hass.loop.time()
+        quiet = self._last_write is None or now - self._last_write >= STATE_WRITE_DELAY
+        if len(self._pending) == 1 and quiet:
+            self._async_write()
+        elif self._pending:
+            self._unsub_write = async_call_later(
+                self.hass, STATE_WRITE_DELAY, self._async_write)
+
+    @callback
+    def async_cancel(self, entity: MeteoFranceMontagneEntity) -> None:
+        """Drop a removed entity from the queue."""
+        self._pending.pop(entity, None)
+
+    @callback
+    def async_flush(self, _event=None) -> None:
+        """Write the queued entities now."""
+        if self._dispatch is not None:
+            self._dispatch.cancel()
+            self._dispatch = None
+        if self._unsub_write is not None:
+            self._unsub_write()
+        self._async_write()
+
+    @callback
+    def _async_write(self, _now=None) -> None:
+        """Write the queued entities."""
+        self._unsub_write = None
+        pending, self._pending = self._pending, {}
+        for entity in pending:
+            entity.async_write_ha_state()
+        self.written += len(pending)
+        if pending:
+            self._last_write = self.hass.loop.time()
+
+    def as_dict(self) -> dict:
+        """Return the write statistics."""
+        return {
+            "written": self.written,
+            "pending": len(self._pending),
+        }
+
+
+class MeteoFranceMontagneEntity(CoordinatorEntity):
+    """Coordinator entity that only writes its state when its inputs change.
+
+    Subclasses list the coordinator data keys (or dotted paths) they are
+    built from in _data_keys. Writes go through the integration's state
+    writer.
+    """
+
+    _data_keys: tuple[str, ...] = ()
+
+    def __init__(self, coordinator) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._last_available = None
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the availability written when the entity was added."""
+        await super().async_added_to_hass()
+        self._last_available = self.available
+        writer = self.hass.data[DOMAIN]["states"]
+        self.async_on_remove(lambda: writer.async_cancel(self))
+
+    def _inputs_changed(self) -> bool:
+        """Return True if the last update touched this entity's inputs."""
+        changed_paths = self.coordinator.changed_paths
+        if changed_paths is None:
+            return True
+        return paths_match(changed_paths, self._data_keys)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Update the entity only if availability or inputs changed."""
+        available = self.available
+        if available == self._last_available and not self._inputs_changed():
+            return
+        self._last_available = available
+        self._async_handle_update()
+
+    @callback
+    def _async_handle_update(self) -> None:
+        """Update the entity and queue its state write."""
+        self._async_schedule_write()
+
+    @callback
+    def _async_schedule_write(self) -> None:
+        """Queue the state write with the other updated entities."""
+        self.hass.data[DOMAIN]["states"].async_schedule(self)
@@ -0,0 +1,169 @@
+"""Spatial index of massif polygons, from the liste-massifs GeoJSON."""
+from array import array
+import io
+import math
+
+import ijson
+
+GRID_CELL = 0.25  # degrees
+EARTH_RADIUS = 6371.0  # km
+
+
+def _cells(bbox):
+    """Return the grid cells overlapping a bounding box."""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    for x in range(math.floor(min_lon / GRID_CELL), math.floor(max_lon / GRID_CELL) + 1):
+        for y in range(math.floor(min_lat / GRID_CELL), math.floor(max_lat / GRID_CELL) + 1):
+            yield x, y
+
+
+def _polygons(geometry):
+    """Return the polygons (lists of rings) of a Polygon or MultiPolygon."""
+    if not geometry:
+        return []
+    if geometry.get("type") == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry.get("type") == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def _in_ring(ring, lon, lat):
+    """Ray casting test of a point against a flat [lon, lat, ...] ring."""
+    inside = False
+    count = len(ring) // 2
+    x1, y1 = ring[-2], ring[-1]
+    for index in range(count):
+        x2, y2 = ring[2 * index], ring[2 * index + 1]
+        if (y2 > lat) != (y1 > lat):
+            if lon < (x1 - x2) * (lat - y2) / (y1 - y2) + x2:
+                inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+class MassifIndex:
+    """Massif polygons in a bounding-box grid, with point-in-polygon lookup.
+
+    Rings are kept as flat arrays of doubles, and only the massifs whose
+    bounding box overlaps the grid cell of a point are tested.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self.massifs = []
+        self.bboxes = []
+        self.polygons = []
+        self.grid = {}
+
+    @classmethod
+    def from_geojson(cls, content):
+        """Build the index by streaming a GeoJSON document (bytes)."""
+        index = cls()
+        features = ijson.items(io.BytesIO(content), "features.item", use_float=True)
+        for feature in features:
+            index.add(feature.get("properties") or {}, feature.get("geometry"))
+        return index
+
+    def add(self, properties, geometry):
+        """Add a massif from its GeoJSON properties and geometry."""
+        polygons = [
+            [array("d", (value for point in ring for value in point[:2])) for ring in polygon]
+            for polygon in _polygons(geometry)
+        ]
+        polygons = [polygon for polygon in polygons if polygon and polygon[0]]
+        if not polygons:
+            return
+
+        lons = [lon for polygon in polygons for lon in polygon[0][0::2]]
+        lats = [lat for polygon in polygons for lat in polygon[0][1::2]]
+        bbox = (min(lons), min(lats), max(lons), max(lats))
+
+        departments = []
+        for key in ("Departemen", "departement", "Departement", "Dep2", "dep2", "Departement2"):
+            if properties.get(key) and properties[key] not in departments:
+                departments.append(properties[key])
+
+        position = len(self.massifs)
+        self.massifs.append({
+            "code": properties.get("code"),
+            "title": properties.get("title", "Unknown"),
+            "departments": departments,
+        })
+        self.bboxes.append(bbox)
+        self.polygons.append(polygons)
+        for cell in _cells(bbox):
+            self.grid.setdefault(cell, []).append(position)
+
+    def __len__(self):
+        """Return the number of indexed massifs."""
+        return len(self.massifs)
+
+    def _contains(self, position, lat, lon):
+        """Return True if a massif contains a point (holes excluded)."""
+        min_lon, min_lat, max_lon, max_lat = self.bboxes[position]
+        if not (min_lon <= lon <= max_lon and min_lat <= lat <= max_lat):
+            return False
+        for outer, *holes in self.polygons[position]:
+            if _in_ring(outer, lon, lat) and not any(_in_ring(hole, lon, lat) for hole in holes):
+                return True
+        return False
+
+    def find(self, lat, lon):
+        """Return the massif containing a point, or None."""
+        cell = (math.floor(lon / GRID_CELL), math.floor(lat / GRID_CELL))
+        for position in self.grid.get(cell, []):
+            if self._contains(position, lat, lon):
+                return {**self.massifs[position], "inside": True, "distance": 0.0}
+        return None
+
+    def nearest(self, lat, lon):
+        """Return the massif containing a point, or else the nearest one.
+
+        The distance (km) to the massif boundary is approximated with an
+        equirectangular projection, accurate enough at massif scale.
+        """
+        if found := self.find(lat, lon):
+            return found
+
+        scale = math.cos(math.radians(lat))
+
+        def project(x, y):
+            return (
+                math.radians(x - lon) * scale * EARTH_RADIUS,
+                math.radians(y - lat) * EARTH_RADIUS,
+            )
+
+        def bbox_distance(position):
+            min_lon, min_lat, max_lon, max_lat = self.bboxes[position]
+            return math.hypot(*project(
+                min(max(lon, min_lon), max_lon), min(max(lat, min_lat), max_lat)))
+
+        best, best_distance = None, math.inf
+        # The bounding box distance is a lower bound: stop once it exceeds the best
+        for position in sorted(range(len(self.massifs)), key=bbox_distance):
+            if bbox_distance(position) >= best_distance:
+                break
+            for polygon in self.polygons[position]:
+                for ring in polygon:
+                    distance = _ring_distance(ring, project)
+                    if distance < best_distance:
+                        best, best_distance = position, distance
+
+        if best is None:
+            return None
+        return {**self.massifs[best], "inside": False, "distance": round(best_distance, 2)}
+
+
+def _ring_distance(ring, project):
+    """Return the distance from the origin to a ring, in projected units."""
+    best = math.inf
+    x1, y1 = project(ring[-2], ring[-1])
+    for index in range(len(ring) // 2):
+        x2, y2 = project(ring[2 * index], ring[2 * index + 1])
+        dx, dy = x2 - x1, y2 - y1
+        length = dx * dx + dy * dy
+        t = 0.0 if length == 0 else max(0.0, min(1.0, -(x1 * dx + y1 * dy) / length))
+        best = min(best, math.hypot(x1 + t * dx, y1 + t * dy))
+        x1, y1 = x2, y2
+    return best
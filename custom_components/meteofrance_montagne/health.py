@@ -0,0 +1,99 @@
+"""Health probe of the Météo-France Montagne API."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant, callback
+import homeassistant.util.dt as dt_util
+
+from .api import (
+    MeteoFranceMontagneApi,
+    MeteoFranceMontagneApiError,
+    MeteoFranceMontagneAuthError,
+    MeteoFranceMontagneRateLimitError,
+)
+from .const import DOMAIN, PROBE_TTL
+from .session import async_get_session
+
+
+@callback
+def async_get_health_probe(hass: HomeAssistant) -> HealthProbe:
+    """Return the integration's health probe, created on first use."""
+    data = hass.data.setdefault(DOMAIN, {})
+    if "health" not in data:
+        data["health"] = HealthProbe(hass, async_get_session(hass))
+    return data["health"]
+
+
+class HealthProbe:
+    """Token checks with the cheapest authenticated request, cached briefly.
+
+    Results are shared for PROBE_TTL between the config flows and the
+    connectivity sensors, with the measured latency and the quota headroom
+    of configured tokens. Connection failures are not cached.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        session: aiohttp.ClientSession,
+        ttl: float = PROBE_TTL,
+        clock=time.monotonic,
+    ) -> None:
+        """Initialize the probe."""
+        self.hass = hass
+        self.session = session
+        self.ttl = ttl
+        self.clock = clock
+        self._results = {}
+
+    def _api(self, token: str) -> MeteoFranceMontagneApi:
+        """Return the client of a configured token, or a bare one."""
+        pool = self.hass.data[DOMAIN].get("tokens")
+        if pool is not None and token in pool.configured_tokens():
+            # Counted in the token's quota like any other request
+            return pool.api(token)
+        transport = pool.transport if pool is not None else None
+        return MeteoFranceMontagneApi(self.session, self.hass, token, transport=transport)
+
+    async def async_probe(self, token: str, force: bool = False) -> dict:
+        """Return the health of the API with a token.
+
+        error is None when the token is accepted, else one of invalid_auth,
+        rate_limited (the token is valid but out of quota) or cannot_connect.
+        """
+        cached = self._results.get(token)
+        if cached and not force and self.clock() - cached[0] < self.ttl:
+            return cached[1]
+
+        api = self._api(token)
+        started = self.clock()
+        status, error = 200, None
+        try:
+            await api.probe()
+        except MeteoFranceMontagneAuthError as err:
+            status, error = err.status, "invalid_auth"
+        except MeteoFranceMontagneRateLimitError as err:
+            status, error = err.status, "rate_limited"
+        except MeteoFranceMontagneApiError as err:
+            status, error = err.status, "cannot_connect"
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            status, error = None, "cannot_connect"
+
+        result = {
+            "ok": error is None,
+            "error": error,
+            "status": status,
+            "latency_ms": round((self.clock() - started) * 1000),
+            "headroom": api.stats.headroom() if api.stats else None,
+            "checked_at": dt_util.utcnow().isoformat(),
+        }
+        if error == "cannot_connect":
+            # Likely transient: checked again on the next call
+            self._results.pop(token, None)
+        else:
+            self._results[token] = (self.clock(), result)
+        return result
@@ -0,0 +1,107 @@
+"""Rolling per-massif store of the bulletin history (BSH)."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, DEFAULT_HISTORY_RETENTION, HISTORY_SAVE_DELAY
+
+STORAGE_VERSION = 1
+
+# Stored history: section of the bulletin and key of its history list
+HISTORY_LISTS = {
+    "historique_risque": ("risque", "historique"),
+    "historique_enneigement": ("enneigement", "historique"),
+    "historique_neige_fraiche": ("neige_fraiche", "historique"),
+    "historique_meteo": ("meteo", "echeances_historique"),
+}
+
+
+class HistoryStore:
+    """History of a massif, accumulated beyond the window of a bulletin.
+
+    Each bulletin resends the last days: only the dates not seen before are
+    added, so the work per refresh depends on the window, not on the stored
+    history, which is bounded by the retention.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        massif_id: str,
+        retention: int = DEFAULT_HISTORY_RETENTION,
+    ) -> None:
+        """Initialize."""
+        self.retention = retention
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.history_{massif_id}")
+        # Entries by date, per history list
+        self._entries = {name: {} for name in HISTORY_LISTS}
+        # Sorted lists, rebuilt only when entries change
+        self._lists = {name: [] for name in HISTORY_LISTS}
+
+    async def async_load(self) -> None:
+        """Load the stored history."""
+        if stored := await self._store.async_load():
+            for name in HISTORY_LISTS:
+                self._entries[name] = {
+                    entry["date"]: entry for entry in stored.get(name, [])
+                }
+                self._sort(name)
+
+    async def async_remove(self) -> None:
+        """Delete the stored history."""
+        await self._store.async_remove()
+
+    def _sort(self, name: str) -> None:
+        """Rebuild the sorted list of a history."""
+        self._lists[name] = [
+            self._entries[name][date] for date in sorted(self._entries[name])
+        ]
+
+    def _prune(self, name: str) -> bool:
+        """Drop entries older than the retention, return True if any."""
+        entries = self._entries[name]
+        if not entries:
+            return False
+        latest = datetime.fromisoformat(max(entries))
+        cutoff = (latest - timedelta(days=self.retention)).isoformat()
+        expired = [date for date in entries if date < cutoff]
+        for date in expired:
+            del entries[date]
+        return bool(expired)
+
+    def merge(self, bulletin: dict) -> dict:
+        """Merge the history of a bulletin and return it with the full history.
+
+        Sections not parsed (missing history keys) are left as they are. The
+        bulletin itself is not modified, as it may still be queued for the
+        archive.
+        """
+        merged = dict(bulletin)
+        changed = False
+        for name, (section, key) in HISTORY_LISTS.items():
+            if key not in bulletin.get(section, {}):
+                continue
+
+            entries = self._entries[name]
+            added = False
+            for entry in bulletin[section][key]:
+                if entry.get("date") and entry["date"] not in entries:
+                    entries[entry["date"]] = entry
+                    added = True
+            if added:
+                self._prune(name)
+                self._sort(name)
+                changed = True
+
+            merged[section] = {**bulletin[section], key: self._lists[name]}
+
+        if changed:
+            self._store.async_delay_save(self._data_to_save, HISTORY_SAVE_DELAY)
+        return merged
+
+    def _data_to_save(self) -> dict:
+        """Return the history to store."""
+        return dict(self._lists)
@@ -2,27 +2,42 @@
 from __future__ import annotations
 
 import logging
+from pathlib import Path
 from typing import Any
 import secrets
-from homeassistant.components.image import ImageEntity, Image
+from homeassistant.components.image import ImageEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-)
 
-from .const import DOMAIN, IMAGE_TYPES
+from .const import (
+    DOMAIN,
+    IMAGE_TYPES,
+    IMAGE_VARIANTS,
+    CONF_IMAGE_VARIANT,
+    CONF_THUMBNAIL_SIZE,
+    DEFAULT_IMAGE_VARIANT,
+    DEFAULT_THUMBNAIL_SIZE,
+)
 from .coordinator import MeteoFranceMontagneDataUpdateCoordinator
+from .entity import MeteoFranceMontagneEntity
+from .image_store import read_spilled
+from .render import SVG_CONTENT_TYPE, render_placeholder
+from .variants import content_hash, variant_content_type
 
 _LOGGER = logging.getLogger(__name__)
 
+PLACEHOLDER = render_placeholder()
+PLACEHOLDER_HASH = content_hash(PLACEHOLDER)
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up the Météo-France Montagne image platform."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
+    variant = entry.options.get(CONF_IMAGE_VARIANT, DEFAULT_IMAGE_VARIANT)
+    thumbnail_size = entry.options.get(CONF_THUMBNAIL_SIZE, DEFAULT_THUMBNAIL_SIZE)
 
     entities = []
 
@@ -30,51 +45,163 @@ async def async_setup_entry(
         entities.append(
             MeteoFranceMontagneImage(
                 coordinator,
-                image_type
+                entry.entry_id,
+                image_type,
+                variant,
+                thumbnail_size
             )
         )
 
     async_add_entities(entities)
 
 
-class MeteoFranceMontagneImage(CoordinatorEntity, ImageEntity):
+class MeteoFranceMontagneImage(MeteoFranceMontagneEntity, ImageEntity):
     """Representation of a Météo-France Montagne image."""
 
-    _attr_content_type = "image/png"
-
     def __init__(
         self,
         coordinator: MeteoFranceMontagneDataUpdateCoordinator,
+        entry_id: str,
         image_type: str,
+        variant: str = DEFAULT_IMAGE_VARIANT,
+        thumbnail_size: int = DEFAULT_THUMBNAIL_SIZE,
     ) -> None:
         """Initialize the image entity."""
         super().__init__(coordinator)
+        self._entry_id = entry_id
         self._image_type = image_type
+        self._data_keys = (image_type,)
+        self._content_hash = None
+        self._placeholder = False
+        self._variant = variant
+        self._thumbnail_size = thumbnail_size
         self._attr_unique_id = f"{coordinator.massif_id}_{image_type}"
         self._attr_name = f"{coordinator.massif_name} {
             image_type.replace('_', ' ').title()}"
         self._access_tokens = [secrets.token_hex()]
         self._attr_image_last_updated = coordinator.updated_at
         if coordinator.data is not None:
-            self._cached_image = Image(
-                "image/png", coordinator.data.get(image_type))
+            self._set_image(coordinator.data.get(image_type))
+
+    def _set_image(self, digest: str | None) -> None:
+        """Point to the image in the image store, by content hash.
+
+        A placeholder is shown while the image is still downloading.
+        """
+        self._placeholder = digest is None
+        self._content_hash = PLACEHOLDER_HASH if self._placeholder else digest
+
+    async def async_added_to_hass(self) -> None:
+        """Register the entity with the image view."""
+        await super().async_added_to_hass()
+        key = (self._entry_id, self._image_type)
+        image_entities = self.hass.data[DOMAIN]["image_entities"]
+        image_entities[key] = self
+        self.async_on_remove(lambda: image_entities.pop(key, None))
 
     @callback
-    def _handle_coordinator_update(self) -> None:
+    def _async_handle_update(self) -> None:
         """Handle updated data from the coordinator."""
-        if self.coordinator.data and self.coordinator.data.get(self._image_type):
+        if self.coordinator.data:
             self._attr_image_last_updated = self.coordinator.updated_at
-            self._cached_image = Image(
-                "image/png", self.coordinator.data.get(self._image_type))
-            self.async_write_ha_state()
+            self._set_image(self.coordinator.data.get(self._image_type))
+            self._async_schedule_write()
+
+    @property
+    def _local(self) -> bool:
+        """Return True if the image is rendered locally.
+
+        Locally rendered images are SVG and served as is, whatever the variant.
+        """
+        return self._image_type in self.coordinator.local_images
+
+    @property
+    def _as_is(self) -> bool:
+        """Return True if the image is SVG, served without variants."""
+        return self._local or self._placeholder
 
     @property
     def access_tokens(self) -> list[str]:
         """Return access tokens."""
         return self._access_tokens
 
+    @property
+    def entity_picture(self) -> str:
+        """Serve the image through the cache-friendly image view.
+
+        The URL keeps the entity's first access token so it stays stable
+        between token rotations, and changes with the image content.
+        """
+        url = (
+            f"/api/meteofrance_montagne/image/{self._entry_id}/{self._image_type}"
+            f"?token={self._access_tokens[0]}"
+        )
+        if self._content_hash:
+            url += f"&v={self._content_hash[:12]}"
+        return url
+
+    @property
+    def content_type(self) -> str:
+        """Return the content type of the default variant.
+
+        Not fixed at creation: placeholders and locally rendered images are
+        SVG, and images become local when another entry asks for it.
+        """
+        return self.variant_content_type(self._variant)
+
+    @property
+    def variant(self) -> str:
+        """Return the default variant served by this entity."""
+        return self._variant
+
+    @property
+    def date_validite(self) -> str | None:
+        """Return the validity date of the current bulletin.
+
+        None for a placeholder, which must not be cached.
+        """
+        if not self.coordinator.data or self._placeholder:
+            return None
+        return self.coordinator.data.get("date_validite")
+
+    def variant_content_type(self, variant: str) -> str:
+        """Return the content type served for a variant."""
+        if self._as_is:
+            return SVG_CONTENT_TYPE
+        return variant_content_type(variant)
+
+    def variant_etag(self, variant: str) -> str | None:
+        """Return the strong ETag of a variant of the current image."""
+        if not self._content_hash:
+            return None
+        if self._as_is:
+            return f'"{self._content_hash}-svg"'
+        if IMAGE_VARIANTS[variant]["thumbnail"]:
+            return f'"{self._content_hash}-{variant}-{self._thumbnail_size}"'
+        return f'"{self._content_hash}-{variant}"'
+
+    async def async_image_variant(self, variant: str) -> bytes | None:
+        """Return bytes of the image in the given variant.
+
+        Images spilled to disk are read from their file, per request.
+        None if the image was replaced, and its file deleted, meanwhile.
+        """
+        if not self._content_hash:
+            return None
+        if self._placeholder:
+            return PLACEHOLDER
+        source = self.hass.data[DOMAIN]["images"].source(self._content_hash)
+        try:
+            if source is not None and not self._as_is:
+                # Variants are transcoded once per image content and shared
+                source = await self.hass.data[DOMAIN]["image_variants"].async_get(
+                    source, variant, self._thumbnail_size, digest=self._content_hash)
+            if isinstance(source, Path):
+                return await self.hass.async_add_executor_job(read_spilled, source)
+        except FileNotFoundError:
+            return None
+        return source
+
     async def async_image(self) -> bytes | None:
         """Return bytes of image."""
-        if hasattr(self, '_cached_image') and self._cached_image:
-            return self._cached_image.content
-        return None
+        return await self.async_image_variant(self._variant)
@@ -0,0 +1,144 @@
+"""Memory-bounded store of the original images of every massif."""
+from __future__ import annotations
+
+from collections import OrderedDict
+import logging
+from pathlib import Path
+import shutil
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import IMAGE_STORE_MEMORY
+from .variants import content_hash
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def read_spilled(path: Path) -> bytes:
+    """Read a spilled image. Blocking.
+
+    The bytes are needed anyway to serve the image, so the file is read in
+    a single call rather than copied out of a memory map.
+    """
+    return path.read_bytes()
+
+
+class ImageStore:
+    """Images by content hash, within a memory budget.
+
+    The most recently used images stay in memory, the others are spilled to
+    disk and read back when served, so resident memory no longer
+    grows with the number of massifs. Images are reference counted by the
+    coordinators and deleted once no massif uses them.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, directory: str, max_size: int = IMAGE_STORE_MEMORY
+    ) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self._size = 0
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        # Evicted images being written to disk, still readable
+        self._spilling: dict[str, bytes] = {}
+        self._spilled: set[str] = set()
+        self._refs: dict[str, int] = {}
+
+    def setup(self) -> None:
+        """Create an empty spill directory. Blocking."""
+        # Spilled images do not survive a restart: coordinators fetch again
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, digest: str) -> Path:
+        """Return the spill file of an image."""
+        return self.directory / digest
+
+    async def async_put(self, content: bytes) -> str:
+        """Store an image and return its digest, taking a reference."""
+        digest = content_hash(content)
+        self._refs[digest] = self._refs.get(digest, 0) + 1
+        if digest in self._memory:
+            self._memory.move_to_end(digest)
+        elif digest not in self._spilled and digest not in self._spilling:
+            self._memory[digest] = content
+            self._size += len(content)
+            await self._async_evict()
+        return digest
+
+    @callback
+    def async_release(self, digest: str | None) -> None:
+        """Drop a reference to an image, deleting it when unused."""
+        if digest not in self._refs:
+            return
+        self._refs[digest] -= 1
+        if self._refs[digest] > 0:
+            return
+
+        del self._refs[digest]
+        if (content := self._memory.pop(digest, None)) is not None:
+            self._size -= len(content)
+        if digest in self._spilled:
+            self._spilled.discard(digest)
+            self.hass.async_add_executor_job(self._path(digest).unlink, True)
+
+    async def _async_evict(self) -> None:
+        """Spill the least recently used images over the memory budget."""
+        while self._size > self.max_size and len(self._memory) > 1:
+            digest, content = self._memory.popitem(last=False)
+            self._size -= len(content)
+            self._spilling[digest] = content
+            try:
+                await self.hass.async_add_executor_job(self._path(digest).write_bytes, content)
+            except OSError as err:
+                # Keep the image in memory rather than losing it
+                _LOGGER.warning("Error spilling image to %s: %s", self.directory, err)
+                self._memory[digest] = content
+                self._size += len(content)
+                return
+            finally:
+                self._spilling.pop(digest, None)
+            if digest in self._refs:
+                self._spilled.add(digest)
+            else:
+                # Released while being written
+                await self.hass.async_add_executor_job(self._path(digest).unlink, True)
+
+    def path(self, digest: str) -> Path | None:
+        """Return the spill file of an image not in memory, if any."""
+        if digest in self._spilled and digest not in self._memory:
+            return self._path(digest)
+        return None
+
+    def source(self, digest: str) -> bytes | Path | None:
+        """Return the content of an image in memory, or else its spill file."""
+        if digest in self._memory:
+            self._memory.move_to_end(digest)
+            return self._memory[digest]
+        if digest in self._spilling:
+            return self._spilling[digest]
+        return self.path(digest)
+
+    async def async_get(self, digest: str) -> bytes | None:
+        """Return the content of an image.
+
+        None if the image is released, and its file deleted, while read.
+        """
+        source = self.source(digest)
+        if isinstance(source, Path):
+            try:
+                return await self.hass.async_add_executor_job(read_spilled, source)
+            except FileNotFoundError:
+                return None
+        return source
+
+    def as_dict(self) -> dict:
+        """Return the memory use of the store."""
+        return {
+            "memory_images": len(self._memory),
+            "memory_bytes": self._size,
+            "memory_budget": self.max_size,
+            "spilled_images": len(self._spilled),
+        }
@@ -0,0 +1,162 @@
+"""Bulk import of archived BRA bulletins into the local archive.
+
+Can be used from the ``import_bulletins`` service or as an offline command:
+
+    python -m custom_components.meteofrance_montagne.importer <dir|tarball> --db <path>
+"""
+import argparse
+import concurrent.futures
+import hashlib
+import logging
+import multiprocessing
+import os
+import tarfile
+
+from lxml import etree
+
+from .api import MeteoFranceMontagneApi
+from .archive import BulletinArchive
+from .const import IMPORT_BATCH_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _iter_sources(path):
+    """Yield (name, content) for every XML bulletin under path."""
+    if os.path.isdir(path):
+        for dirpath, _dirnames, filenames in os.walk(path):
+            for filename in sorted(filenames):
+                if not filename.lower().endswith(".xml"):
+                    continue
+                full_path = os.path.join(dirpath, filename)
+                with open(full_path, "rb") as f:
+                    yield full_path, f.read()
+        return
+
+    with tarfile.open(path, "r:*") as tar:
+        for member in tar:
+            if not member.isfile() or not member.name.lower().endswith(".xml"):
+                continue
+            yield f"{path}:{member.name}", tar.extractfile(member).read()
+
+
+def _source_key(content):
+    """Return the key recording a bulletin as imported.
+
+    Bulletins are keyed by content, so that archives of several seasons
+    using the same file names are all imported, and a bulletin found
+    twice is imported once.
+    """
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def _parse_source(name, key, content):
+    """Parse one bulletin in a worker process."""
+    try:
+        xml_doc = etree.fromstring(content)
+        return name, key, MeteoFranceMontagneApi.parse_bulletin_xml(xml_doc), None
+    except Exception as err:  # pylint: disable=broad-except
+        return name, key, None, str(err)
+
+
+def import_bulletins(path, archive_path, workers=None, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """Parse every bulletin under path in a process pool and archive them.
+
+    Bulletins already recorded in the archive are skipped, so an
+    interrupted import can simply be restarted. Returns a summary dict.
+    """
+    archive = BulletinArchive(archive_path).open()
+    summary = {"imported": 0, "skipped": 0, "errors": 0}
+    try:
+        skip = archive.imported_sources()
+        workers = workers or os.cpu_count() or 1
+        max_in_flight = workers * 4
+
+        batch, batch_sources = [], []
+
+        def flush():
+            archive.write_batch(batch, batch_sources)
+            summary["imported"] += len(batch)
+            batch.clear()
+            batch_sources.clear()
+            if progress is not None:
+                progress(dict(summary))
+
+        # Called from a Home Assistant executor thread: forking the
+        # multi-threaded process could deadlock the workers on inherited locks
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            pending = set()
+            sources = _iter_sources(path)
+            exhausted = False
+
+            while pending or not exhausted:
+                # Keep a bounded number of bulletins in flight so that large
+                # tarballs are streamed instead of loaded in memory at once.
+                while not exhausted and len(pending) < max_in_flight:
+                    try:
+                        name, content = next(sources)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    key = _source_key(content)
+                    if key in skip:
+                        # Imported by an earlier run, or found twice
+                        summary["skipped"] += 1
+                        continue
+                    skip.add(key)
+                    pending.add(executor.submit(_parse_source, name, key, content))
+
+                if not pending:
+                    break
+
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    name, key, bulletin, error = future.result()
+                    if error is not None:
+                        _LOGGER.warning("Unable to parse bulletin %s: %s", name, error)
+                        summary["errors"] += 1
+                        continue
+                    batch.append(bulletin)
+                    batch_sources.append(key)
+
+                if len(batch) >= batch_size:
+                    flush()
+
+        if batch:
+            flush()
+    finally:
+        archive.close()
+
+    return summary
+
+
+def main(argv=None):
+    """Run the importer from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="Directory or tarball of XML bulletins")
+    parser.add_argument("--db", required=True, help="Path of the SQLite archive")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    summary = import_bulletins(
+        args.source,
+        args.db,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        progress=lambda s: _LOGGER.info(
+            "Imported %s bulletins (%s errors)", s["imported"], s["errors"]),
+    )
+    _LOGGER.info(
+        "Done: %s imported, %s already present, %s errors",
+        summary["imported"], summary["skipped"], summary["errors"],
+    )
+
+
+if __name__ == "__main__":
+    main()
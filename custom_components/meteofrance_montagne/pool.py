@@ -0,0 +1,142 @@
+"""Token pool spreading API requests over every configured token."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import time
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+
+from .api import MeteoFranceMontagneApi
+from .const import (
+    DOMAIN,
+    CONF_TOKEN,
+    TOKEN_QUOTA,
+    TOKEN_QUOTA_PERIOD,
+    TOKEN_UNAUTHORIZED_COOLDOWN,
+    TOKEN_ERROR_DECAY,
+)
+
+
+class TokenStats:
+    """Quota headroom and error rate of a token, with its rate limiter."""
+
+    def __init__(
+        self,
+        quota: int = TOKEN_QUOTA,
+        period: float = TOKEN_QUOTA_PERIOD,
+        clock=time.monotonic,
+    ) -> None:
+        """Initialize."""
+        self.quota = quota
+        self.period = period
+        self.clock = clock
+        self.requests = deque()
+        self.error_rate = 0.0
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _expire(self, now: float) -> None:
+        """Forget requests older than the quota period."""
+        while self.requests and self.requests[0] <= now - self.period:
+            self.requests.popleft()
+
+    def headroom(self) -> int:
+        """Return the requests left in the current period."""
+        self._expire(self.clock())
+        return self.quota - len(self.requests)
+
+    @property
+    def blocked(self) -> bool:
+        """Return True if the token was rejected or throttled recently."""
+        return self.clock() < self.blocked_until
+
+    def score(self) -> float:
+        """Return how suitable the token is for the next refresh."""
+        return self.headroom() * (1 - self.error_rate)
+
+    async def async_acquire(self) -> None:
+        """Wait until a request fits in the quota, then count it."""
+        async with self._lock:
+            while True:
+                now = self.clock()
+                self._expire(now)
+                if len(self.requests) < self.quota:
+                    self.requests.append(now)
+                    return
+                await asyncio.sleep(self.requests[0] + self.period - now)
+
+    def record(self, status: int | None, retry_after: str | None = None) -> None:
+        """Record the outcome of a request (status None for network errors)."""
+        failed = status is None or status >= 400
+        self.error_rate += TOKEN_ERROR_DECAY * (failed - self.error_rate)
+
+        if status == 401:
+            self.blocked_until = self.clock() + TOKEN_UNAUTHORIZED_COOLDOWN
+        elif status == 429:
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = self.period
+            self.blocked_until = self.clock() + delay
+
+
+class TokenPool:
+    """API clients and statistics for every configured token."""
+
+    def __init__(
+        self, hass: HomeAssistant, session: aiohttp.ClientSession, transport=None
+    ) -> None:
+        """Initialize, optionally with a transport shared by every client."""
+        self.hass = hass
+        self.session = session
+        self.transport = transport
+        self.stats = {}
+        self._apis = {}
+
+    def api(self, token: str) -> MeteoFranceMontagneApi:
+        """Return the API client of a token, sharing its statistics."""
+        if token not in self._apis:
+            self.stats[token] = TokenStats()
+            self._apis[token] = MeteoFranceMontagneApi(
+                self.session, self.hass, token, self.stats[token], self.transport)
+        return self._apis[token]
+
+    def configured_tokens(self) -> list[str]:
+        """Return the tokens of every API entry."""
+        tokens = []
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            token = entry.data.get(CONF_TOKEN)
+            if token and token not in tokens:
+                tokens.append(token)
+        return tokens
+
+    def candidates(self, tokens: list[str] | None = None) -> list[MeteoFranceMontagneApi]:
+        """Return the API clients to try, in order.
+
+        Given tokens keep their order (the first one is preferred). Without
+        tokens, every configured token is ranked by quota headroom and error
+        rate. Blocked tokens are always tried last.
+        """
+        if tokens is None:
+            apis = sorted(
+                (self.api(token) for token in self.configured_tokens()),
+                key=lambda api: api.stats.score(),
+                reverse=True,
+            )
+        else:
+            apis = [self.api(token) for token in tokens]
+        return sorted(apis, key=lambda api: api.stats.blocked)
+
+    def as_dict(self) -> dict:
+        """Return the statistics of every token, the tokens left out."""
+        return {
+            f"token_{index + 1}": {
+                "headroom": stats.headroom(),
+                "error_rate": round(stats.error_rate, 3),
+                "blocked": stats.blocked,
+            }
+            for index, stats in enumerate(self.stats.values())
+        }
@@ -0,0 +1,135 @@
+"""Local SVG rendering of bulletin charts.
+
+Replaces the `rose-pentes` and `montagne-enneigement` API images with
+charts drawn from the parsed bulletin, saving two requests per bulletin.
+"""
+import math
+from xml.sax.saxutils import escape
+
+from .const import ASPECTS, AVALANCHE_RISK_COLORS
+
+SVG_CONTENT_TYPE = "image/svg+xml"
+
+SAFE_COLOR = "#E6E6E6"
+STROKE_COLOR = "#555555"
+TEXT_COLOR = "#333333"
+NORD_COLOR = "#3F7FBF"
+SUD_COLOR = "#E0A030"
+
+
+def _svg(width, height, body):
+    """Wrap SVG elements in a document."""
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="sans-serif">{"".join(body)}</svg>'
+    ).encode("utf-8")
+
+
+def render_rose_pentes(risque):
+    """Render the slope rose: dangerous aspects are filled with the risk color."""
+    pentes = risque.get("pentes_particulieres") or {}
+    color = AVALANCHE_RISK_COLORS.get(str(risque.get("risque_max")), "#FF9900")
+    size, center, radius = 220, 110, 80
+
+    body = []
+    for index, aspect in enumerate(ASPECTS):
+        # Each aspect is a 45° wedge centered on its direction, N at the top
+        start = math.radians(index * 45 - 22.5 - 90)
+        end = math.radians(index * 45 + 22.5 - 90)
+        x1, y1 = center + radius * math.cos(start), center + radius * math.sin(start)
+        x2, y2 = center + radius * math.cos(end), center + radius * math.sin(end)
+        fill = color if pentes.get(aspect) else SAFE_COLOR
+        body.append(
+            f'<path d="M{center},{center} L{x1:.1f},{y1:.1f} '
+            f'A{radius},{radius} 0 0,1 {x2:.1f},{y2:.1f} Z" '
+            f'fill="{fill}" stroke="{STROKE_COLOR}" stroke-width="1"/>'
+        )
+
+        label_angle = math.radians(index * 45 - 90)
+        lx = center + (radius + 16) * math.cos(label_angle)
+        ly = center + (radius + 16) * math.sin(label_angle)
+        body.append(
+            f'<text x="{lx:.1f}" y="{ly:.1f}" font-size="12" fill="{TEXT_COLOR}" '
+            f'text-anchor="middle" dominant-baseline="middle">{aspect}</text>'
+        )
+
+    altitude = risque.get("altitude_limite")
+    if altitude is not None:
+        body.append(
+            f'<text x="{center}" y="{center}" font-size="11" fill="{TEXT_COLOR}" '
+            f'text-anchor="middle" dominant-baseline="middle">{escape(str(altitude))} m</text>'
+        )
+
+    return _svg(size, size, body)
+
+
+def render_enneigement(enneigement):
+    """Render snow depth per altitude, north and south facing slopes."""
+    niveaux = [
+        niveau for niveau in enneigement.get("niveaux", [])
+        if niveau.get("altitude") is not None
+    ]
+    niveaux.sort(key=lambda niveau: niveau["altitude"], reverse=True)
+
+    width, row_height, top = 320, 28, 30
+    height = top + row_height * max(len(niveaux), 1) + 30
+    axis_x, bar_width = width // 2, width // 2 - 60
+    max_depth = max(
+        [niveau.get(key) or 0 for niveau in niveaux for key in ("nord", "sud")] + [1]
+    )
+
+    body = [
+        f'<text x="{axis_x - 10}" y="18" font-size="12" fill="{NORD_COLOR}" text-anchor="end">Nord</text>',
+        f'<text x="{axis_x + 10}" y="18" font-size="12" fill="{SUD_COLOR}">Sud</text>',
+        f'<line x1="{axis_x}" y1="{top - 4}" x2="{axis_x}" y2="{height - 30}" stroke="{STROKE_COLOR}"/>',
+    ]
+
+    for index, niveau in enumerate(niveaux):
+        y = top + index * row_height
+        nord = max(niveau.get("nord") or 0, 0)
+        sud = max(niveau.get("sud") or 0, 0)
+        nord_width = bar_width * nord / max_depth
+        sud_width = bar_width * sud / max_depth
+        body.extend([
+            f'<rect x="{axis_x - nord_width:.1f}" y="{y}" width="{nord_width:.1f}" '
+            f'height="{row_height - 8}" fill="{NORD_COLOR}"/>',
+            f'<rect x="{axis_x}" y="{y}" width="{sud_width:.1f}" '
+            f'height="{row_height - 8}" fill="{SUD_COLOR}"/>',
+            f'<text x="4" y="{y + row_height / 2:.1f}" font-size="11" fill="{TEXT_COLOR}">'
+            f'{niveau["altitude"]} m</text>',
+            f'<text x="{width - 4}" y="{y + row_height / 2:.1f}" font-size="11" fill="{TEXT_COLOR}" '
+            f'text-anchor="end">{nord}/{sud} cm</text>',
+        ])
+
+    limites = []
+    if enneigement.get("limite_nord") is not None:
+        limites.append(f"Limite N : {enneigement['limite_nord']} m")
+    if enneigement.get("limite_sud") is not None:
+        limites.append(f"Limite S : {enneigement['limite_sud']} m")
+    body.append(
+        f'<text x="{axis_x}" y="{height - 10}" font-size="11" fill="{TEXT_COLOR}" '
+        f'text-anchor="middle">{escape(" - ".join(limites))}</text>'
+    )
+
+    return _svg(width, height, body)
+
+
+def render_placeholder():
+    """Render the image shown while the real one is downloading."""
+    width, height = 320, 200
+    return _svg(width, height, [
+        f'<rect width="{width}" height="{height}" fill="{SAFE_COLOR}"/>',
+        f'<text x="{width // 2}" y="{height // 2}" font-size="14" fill="{TEXT_COLOR}" '
+        f'text-anchor="middle" dominant-baseline="middle">Chargement…</text>',
+    ])
+
+
+RENDERERS = {
+    "rose_pentes": lambda bulletin: render_rose_pentes(bulletin["risque"]),
+    "montagne_enneigement": lambda bulletin: render_enneigement(bulletin["enneigement"]),
+}
+
+
+def render_image(image_type, bulletin):
+    """Render an image type from a parsed bulletin as SVG bytes."""
+    return RENDERERS[image_type](bulletin)
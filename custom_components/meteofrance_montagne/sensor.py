@@ -14,14 +14,29 @@ from homeassistant.const import UnitOfLength
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-)
 
 from .const import DOMAIN, AVALANCHE_RISK, AVALANCHE_RISK_COLORS, AVALANCHE_SITUATIONS, WEATHER_CONDITIONS
+from .entity import MeteoFranceMontagneEntity
 
 _LOGGER = logging.getLogger(__name__)
 
+# Data paths of each numeric risk level, below and above the altitude limit.
+# With no limit, the single risk applies to both.
+RISK_LEVEL_KEYS = {
+    "max": ("risque.risque_max",),
+    "bas": ("risque.risque_1",),
+    "haut": ("risque.risque_1", "risque.risque_2", "risque.altitude_limite"),
+    "j2": ("risque.estimation_j2.risque_max",),
+}
+
+
+def risk_level(value) -> int | None:
+    """Return a risk level (1-5) as a number, None if not given."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -82,14 +97,52 @@ async def async_setup_entry(
             "Qualité de la Neige",
             "mdi:snowflake-variant",
         ),
+        MeteoFranceMontagneRisqueNiveauSensor(
+            coordinator,
+            "risque_max_niveau",
+            "Niveau Risque",
+            "mdi:alert",
+            "max"
+        ),
+        MeteoFranceMontagneRisqueNiveauSensor(
+            coordinator,
+            "risque_bas_niveau",
+            "Niveau Risque Bas",
+            "mdi:alert",
+            "bas"
+        ),
+        MeteoFranceMontagneRisqueNiveauSensor(
+            coordinator,
+            "risque_haut_niveau",
+            "Niveau Risque Haut",
+            "mdi:alert",
+            "haut"
+        ),
+        MeteoFranceMontagneRisqueNiveauSensor(
+            coordinator,
+            "risque_prevision_niveau",
+            "Niveau Risque Prévision",
+            "mdi:alert-outline",
+            "j2"
+        ),
+        MeteoFranceMontagneNeigeFraicheCumulSensor(
+            coordinator,
+            "neige_fraiche_cumul",
+            "Cumul Neige Fraîche",
+            "mdi:weather-snowy-heavy",
+        ),
     ]
 
     async_add_entities(entities)
 
 
-class MeteoFranceMontagneRisqueSensor(CoordinatorEntity, SensorEntity):
+class MeteoFranceMontagneRisqueSensor(MeteoFranceMontagneEntity, SensorEntity):
     """Representation of a Météo-France Montagne Sensor."""
 
+    _data_keys = ("risque", "date")
+    # The accumulated history is too large for the recorder
+    _unrecorded_attributes = frozenset({"historique"})
+
     def __init__(
         self,
         coordinator,
@@ -207,9 +260,12 @@ class MeteoFranceMontagneRisqueSensor(CoordinatorEntity, SensorEntity):
         return attrs
 
 
-class MeteoFranceMontagneEnneigementSensor(CoordinatorEntity, SensorEntity):
+class MeteoFranceMontagneEnneigementSensor(MeteoFranceMontagneEntity, SensorEntity):
     """Representation of a Météo-France Montagne Snow Sensor."""
 
+    _data_keys = ("enneigement", "date")
+    _unrecorded_attributes = frozenset({"historique"})
+
     _attr_device_class = SensorDeviceClass.DISTANCE
     _attr_native_unit_of_measurement = UnitOfLength.METERS
     _attr_state_class = SensorStateClass.MEASUREMENT
@@ -293,9 +349,12 @@ class MeteoFranceMontagneEnneigementSensor(CoordinatorEntity, SensorEntity):
         return attrs
 
 
-class MeteoFranceMontagneMeteoSensor(CoordinatorEntity, SensorEntity):
+class MeteoFranceMontagneMeteoSensor(MeteoFranceMontagneEntity, SensorEntity):
     """Representation of a Météo-France Montagne Weather Sensor."""
 
+    _data_keys = ("meteo", "date")
+    _unrecorded_attributes = frozenset({"echeances_historique"})
+
     def __init__(
         self,
         coordinator,
@@ -358,9 +417,12 @@ class MeteoFranceMontagneMeteoSensor(CoordinatorEntity, SensorEntity):
         return attrs
 
 
-class MeteoFranceMontagneNeigeFraicheSensor(CoordinatorEntity, SensorEntity):
+class MeteoFranceMontagneNeigeFraicheSensor(MeteoFranceMontagneEntity, SensorEntity):
     """Representation of a Météo-France Montagne Fresh Snow Sensor."""
 
+    _data_keys = ("neige_fraiche", "date")
+    _unrecorded_attributes = frozenset({"historique"})
+
     _attr_device_class = SensorDeviceClass.DISTANCE
     _attr_native_unit_of_measurement = UnitOfLength.METERS
     _attr_state_class = SensorStateClass.MEASUREMENT
@@ -418,9 +480,11 @@ class MeteoFranceMontagneNeigeFraicheSensor(CoordinatorEntity, SensorEntity):
         return attrs
 
 
-class MeteoFranceMontagneRisqueJ2Sensor(CoordinatorEntity, SensorEntity):
+class MeteoFranceMontagneRisqueJ2Sensor(MeteoFranceMontagneEntity, SensorEntity):
     """Representation of a Météo-France Montagne Forecast Risk Sensor."""
 
+    _data_keys = ("risque.estimation_j2", "date")
+
     def __init__(
         self,
         coordinator,
@@ -482,9 +546,11 @@ class MeteoFranceMontagneRisqueJ2Sensor(CoordinatorEntity, SensorEntity):
         }
 
 
-class MeteoFranceMontagneStabiliteSensor(CoordinatorEntity, SensorEntity):
+class MeteoFranceMontagneStabiliteSensor(MeteoFranceMontagneEntity, SensorEntity):
     """Representation of a Météo-France Montagne Stability Sensor."""
 
+    _data_keys = ("stabilite", "date")
+
     def __init__(
         self,
         coordinator,
@@ -538,9 +604,11 @@ class MeteoFranceMontagneStabiliteSensor(CoordinatorEntity, SensorEntity):
         return attrs
 
 
-class MeteoFranceMontagneQualiteSensor(CoordinatorEntity, SensorEntity):
+class MeteoFranceMontagneQualiteSensor(MeteoFranceMontagneEntity, SensorEntity):
     """Representation of a Météo-France Montagne Snow Quality Sensor."""
 
+    _data_keys = ("qualite", "date")
+
     def __init__(
         self,
         coordinator,
@@ -575,3 +643,88 @@ class MeteoFranceMontagneQualiteSensor(CoordinatorEntity, SensorEntity):
             "texte_complet": self.coordinator.data["qualite"],
             "last_update": self.coordinator.data.get("date"),
         }
+
+
+class MeteoFranceMontagneRisqueNiveauSensor(MeteoFranceMontagneEntity, SensorEntity):
+    """Numeric avalanche risk level, for long-term statistics."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 0
+
+    def __init__(
+        self,
+        coordinator,
+        sensor_type: str,
+        name: str,
+        icon: str,
+        zone: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.coordinator = coordinator
+        self._sensor_type = sensor_type
+        self._zone = zone
+        self._data_keys = RISK_LEVEL_KEYS[zone]
+        self._attr_name = f"{coordinator.massif_name} {name}"
+        self._attr_unique_id = f"{coordinator.massif_id}_{sensor_type}"
+        self._attr_icon = icon
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the state of the sensor."""
+        if not self.coordinator.data or "risque" not in self.coordinator.data:
+            return None
+        risque = self.coordinator.data["risque"]
+        if self._zone == "max":
+            return risk_level(risque.get("risque_max"))
+        if self._zone == "j2":
+            return risk_level((risque.get("estimation_j2") or {}).get("risque_max"))
+        if self._zone == "haut" and risque.get("altitude_limite") is not None:
+            return risk_level((risque.get("risque_2") or {}).get("valeur"))
+        return risk_level((risque.get("risque_1") or {}).get("valeur"))
+
+
+class MeteoFranceMontagneNeigeFraicheCumulSensor(MeteoFranceMontagneEntity, SensorEntity):
+    """Fresh snow fallen over the days of the bulletin, for long-term statistics."""
+
+    _data_keys = ("neige_fraiche.mesures",)
+
+    _attr_device_class = SensorDeviceClass.DISTANCE
+    _attr_native_unit_of_measurement = UnitOfLength.CENTIMETERS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        coordinator,
+        sensor_type: str,
+        name: str,
+        icon: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.coordinator = coordinator
+        self._sensor_type = sensor_type
+        self._attr_name = f"{coordinator.massif_name} {name}"
+        self._attr_unique_id = f"{coordinator.massif_id}_{sensor_type}"
+        self._attr_icon = icon
+
+    def _total(self, key: str) -> int | None:
+        """Return the sum of a daily measure, None if never measured."""
+        if not self.coordinator.data or "neige_fraiche" not in self.coordinator.data:
+            return None
+        values = [
+            mesure.get(key)
+            for mesure in self.coordinator.data["neige_fraiche"].get("mesures", [])
+            if mesure.get(key) is not None
+        ]
+        return sum(values) if values else None
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the state of the sensor."""
+        return self._total("max")
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes."""
+        return {"cumul_min_cm": self._total("min")}
@@ -0,0 +1,110 @@
+"""HTTP session dedicated to the Météo-France API."""
+from __future__ import annotations
+
+import aiohttp
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util.ssl import client_context
+
+from .const import (
+    DOMAIN,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_LIMIT_PER_HOST,
+)
+
+
+class ConnectionStats:
+    """Count requests, new and reused connections of a session."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Return a trace config updating these counters."""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            self.requests += 1
+
+        async def on_connection_create_end(session, context, params):
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.connections_reused += 1
+
+        async def on_dns_cache_hit(session, context, params):
+            self.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, context, params):
+            self.dns_cache_misses += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
+
+    def as_dict(self) -> dict:
+        """Return the counters and the connection reuse ratio."""
+        connections = self.connections_created + self.connections_reused
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "connection_reuse_ratio": (
+                round(self.connections_reused / connections, 3) if connections else None
+            ),
+            "dns_cache_hits": self.dns_cache_hits,
+            "dns_cache_misses": self.dns_cache_misses,
+        }
+
+
+@callback
+def async_get_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the integration session, created on first use.
+
+    API traffic gets its own connection pool instead of competing with other
+    integrations in the shared session: connections to the API host are kept
+    alive between a bulletin and its images, and DNS lookups are cached.
+    """
+    data = hass.data.setdefault(DOMAIN, {})
+    if "session" in data:
+        return data["session"]
+
+    stats = ConnectionStats()
+    connector = aiohttp.TCPConnector(
+        ssl=client_context(),
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+    )
+    session = aiohttp.ClientSession(
+        connector=connector,
+        connector_owner=False,
+        headers={"User-Agent": SERVER_SOFTWARE},
+        trace_configs=[stats.trace_config()],
+    )
+    data["session"] = session
+    data["http_stats"] = stats
+
+    # Closed like the sessions of async_create_clientsession: the session
+    # is detached at once and its connector closes the open connections
+    @callback
+    def async_close_session(_event: Event) -> None:
+        session.detach()
+
+    async def async_close_connector(_event: Event) -> None:
+        await connector.close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, async_close_session)
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, async_close_connector)
+    return session
@@ -0,0 +1,150 @@
+"""HTTP transports under the API client, with record and replay cassettes.
+
+The API client sends its requests through a transport: the HTTP session by
+default, or a cassette recording real sessions (status, headers, body and
+latency of every response) and replaying them offline, so that the
+coordinator and parser pipeline can be benchmarked reproducibly.
+"""
+import asyncio
+import base64
+from collections import defaultdict
+from dataclasses import dataclass, field
+import gzip
+import json
+import time
+
+CASSETTE_VERSION = 1
+
+
+@dataclass
+class TransportResponse:
+    """Response of a transport."""
+
+    status: int
+    headers: dict = field(default_factory=dict)
+    body: bytes = b""
+
+    def header(self, name, default=None):
+        """Return a header, whatever its case."""
+        name = name.lower()
+        for key, value in self.headers.items():
+            if key.lower() == name:
+                return value
+        return default
+
+
+class SessionTransport:
+    """Requests sent with an aiohttp session."""
+
+    def __init__(self, session):
+        """Initialize the transport."""
+        self.session = session
+
+    async def request(self, method, url, headers, timeout):
+        """Send a request and return its response."""
+        async with self.session.request(
+                method, url, headers=headers, timeout=timeout) as response:
+            return TransportResponse(response.status, response.headers, await response.read())
+
+
+class CassetteMissError(Exception):
+    """No recorded response for a request."""
+
+
+class Cassette:
+    """Recorded responses, in request order, saved as gzipped JSON.
+
+    Request headers, and so the API token, are never recorded.
+    """
+
+    def __init__(self, interactions=None):
+        """Initialize the cassette."""
+        self.interactions = interactions or []
+
+    @classmethod
+    def load(cls, path):
+        """Load a cassette file. Blocking."""
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            content = json.load(file)
+        if content.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version {content.get('version')}")
+        return cls([
+            {**interaction, "body": base64.b64decode(interaction["body"])}
+            for interaction in content["interactions"]
+        ])
+
+    def save(self, path):
+        """Save the cassette to a file. Blocking."""
+        content = {
+            "version": CASSETTE_VERSION,
+            "interactions": [
+                {**interaction, "body": base64.b64encode(interaction["body"]).decode("ascii")}
+                for interaction in self.interactions
+            ],
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            json.dump(content, file, separators=(",", ":"))
+
+    def add(self, method, url, response, latency):
+        """Record a response."""
+        self.interactions.append({
+            "method": method,
+            "url": url,
+            "status": response.status,
+            "headers": dict(response.headers),
+            "latency": round(latency, 4),
+            "body": response.body,
+        })
+
+
+class RecordingTransport:
+    """Transport recording the responses of another one in a cassette."""
+
+    def __init__(self, transport, cassette=None, clock=time.monotonic):
+        """Initialize the transport."""
+        self.transport = transport
+        self.cassette = cassette or Cassette()
+        self.clock = clock
+
+    async def request(self, method, url, headers, timeout):
+        """Send a request and record its response."""
+        started = self.clock()
+        response = await self.transport.request(method, url, headers, timeout)
+        response = TransportResponse(response.status, dict(response.headers), response.body)
+        self.cassette.add(method, url, response, self.clock() - started)
+        return response
+
+
+class ReplayTransport:
+    """Transport answering from a cassette, without any network access.
+
+    Responses to a request (method and URL) are replayed in the order they
+    were recorded, the last one repeating once exhausted. With latency, each
+    response waits as long as it took when recorded.
+    """
+
+    def __init__(self, cassette, latency=False, sleep=asyncio.sleep):
+        """Initialize the transport."""
+        self.latency = latency
+        self.sleep = sleep
+        self.requests = 0
+        self._responses = defaultdict(list)
+        for interaction in cassette.interactions:
+            self._responses[(interaction["method"], interaction["url"])].append(interaction)
+        self._positions = defaultdict(int)
+
+    async def request(self, method, url, headers, timeout):
+        """Return the next recorded response to a request."""
+        key = (method, url)
+        responses = self._responses.get(key)
+        if not responses:
+            raise CassetteMissError(f"No recorded response for {method} {url}")
+
+        position = self._positions[key]
+        interaction = responses[min(position, len(responses) - 1)]
+        self._positions[key] = position + 1
+        self.requests += 1
+        if self.latency:
+            await self.sleep(interaction["latency"])
+        return TransportResponse(
+            interaction["status"], dict(interaction["headers"]), interaction["body"])
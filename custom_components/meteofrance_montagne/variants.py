@@ -0,0 +1,132 @@
+"""Downscaled and re-encoded variants of Météo-France Montagne images."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import hashlib
+import io
+import logging
+from pathlib import Path
+
+from PIL import Image
+
+from homeassistant.core import HomeAssistant
+
+from .const import IMAGE_VARIANTS, IMAGE_VARIANT_CACHE_SIZE, DEFAULT_THUMBNAIL_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+}
+
+
+def content_hash(content: bytes) -> str:
+    """Return a stable hash of image content."""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def variant_content_type(variant: str) -> str:
+    """Return the content type served for a variant."""
+    return CONTENT_TYPES[IMAGE_VARIANTS[variant]["format"]]
+
+
+def transcode(
+    content: bytes | Path, variant: str, thumbnail_size: int = DEFAULT_THUMBNAIL_SIZE
+) -> bytes:
+    """Transcode PNG content to a variant. Blocking, run in an executor.
+
+    Content spilled to disk is given as its path and decoded by Pillow from
+    the file, without reading it into memory first.
+    """
+    if isinstance(content, Path):
+        return _transcode(content, variant, thumbnail_size)
+    return _transcode(io.BytesIO(content), variant, thumbnail_size)
+
+
+def _transcode(source, variant: str, thumbnail_size: int) -> bytes:
+    """Transcode a PNG file object or path to a variant."""
+    spec = IMAGE_VARIANTS[variant]
+    with Image.open(source) as img:
+        img.load()
+        if spec["thumbnail"]:
+            img.thumbnail((thumbnail_size, thumbnail_size), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        if spec["format"] == "WEBP":
+            img.save(output, "WEBP", quality=80, method=4)
+        else:
+            img.save(output, "PNG", optimize=True)
+        return output.getvalue()
+
+
+class ImageVariantCache:
+    """Cache of transcoded image variants keyed by content hash.
+
+    Each (content, variant, size) is transcoded once in an executor; the
+    cache is bounded by total size and evicts the least recently used
+    entries.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_size: int = IMAGE_VARIANT_CACHE_SIZE) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self.max_size = max_size
+        self._size = 0
+        self._cache: OrderedDict[tuple, bytes] = OrderedDict()
+        self._pending: dict[tuple, asyncio.Future] = {}
+
+    async def async_get(
+        self,
+        content: bytes | Path,
+        variant: str,
+        thumbnail_size: int = DEFAULT_THUMBNAIL_SIZE,
+        digest: str | None = None,
+    ) -> bytes | Path:
+        """Return the variant of content, transcoding it if needed.
+
+        Content spilled to disk is given as its path, with its digest. The
+        original variant is returned as given.
+        """
+        spec = IMAGE_VARIANTS[variant]
+        if spec["format"] == "PNG" and not spec["thumbnail"]:
+            return content
+
+        size = thumbnail_size if spec["thumbnail"] else None
+        key = (digest or content_hash(content), variant, size)
+
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        # Share an in-flight transcode between concurrent requests
+        if key in self._pending:
+            return await self._pending[key]
+
+        future = self.hass.loop.create_future()
+        self._pending[key] = future
+        try:
+            result = await self.hass.async_add_executor_job(
+                transcode, content, variant, thumbnail_size)
+        except Exception as err:
+            # Spilled images may be deleted while read, when replaced
+            if not isinstance(err, FileNotFoundError):
+                _LOGGER.error("Error transcoding image to %s: %s", variant, err)
+            future.set_exception(err)
+            # Avoid "exception was never retrieved" when nobody else waits
+            future.exception()
+            raise
+        finally:
+            self._pending.pop(key, None)
+
+        future.set_result(result)
+        self._store(key, result)
+        return result
+
+    def _store(self, key: tuple, value: bytes) -> None:
+        """Store a variant and evict old entries over budget."""
+        self._cache[key] = value
+        self._size += len(value)
+        while self._size > self.max_size and len(self._cache) > 1:
+            _key, evicted = self._cache.popitem(last=False)
+            self._size -= len(evicted)
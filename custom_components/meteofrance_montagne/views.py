@@ -0,0 +1,100 @@
+"""HTTP views for the Météo-France Montagne integration."""
+from __future__ import annotations
+
+from datetime import datetime
+import logging
+
+from aiohttp import hdrs, web
+
+from homeassistant.components.http import KEY_AUTHENTICATED, HomeAssistantView
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+
+from .const import DOMAIN, IMAGE_VARIANTS, BULLETIN_TIME_ZONE
+
+_LOGGER = logging.getLogger(__name__)
+
+MIN_MAX_AGE = 60
+MAX_MAX_AGE = 24 * 3600
+
+
+def cache_control(date_validite: str | None, now: datetime | None = None) -> str:
+    """Return a Cache-Control header value tied to the bulletin validity."""
+    validite = dt_util.parse_datetime(date_validite) if date_validite else None
+    if validite is None:
+        return "private, no-cache"
+    if validite.tzinfo is None:
+        validite = validite.replace(tzinfo=dt_util.get_time_zone(BULLETIN_TIME_ZONE))
+
+    remaining = int((validite - (now or dt_util.utcnow())).total_seconds())
+    if remaining < MIN_MAX_AGE:
+        # Bulletin expired (or about to): clients must revalidate
+        return "private, no-cache"
+    return f"private, max-age={min(remaining, MAX_MAX_AGE)}"
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Return True if an If-None-Match header matches the ETag.
+
+    If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    (proxies compressing the response turn the ETag into a weak one).
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+class MeteoFranceMontagneImageView(HomeAssistantView):
+    """Serve massif images with ETag revalidation and cache headers."""
+
+    url = "/api/meteofrance_montagne/image/{entry_id}/{image_type}"
+    name = "api:meteofrance_montagne:image"
+    requires_auth = False
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the view."""
+        self.hass = hass
+
+    async def get(
+        self, request: web.Request, entry_id: str, image_type: str
+    ) -> web.StreamResponse:
+        """Serve an image, or 304 if the client copy is current."""
+        entity = self.hass.data[DOMAIN]["image_entities"].get((entry_id, image_type))
+        if entity is None:
+            raise web.HTTPNotFound
+
+        authenticated = (
+            request[KEY_AUTHENTICATED]
+            or request.query.get("token") in entity.access_tokens
+        )
+        if not authenticated:
+            if hdrs.AUTHORIZATION in request.headers:
+                raise web.HTTPUnauthorized
+            raise web.HTTPForbidden
+
+        variant = request.query.get("variant", entity.variant)
+        if variant not in IMAGE_VARIANTS:
+            raise web.HTTPBadRequest(text=f"Unknown variant {variant}")
+
+        etag = entity.variant_etag(variant)
+        if etag is None:
+            raise web.HTTPNotFound
+
+        headers = {
+            hdrs.ETAG: etag,
+            hdrs.CACHE_CONTROL: cache_control(entity.date_validite),
+        }
+
+        if etag_matches(request.headers.get(hdrs.IF_NONE_MATCH), etag):
+            return web.Response(status=304, headers=headers)
+
+        content = await entity.async_image_variant(variant)
+        if content is None:
+            raise web.HTTPNotFound
+
+        return web.Response(
+            body=content,
+            content_type=entity.variant_content_type(variant),
+            headers=headers,
+        )
@@ -0,0 +1,228 @@
+"""Memory footprint benchmark for large massif fleets.
+
+Builds the coordinators and entities of N massifs from the sample bulletin,
+with a stubbed hass, and measures the memory they retain with tracemalloc,
+broken down by bulletin data, history, images and entity attributes.
+
+The integration package imports Home Assistant, which must be installed:
+
+    python tests/bench_memory.py --massifs 50
+    python tests/bench_memory.py --massifs 50 --record
+
+--record appends the results to bench_memory.jsonl, next to this file, to
+follow them from one change to the next.
+"""
+import argparse
+import asyncio
+import copy
+from datetime import datetime, timedelta
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+from lxml import etree
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from custom_components.meteofrance_montagne import (  # noqa: E402
+    binary_sensor,
+    image,
+    sensor,
+)
+from custom_components.meteofrance_montagne.api import MeteoFranceMontagneApi  # noqa: E402
+from custom_components.meteofrance_montagne.const import (  # noqa: E402
+    ASPECTS,
+    DEFAULT_HISTORY_RETENTION,
+    DOMAIN,
+    IMAGE_STORE_MEMORY,
+    IMAGE_TYPES,
+)
+from custom_components.meteofrance_montagne.coordinator import (  # noqa: E402
+    MeteoFranceMontagneDataUpdateCoordinator,
+)
+from custom_components.meteofrance_montagne.history import HISTORY_LISTS  # noqa: E402
+from custom_components.meteofrance_montagne.image_store import ImageStore  # noqa: E402
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'sample_bulletin.xml')
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), 'bench_memory.jsonl')
+
+CATEGORIES = ('coordinators', 'bulletins', 'history', 'images', 'attributes')
+
+
+class StubConfig:
+    """Configuration directory of the stubbed hass."""
+
+    def __init__(self, directory):
+        self.config_dir = directory
+
+    def path(self, *parts):
+        return os.path.join(self.config_dir, *parts)
+
+
+class StubHass:
+    """Just enough of hass for coordinators, stores and entities."""
+
+    def __init__(self, directory):
+        self.data = {DOMAIN: {}}
+        self.config = StubConfig(directory)
+        self.loop = asyncio.get_running_loop()
+
+    async def async_add_executor_job(self, target, *args):
+        return target(*args)
+
+
+class NullStore:
+    """History store backend that never writes."""
+
+    def async_delay_save(self, data_func, delay=0):
+        pass
+
+
+def shifted_history(bulletin, days):
+    """Return the history lists of a bulletin, moved back by some days."""
+    shifted = copy.deepcopy(bulletin)
+    for section, key in HISTORY_LISTS.values():
+        for entry in shifted.get(section, {}).get(key, []):
+            date = datetime.fromisoformat(entry['date']) - timedelta(days=days)
+            entry['date'] = date.isoformat()
+    return shifted
+
+
+def retained():
+    """Return the memory currently traced, after a collection."""
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+async def measure(massifs, history_days, image_size, image_budget):
+    """Build a fleet of massifs and return the memory of each category."""
+    with tempfile.TemporaryDirectory() as directory:
+        hass = StubHass(directory)
+        store = ImageStore(hass, os.path.join(directory, 'images'), image_budget)
+        store.setup()
+        hass.data[DOMAIN]['images'] = store
+        xml = open(SAMPLE_PATH, 'rb').read()
+        # Kept alive until the end, as the integration would
+        fleet, states = [], []
+        sizes = {}
+
+        tracemalloc.start()
+        start = retained()
+
+        for index in range(massifs):
+            coordinator = MeteoFranceMontagneDataUpdateCoordinator(
+                hass, None, images=store, massif_id=index + 1, massif_name=f'Massif {index + 1}')
+            coordinator.history._store = NullStore()
+            coordinator.history.retention = history_days
+            fleet.append(coordinator)
+        sizes['coordinators'] = retained() - start
+
+        start = retained()
+        bulletins = []
+        for coordinator in fleet:
+            bulletin = MeteoFranceMontagneApi.parse_bulletin_xml(etree.fromstring(xml))
+            bulletins.append(bulletin)
+            coordinator.data = {**bulletin, 'massif_name': coordinator.massif_name}
+        sizes['bulletins'] = retained() - start
+
+        # Older bulletins first, so that the history spans history_days
+        start = retained()
+        window = max(len(entries) for entries in (
+            bulletins[0].get(section, {}).get(key, []) for section, key in HISTORY_LISTS.values()))
+        for coordinator, bulletin in zip(fleet, bulletins):
+            for days in range(history_days - window, 0, -max(window, 1)):
+                coordinator.history.merge(shifted_history(bulletin, days))
+            coordinator.data = {
+                **coordinator.history.merge(bulletin), 'massif_name': coordinator.massif_name}
+        del bulletins
+        sizes['history'] = retained() - start
+
+        start = retained()
+        for coordinator in fleet:
+            for image_type in IMAGE_TYPES:
+                coordinator.data[image_type] = await store.async_put(os.urandom(image_size))
+        sizes['images'] = retained() - start
+
+        # Entity objects and the states they publish
+        start = retained()
+        for coordinator in fleet:
+            entities = [
+                sensor.MeteoFranceMontagneRisqueSensor(coordinator, 'risque_max', 'Risque', 'mdi:alert'),
+                sensor.MeteoFranceMontagneRisqueJ2Sensor(coordinator, 'risque_prevision', 'Prévision', 'mdi:alert'),
+                sensor.MeteoFranceMontagneEnneigementSensor(coordinator, 'enneigement_nord', 'Nord', 'mdi:snowflake', 'limite_nord'),
+                sensor.MeteoFranceMontagneEnneigementSensor(coordinator, 'enneigement_sud', 'Sud', 'mdi:snowflake', 'limite_sud'),
+                sensor.MeteoFranceMontagneNeigeFraicheSensor(coordinator, 'neige_fraiche', 'Neige', 'mdi:snowflake'),
+                sensor.MeteoFranceMontagneMeteoSensor(coordinator, 'meteo', 'Météo', 'mdi:weather-windy'),
+                sensor.MeteoFranceMontagneStabiliteSensor(coordinator, 'stabilite', 'Stabilité', 'mdi:layers'),
+                sensor.MeteoFranceMontagneQualiteSensor(coordinator, 'qualite_neige', 'Qualité', 'mdi:snowflake'),
+                *(sensor.MeteoFranceMontagneRisqueNiveauSensor(
+                    coordinator, f'risque_{zone}_niveau', zone, 'mdi:alert', zone)
+                  for zone in sensor.RISK_LEVEL_KEYS),
+                sensor.MeteoFranceMontagneNeigeFraicheCumulSensor(coordinator, 'cumul', 'Cumul', 'mdi:snowflake'),
+                *(binary_sensor.MeteoFranceMontagnePenteSensor(coordinator, aspect) for aspect in ASPECTS),
+                *(image.MeteoFranceMontagneImage(coordinator, str(coordinator.massif_id), image_type)
+                  for image_type in IMAGE_TYPES),
+            ]
+            for entity in entities:
+                states.append((entity, entity.state, entity.extra_state_attributes))
+        sizes['attributes'] = retained() - start
+
+        tracemalloc.stop()
+        return sizes
+
+
+def record(results):
+    """Append the results to the history of runs."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    with open(RESULTS_PATH, 'a', encoding='utf-8') as file:
+        file.write(json.dumps({
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'commit': commit,
+            'python': platform.python_version(),
+            **results,
+        }) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--massifs', type=int, default=50)
+    parser.add_argument('--history-days', type=int, default=DEFAULT_HISTORY_RETENTION)
+    parser.add_argument('--image-size', type=int, default=80 * 1024, help='bytes per image')
+    parser.add_argument('--image-budget', type=int, default=IMAGE_STORE_MEMORY, help='bytes')
+    parser.add_argument('--record', action='store_true', help=f'append to {RESULTS_PATH}')
+    args = parser.parse_args()
+
+    sizes = asyncio.run(measure(args.massifs, args.history_days, args.image_size, args.image_budget))
+    total = sum(sizes.values())
+
+    print(f"{args.massifs} massifs, {args.history_days} days of history, "
+          f"{args.image_size // 1024} KiB images, {args.image_budget // 1024} KiB image budget")
+    print(f"{'':<14}{'KiB':>10}{'KiB/massif':>12}")
+    for category in CATEGORIES:
+        print(f"{category:<14}{sizes[category] / 1024:>10.0f}"
+              f"{sizes[category] / 1024 / args.massifs:>12.1f}")
+    print(f"{'total':<14}{total / 1024:>10.0f}{total / 1024 / args.massifs:>12.1f}")
+
+    if args.record:
+        record({
+            'massifs': args.massifs,
+            'history_days': args.history_days,
+            'image_size': args.image_size,
+            'image_budget': args.image_budget,
+            'kib': {category: round(sizes[category] / 1024) for category in CATEGORIES},
+        })
+
+
+if __name__ == '__main__':
+    main()
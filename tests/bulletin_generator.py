@@ -0,0 +1,256 @@
+"""Synthetic BRA bulletin generator for scaling tests.
+
+Builds bulletins in the XML format of the Météo-France BRA (see api_doc/ and
+resources/sample_bulletin.xml), with tunable sizes: number of forecast
+ECHEANCE, days of BSH history, NIVEAU rows and text lengths (accented French
+text), plus the edge cases met in real bulletins: missing CARTOUCHERISQUE,
+empty attributes and amendments. Only lxml is needed:
+
+    python tests/bulletin_generator.py --scale 10 -o /tmp/bulletin.xml
+    python tests/bulletin_generator.py --echeances 40 --bsh-days 70 --no-cartouche
+"""
+import argparse
+from datetime import datetime, timedelta
+import random
+
+from lxml import etree
+
+ASPECTS = ('NE', 'E', 'SE', 'S', 'SW', 'W', 'NW', 'N')
+DIRECTIONS = ('N', 'NE', 'E', 'SE', 'S', 'SO', 'O', 'NO')
+WORDS = (
+    'neige', 'fraîche', 'plaques', 'friables', 'déclenchements', 'provoqués',
+    'départs', 'spontanés', 'accumulations', 'versants', 'abrités', 'pentes',
+    'raides', 'soleil', 'humidification', 'cohésion', 'manteau', 'neigeux',
+    'sous-couche', 'fragile', 'épaisseur', 'altitude', 'crêtes', 'épisode',
+    'éboulements', 'réchauffement', 'isotherme', 'gèle', 'régèle', 'à',
+    'près', 'des', 'sur', 'les', 'en', 'après', 'où', 'très', 'Nord-Ouest',
+)
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+# Sizes of resources/sample_bulletin.xml, multiplied by --scale
+ECHEANCES = 4
+BSH_DAYS = 7
+NIVEAUX = 3
+TEXT_LENGTH = 1200
+
+
+def text(rng, length):
+    """Return French-looking text of about length characters."""
+    words, size = [], 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    sentence = ' '.join(words)[:max(length, 1)].rstrip()
+    return sentence[:1].upper() + sentence[1:] + '.'
+
+
+def date(value):
+    """Format a date as in the bulletins."""
+    return value.strftime(DATE_FORMAT)
+
+
+def sub(parent, tag, **attributes):
+    """Add a child element with string attributes."""
+    return etree.SubElement(parent, tag, {key: str(value) for key, value in attributes.items()})
+
+
+def sub_text(parent, tag, content):
+    """Add a child element holding CDATA text."""
+    element = etree.SubElement(parent, tag)
+    element.text = etree.CDATA(content)
+    return element
+
+
+def echeance(parent, rng, when, mer_nuages=True):
+    """Add a weather forecast step."""
+    attributes = {
+        'DATE': date(when),
+        'FF1': rng.randrange(0, 80, 5),
+        'DD1': rng.choice(DIRECTIONS),
+        'FF2': rng.randrange(0, 120, 5),
+        'DD2': rng.choice(DIRECTIONS),
+        'ISO0': rng.randrange(0, 4000, 100),
+        'PLUIENEIGE': rng.choice((-1, rng.randrange(0, 3000, 100))),
+        'TEMPSSENSIBLE': rng.choice((0, 1, 2, 3, 6, 32, 51, 61, 71, 81)),
+    }
+    if mer_nuages:
+        attributes['MERNUAGES'] = rng.choice((-1, rng.randrange(500, 2000, 100)))
+    return sub(parent, 'ECHEANCE', **attributes)
+
+
+def niveaux(parent, rng, rows):
+    """Add snow depth rows, from low to high altitude."""
+    for index in range(rows):
+        depth = rng.randrange(0, 20) * (index + 1)
+        sub(parent, 'NIVEAU', ALTI=1500 + 500 * index, N=depth, S=max(depth - rng.randrange(0, 10), 0))
+
+
+def generate_bulletin(
+    massif_id=72,
+    massif='Orlu St-Barthelemy',
+    bulletin_date=datetime(2025, 11, 21, 16),
+    echeances=ECHEANCES,
+    bsh_days=BSH_DAYS,
+    niveaux_count=NIVEAUX,
+    text_length=TEXT_LENGTH,
+    cartouche=True,
+    empty_attributes=False,
+    amendment=False,
+    published=None,
+    seed=0,
+):
+    """Return the XML of a synthetic bulletin, as bytes.
+
+    With empty_attributes, every optional attribute is present but empty,
+    as the API sends them when a forecaster leaves a field blank. An
+    amendment is published a few hours after the bulletin it replaces,
+    unless published is given.
+    """
+    rng = random.Random(f'{seed}-{massif_id}-{bulletin_date}-{amendment}')
+    day = bulletin_date.replace(hour=0, minute=0, second=0)
+    validity = day + timedelta(days=1, hours=18)
+    if published is None:
+        published = bulletin_date + timedelta(minutes=25)
+        if amendment:
+            published += timedelta(hours=rng.randrange(2, 6))
+
+    def optional(value):
+        """Return an optional attribute value, empty if requested."""
+        return '' if empty_attributes else value
+
+    root = etree.Element('BULLETINS_NEIGE_AVALANCHE', {
+        'TYPEBULLETIN': 'BRA',
+        'ID': str(massif_id),
+        'MASSIF': massif,
+        'DATEBULLETIN': date(bulletin_date),
+        'DATEECHEANCE': date(validity),
+        'DATEVALIDITE': date(validity),
+        'DATEDIFFUSION': date(published),
+        'AMENDEMENT': 'true' if amendment else 'false',
+    })
+    etree.SubElement(root, 'DateValidite').text = date(validity)
+
+    risk = rng.randint(1, 5)
+    if cartouche:
+        element = etree.SubElement(root, 'CARTOUCHERISQUE')
+        sub(
+            element, 'RISQUE',
+            RISQUE1=risk,
+            EVOLURISQUE1=optional(rng.choice(('', risk - 1 or 1))),
+            LOC1=optional('<2000'),
+            ALTITUDE=optional(2000),
+            RISQUE2=optional(max(risk - 1, 1)),
+            EVOLURISQUE2='',
+            LOC2=optional('>2000'),
+            RISQUEMAXI=risk,
+            COMMENTAIRE=optional(text(rng, 40)),
+            RISQUEMAXIJ2=rng.randint(1, 5),
+            DATE_RISQUE_J2=date(day + timedelta(days=2)),
+        )
+        sub(element, 'PENTE', **{
+            aspect: optional(rng.choice(('true', 'false'))) for aspect in ASPECTS
+        }, COMMENTAIRE=optional(text(rng, 30)))
+        sub_text(element, 'ACCIDENTEL', text(rng, text_length // 20))
+        sub_text(element, 'NATUREL', text(rng, text_length // 20))
+        sub_text(element, 'RESUME', text(rng, text_length // 10))
+        sub_text(element, 'RisqueJ2', text(rng, 25))
+        sub_text(element, 'CommentaireRisqueJ2', text(rng, text_length // 20))
+        etree.SubElement(element, 'AVIS')
+        etree.SubElement(element, 'VIGILANCE')
+        etree.SubElement(element, 'ImageRisque').text = f'montagne_risques_{massif_id}.png'
+        etree.SubElement(element, 'ImagePente').text = f'rose_pentes_{massif_id}.png'
+
+    stabilite = etree.SubElement(root, 'STABILITE')
+    sub(stabilite, 'SitAvalTyp', SAT1=rng.randint(1, 5), SAT2=optional(rng.randint(1, 5)))
+    title = text(rng, 40)
+    body = text(rng, text_length)
+    sub_text(stabilite, 'TITRE', title)
+    sub_text(stabilite, 'TEXTESANSTITRE', body)
+    sub_text(stabilite, 'TEXTE', f'{title}\n\n{body}')
+
+    sub_text(etree.SubElement(root, 'QUALITE'), 'TEXTE', text(rng, text_length // 2))
+
+    enneigement = sub(
+        root, 'ENNEIGEMENT', DATE=date(day),
+        LimiteSud=optional(rng.randrange(500, 2500, 100)),
+        LimiteNord=optional(rng.randrange(500, 2500, 100)))
+    niveaux(enneigement, rng, niveaux_count)
+    etree.SubElement(enneigement, 'ImageEnneigement').text = f'montagne_enneigement_{massif_id}.png'
+
+    neige_fraiche = sub(root, 'NEIGEFRAICHE', ALTITUDESS=optional(1800))
+    for offset in range(-4, 2):
+        high = rng.randrange(0, 50)
+        sub(neige_fraiche, 'NEIGE24H', DATE=date(day + timedelta(days=offset)),
+            SS24Min=optional(rng.randrange(0, high + 1)), SS24Max=high)
+    etree.SubElement(neige_fraiche, 'ImageNeigeFraiche').text = f'graphe_neige_fraiche_{massif_id}.png'
+
+    meteo = sub(root, 'METEO', ALTITUDEVENT1=optional(2000), ALTITUDEVENT2=optional(3000))
+    etree.SubElement(meteo, 'COMMENTAIRE').text = text(rng, 60)
+    for step in range(echeances):
+        echeance(meteo, rng, day + timedelta(days=1, hours=6 * (step + 1)))
+    etree.SubElement(meteo, 'ImageMeteo').text = f'apercu_meteo_{massif_id}.png'
+
+    # History of the last bsh_days days, ending with the bulletin day
+    bsh = etree.SubElement(root, 'BSH')
+    history = [day - timedelta(days=bsh_days - 1 - index) for index in range(bsh_days)]
+    bsh_meteo = etree.SubElement(bsh, 'METEO')
+    for when in history:
+        for hours in (6, 12, 18, 24):
+            echeance(bsh_meteo, rng, when + timedelta(hours=hours), mer_nuages=False)
+    enneigements = etree.SubElement(bsh, 'ENNEIGEMENTS')
+    for when in history:
+        element = sub(enneigements, 'ENNEIGEMENT', DATE=date(when),
+                      LimiteSud=rng.randrange(500, 2500, 100), LimiteNord=rng.randrange(500, 2500, 100))
+        niveaux(element, rng, niveaux_count)
+    bsh_neige = sub(bsh, 'NEIGEFRAICHE', ALTITUDESS=1800)
+    for when in history[1:]:
+        high = rng.randrange(0, 50)
+        sub(bsh_neige, 'NEIGE24H', DATE=date(when), SS24Min=rng.randrange(0, high + 1), SS24Max=high)
+    risques = etree.SubElement(bsh, 'RISQUES')
+    for when in history:
+        sub(risques, 'RISQUE', DATE=date(when), RISQUEMAXI=rng.randint(1, 5))
+    etree.SubElement(bsh, 'Image7derniersjours').text = f'sept_derniers_jours_{massif_id}.png'
+    etree.SubElement(bsh, 'Image7derniersjours_portrait').text = f'sept_derniers_jours_portrait_{massif_id}.png'
+
+    meta = etree.SubElement(root, 'TexteMeta')
+    etree.SubElement(meta, 'EnteteGenerique')
+    etree.SubElement(meta, 'BasDePageGenerique')
+    etree.SubElement(meta, 'Partenaires').text = text(rng, 200)
+
+    return etree.tostring(root, encoding='UTF-8', xml_declaration=True, standalone=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1, help='multiplies every default size')
+    parser.add_argument('--echeances', type=int)
+    parser.add_argument('--bsh-days', type=int)
+    parser.add_argument('--niveaux', type=int)
+    parser.add_argument('--text-length', type=int, help='characters')
+    parser.add_argument('--no-cartouche', action='store_true')
+    parser.add_argument('--empty-attributes', action='store_true')
+    parser.add_argument('--amendment', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help='file to write, else standard output')
+    args = parser.parse_args()
+
+    xml = generate_bulletin(
+        echeances=args.echeances or ECHEANCES * args.scale,
+        bsh_days=args.bsh_days or BSH_DAYS * args.scale,
+        niveaux_count=args.niveaux or NIVEAUX * args.scale,
+        text_length=args.text_length or TEXT_LENGTH * args.scale,
+        cartouche=not args.no_cartouche,
+        empty_attributes=args.empty_attributes,
+        amendment=args.amendment,
+        seed=args.seed,
+    )
+    if args.output:
+        with open(args.output, 'wb') as file:
+            file.write(xml)
+    else:
+        print(xml.decode('utf-8'))
+
+
+if __name__ == '__main__':
+    main()
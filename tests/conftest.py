@@ -0,0 +1,24 @@
+"""Pytest configuration of the tests."""
+import importlib.util
+
+# These tests import the integration package, which needs Home Assistant
+# (requirements-test-ha.txt); the others only need requirements-test.txt
+HOME_ASSISTANT_TESTS = [
+    'test_archive.py',
+    'test_config_flow.py',
+    'test_health.py',
+    'test_history.py',
+    'test_image.py',
+    'test_image_store.py',
+    'test_importer.py',
+    'test_pool.py',
+    'test_registry.py',
+    'test_render.py',
+    'test_sensor.py',
+    'test_session.py',
+    'test_state_writer.py',
+    'test_variants.py',
+    'test_views.py',
+]
+
+collect_ignore = [] if importlib.util.find_spec('homeassistant') else HOME_ASSISTANT_TESTS
@@ -0,0 +1,417 @@
+"""Season-long simulation of the integration against a local fake API.
+
+Runs the real massif registry, coordinators, scheduler, stores and entities
+for a whole winter on an event loop with a virtual clock: timers fire
+immediately, in order, so five months take seconds. The fake API sits under
+the API client as its transport and publishes synthetic bulletins (see
+bulletin_generator.py) on a realistic calendar: every day at 16:00, Paris
+time, with occasional amendments a few hours later.
+
+It reports, per massif, the requests and bytes received, the bulletins
+parsed, the entity states written and how long new bulletins took to be
+fetched, to compare scheduling and caching strategies. Home Assistant must
+be installed:
+
+    python tests/simulate_season.py --massifs 10
+    python tests/simulate_season.py --massifs 10 --profile lean --local-images --record
+
+--record appends the totals to simulate_season.jsonl, next to this file.
+"""
+import argparse
+import asyncio
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import hashlib
+import json
+import logging
+import os
+import platform
+import random
+import selectors
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import parse_qs, urlsplit
+from zoneinfo import ZoneInfo
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from homeassistant.const import EVENT_STATE_CHANGED  # noqa: E402
+from homeassistant.core import CoreState, HomeAssistant  # noqa: E402
+from homeassistant.helpers import device_registry as dr, entity_registry as er  # noqa: E402
+from homeassistant.helpers.entity_platform import EntityPlatform  # noqa: E402
+import homeassistant.util.dt as dt_util  # noqa: E402
+
+from bulletin_generator import (  # noqa: E402
+    BSH_DAYS,
+    ECHEANCES,
+    NIVEAUX,
+    TEXT_LENGTH,
+    generate_bulletin,
+)
+from custom_components.meteofrance_montagne import (  # noqa: E402
+    _parse_sections,
+    binary_sensor,
+    image,
+    sensor,
+)
+from custom_components.meteofrance_montagne.const import (  # noqa: E402
+    BASE_URL,
+    CONF_LOCAL_IMAGES,
+    CONF_PARSE_PROFILE,
+    DOMAIN,
+    IMAGE_SPILL_DIR,
+    LOCAL_IMAGE_TYPES,
+    PARSE_PROFILES,
+)
+from custom_components.meteofrance_montagne.coordinator import MassifRegistry  # noqa: E402
+from custom_components.meteofrance_montagne.entity import StateWriter  # noqa: E402
+from custom_components.meteofrance_montagne.image_store import ImageStore  # noqa: E402
+from custom_components.meteofrance_montagne.pool import TokenPool  # noqa: E402
+from custom_components.meteofrance_montagne.transport import TransportResponse  # noqa: E402
+from custom_components.meteofrance_montagne.variants import ImageVariantCache  # noqa: E402
+
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), 'simulate_season.jsonl')
+
+TOKEN = 'simulation'
+PARIS = ZoneInfo('Europe/Paris')
+PUBLICATION_HOUR = 16
+PUBLICATION_DELAY = timedelta(minutes=25)
+PLATFORMS = {'sensor': sensor, 'binary_sensor': binary_sensor, 'image': image}
+COUNTERS = ('requests', 'kib', 'parses', 'writes')
+
+
+class VirtualClock:
+    """Time of the simulation, in seconds since its start."""
+
+    def __init__(self, start):
+        self.start = start
+        self.elapsed = 0.0
+
+    def time(self):
+        return self.elapsed
+
+    def now(self):
+        return self.start + timedelta(seconds=self.elapsed)
+
+    def advance(self, seconds):
+        self.elapsed += max(seconds, 0)
+
+
+class VirtualSelector(selectors.DefaultSelector):
+    """Selector jumping to the next timer instead of waiting for it."""
+
+    def __init__(self, clock):
+        super().__init__()
+        self.clock = clock
+
+    def select(self, timeout=None):
+        events = super().select(0)
+        if not events and timeout:
+            self.clock.advance(timeout)
+        return events
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """Event loop running on the virtual clock."""
+
+    def __init__(self, clock):
+        super().__init__(VirtualSelector(clock))
+        self.clock = clock
+
+    def time(self):
+        return self.clock.time()
+
+
+@dataclass(frozen=True)
+class Publication:
+    """A bulletin of the calendar."""
+
+    available: datetime  # UTC
+    bulletin_date: datetime  # Paris time, as in the bulletins
+    amendment: bool = False
+
+
+def calendar(massif_id, start, days, amendment_rate, seed):
+    """Return the publications of a massif, the day before start included."""
+    rng = random.Random(f'{seed}-{massif_id}')
+    publications = []
+    for day in range(-1, days):
+        local = (start + timedelta(days=day)).astimezone(PARIS)
+        bulletin_date = local.replace(hour=PUBLICATION_HOUR, minute=0, second=0, microsecond=0)
+        publications.append(Publication(
+            (bulletin_date + PUBLICATION_DELAY).astimezone(timezone.utc),
+            bulletin_date.replace(tzinfo=None)))
+        if rng.random() < amendment_rate:
+            amended = bulletin_date + PUBLICATION_DELAY + timedelta(hours=rng.randrange(2, 6))
+            publications.append(Publication(
+                amended.astimezone(timezone.utc), bulletin_date.replace(tzinfo=None), True))
+    return publications
+
+
+class SeasonApi:
+    """Fake API answering from the publication calendar, as a transport."""
+
+    def __init__(self, clock, calendars, sizes, image_size, seed):
+        self.clock = clock
+        self.calendars = calendars
+        self.sizes = sizes
+        self.image_size = image_size
+        self.seed = seed
+        self.stats = defaultdict(lambda: {'requests': 0, 'bytes': 0, 'parses': 0})
+        # Delays from publication to first fetch, per massif
+        self.delays = defaultdict(list)
+        self._served = set()
+        self._xml = {}
+
+    def current(self, massif_id):
+        """Return the latest publication available for a massif."""
+        publications = self.calendars[massif_id]
+        index = bisect_right([p.available for p in publications], self.clock.now())
+        return publications[max(index - 1, 0)]
+
+    def bulletin(self, massif_id, publication):
+        """Return the XML of a publication, generated once."""
+        key = (massif_id, publication)
+        if key not in self._xml:
+            # Only the current bulletin of each massif is kept
+            self._xml = {k: v for k, v in self._xml.items() if k[0] != massif_id}
+            self._xml[key] = generate_bulletin(
+                massif_id=massif_id,
+                massif=f'Massif {massif_id}',
+                bulletin_date=publication.bulletin_date,
+                amendment=publication.amendment,
+                published=publication.available.astimezone(PARIS).replace(tzinfo=None),
+                seed=self.seed,
+                **self.sizes,
+            )
+        return self._xml[key]
+
+    def image(self, massif_id, image_type, publication):
+        """Return the content of an image, changing with each publication."""
+        digest = hashlib.sha256(f'{massif_id}-{image_type}-{publication}'.encode()).digest()
+        return b'\x89PNG\r\n\x1a\n' + (digest * (self.image_size // len(digest) + 1))[:self.image_size]
+
+    async def request(self, method, url, headers, timeout):
+        """Answer a request of the API client."""
+        parts = urlsplit(url)
+        path = parts.path.removeprefix(urlsplit(BASE_URL).path)
+        massif_id = int(parse_qs(parts.query).get('id-massif', ['0'])[0])
+        if massif_id not in self.calendars:
+            return TransportResponse(404)
+
+        publication = self.current(massif_id)
+        if path == '/massif/BRA':
+            body = self.bulletin(massif_id, publication)
+            self.stats[massif_id]['parses'] += 1
+            if (massif_id, publication) not in self._served:
+                self._served.add((massif_id, publication))
+                self.delays[massif_id].append(
+                    (self.clock.now() - publication.available).total_seconds())
+        elif path.startswith('/massif/image/'):
+            body = self.image(massif_id, path.rsplit('/', 1)[1], publication)
+        else:
+            return TransportResponse(404)
+
+        self.stats[massif_id]['requests'] += 1
+        self.stats[massif_id]['bytes'] += len(body)
+        return TransportResponse(200, {}, body)
+
+
+async def async_start_hass(directory, clock):
+    """Return a Home Assistant core, without any integration or timer."""
+    hass = HomeAssistant(directory)
+    await hass.config.async_set_time_zone('Europe/Paris')
+
+    # Executor jobs run inline: the clock must not move while they run
+    async def async_add_executor_job(target, *args):
+        return target(*args)
+
+    hass.async_add_executor_job = async_add_executor_job
+    await er.async_load(hass)
+    await dr.async_load(hass)
+    hass.set_state(CoreState.running)
+    return hass
+
+
+async def simulate(args, clock):
+    """Run a season and return the statistics per massif."""
+    start = clock.start
+    calendars = {
+        massif_id: calendar(massif_id, start, args.days, args.amendment_rate, args.seed)
+        for massif_id in range(1, args.massifs + 1)
+    }
+    sizes = {
+        'echeances': ECHEANCES * args.scale,
+        'bsh_days': BSH_DAYS * args.scale,
+        'niveaux_count': NIVEAUX * args.scale,
+        'text_length': TEXT_LENGTH * args.scale,
+    }
+    api = SeasonApi(clock, calendars, sizes, args.image_size, args.seed)
+    options = {
+        CONF_PARSE_PROFILE: args.profile,
+        CONF_LOCAL_IMAGES: LOCAL_IMAGE_TYPES if args.local_images else [],
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        hass = await async_start_hass(directory, clock)
+
+        # What async_setup prepares, without the HTTP views
+        pool = TokenPool(hass, None, transport=api)
+        pool.api(TOKEN)
+        pool.stats[TOKEN].clock = clock.time
+        images = ImageStore(hass, hass.config.path(IMAGE_SPILL_DIR))
+        images.setup()
+        hass.data[DOMAIN] = {
+            'image_variants': ImageVariantCache(hass),
+            'image_entities': {},
+            'states': StateWriter(hass),
+            'tokens': pool,
+            'images': images,
+        }
+        registry = MassifRegistry(hass, pool, images)
+        hass.data[DOMAIN]['massifs'] = registry
+
+        platforms = {
+            domain: EntityPlatform(
+                hass=hass, logger=logging.getLogger(__name__), domain=domain,
+                platform_name=DOMAIN, platform=None,
+                scan_interval=timedelta(seconds=30), entity_namespace=None)
+            for domain in PLATFORMS
+        }
+        massif_of_entity = {}
+        for massif_id in calendars:
+            entry = argparse.Namespace(
+                entry_id=f'massif_{massif_id}',
+                data={'code': massif_id, 'massif_name': f'Massif {massif_id}'},
+                options=options,
+            )
+            hass.data[DOMAIN][entry.entry_id] = await registry.async_subscribe(
+                entry.entry_id, massif_id, f'Massif {massif_id}', TOKEN,
+                options[CONF_LOCAL_IMAGES], _parse_sections(options))
+            for domain, module in PLATFORMS.items():
+                entities = []
+                await module.async_setup_entry(hass, entry, entities.extend)
+                await platforms[domain].async_add_entities(entities)
+                massif_of_entity.update((entity.entity_id, massif_id) for entity in entities)
+
+        writes = defaultdict(int)
+
+        def count_write(event):
+            if (massif_id := massif_of_entity.get(event.data['entity_id'])) is not None:
+                writes[massif_id] += 1
+
+        # The season starts once everything is set up
+        await hass.async_block_till_done()
+        hass.data[DOMAIN]['states'].async_flush()
+        api.stats.clear()
+        api.delays.clear()
+        hass.bus.async_listen(EVENT_STATE_CHANGED, count_write)
+
+        started = time.process_time()
+        await asyncio.sleep(args.days * 86400)
+        hass.data[DOMAIN]['states'].async_flush()
+        cpu = time.process_time() - started
+
+        for massif_id in list(registry.coordinators):
+            await registry.async_unsubscribe(f'massif_{massif_id}', massif_id)
+        await hass.async_stop(force=True)
+
+    return {
+        massif_id: {
+            'requests': api.stats[massif_id]['requests'],
+            'kib': api.stats[massif_id]['bytes'] / 1024,
+            'parses': api.stats[massif_id]['parses'],
+            'writes': writes[massif_id],
+            'publications': sum(p.available > start for p in calendars[massif_id]),
+            'fetched': len(api.delays[massif_id]),
+            'delay_minutes': (
+                sum(api.delays[massif_id]) / len(api.delays[massif_id]) / 60
+                if api.delays[massif_id] else None),
+        }
+        for massif_id in calendars
+    }, cpu
+
+
+def record(config, totals):
+    """Append the results to the history of runs."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    with open(RESULTS_PATH, 'a', encoding='utf-8') as file:
+        file.write(json.dumps({
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'commit': commit,
+            'python': platform.python_version(),
+            **config,
+            'totals': totals,
+        }) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--massifs', type=int, default=10)
+    parser.add_argument('--start', type=datetime.fromisoformat, default=datetime(2025, 12, 1))
+    parser.add_argument('--days', type=int, default=151, help='season length')
+    parser.add_argument('--amendment-rate', type=float, default=0.1, help='per bulletin')
+    parser.add_argument('--profile', choices=list(PARSE_PROFILES), default='full')
+    parser.add_argument('--local-images', action='store_true', help='render images locally')
+    parser.add_argument('--scale', type=int, default=1, help='bulletin size multiplier')
+    parser.add_argument('--image-size', type=int, default=40 * 1024, help='bytes per image')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--record', action='store_true', help=f'append to {RESULTS_PATH}')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    start = args.start.replace(tzinfo=PARIS).astimezone(timezone.utc)
+    clock = VirtualClock(start)
+    # Wall-clock dates follow the virtual clock too
+    dt_util.utcnow = clock.now
+    loop = VirtualTimeLoop(clock)
+    wall = time.monotonic()
+    try:
+        results, cpu = loop.run_until_complete(simulate(args, clock))
+    finally:
+        loop.close()
+    wall = time.monotonic() - wall
+
+    print(f"{args.massifs} massifs, {args.days} days from {args.start.date()}, "
+          f"profile {args.profile}, {'local' if args.local_images else 'downloaded'} images, "
+          f"{args.amendment_rate:.0%} amendments, simulated in {wall:.1f}s ({cpu:.1f}s CPU)")
+    print(f"{'massif':<8}{'requests':>10}{'KiB':>10}{'parses':>8}{'writes':>8}"
+          f"{'bulletins':>11}{'delay min':>11}")
+    for massif_id, stats in results.items():
+        delay = stats['delay_minutes']
+        print(f"{massif_id:<8}{stats['requests']:>10}{stats['kib']:>10.0f}{stats['parses']:>8}"
+              f"{stats['writes']:>8}{stats['fetched']:>5}/{stats['publications']:<5}"
+              f"{'-' if delay is None else f'{delay:.0f}':>11}")
+    totals = {counter: round(sum(stats[counter] for stats in results.values())) for counter in COUNTERS}
+    print(f"{'total':<8}{totals['requests']:>10}{totals['kib']:>10}{totals['parses']:>8}"
+          f"{totals['writes']:>8}")
+    print(f"{'/massif':<8}{totals['requests'] / args.massifs:>10.0f}"
+          f"{totals['kib'] / args.massifs:>10.0f}{totals['parses'] / args.massifs:>8.0f}"
+          f"{totals['writes'] / args.massifs:>8.0f}")
+
+    if args.record:
+        totals['cpu_seconds'] = round(cpu, 1)
+        record({
+            'massifs': args.massifs,
+            'days': args.days,
+            'amendment_rate': args.amendment_rate,
+            'profile': args.profile,
+            'local_images': args.local_images,
+            'scale': args.scale,
+            'image_size': args.image_size,
+        }, totals)
+
+
+if __name__ == '__main__':
+    main()
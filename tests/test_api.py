@@ -1,7 +1,58 @@
-"""Tests for the MeteoFranceMontagneApi XML parsing."""
+"""Tests for the MeteoFranceMontagneApi XML parsing.
+
+The section filter tests import the integration package, which needs Home
+Assistant; they are skipped when it is not installed.
+"""
+import asyncio
+import copy
+import importlib
+import importlib.util
+import json
 import os
+import sys
+import unittest
+
 from lxml import etree
 
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+# Massif list, with the department key variants the API has used
+MASSIF_LIST = json.dumps({
+    'type': 'FeatureCollection',
+    'features': [
+        {
+            'type': 'Feature',
+            'properties': {'title': 'Chablais', 'code': 1, 'Departemen': '74', 'surface': 812.5},
+            'geometry': {'type': 'Polygon', 'coordinates': [
+                [[6.4, 46.1], [6.9, 46.1], [6.9, 46.6], [6.4, 46.1]]]},
+        },
+        {
+            'type': 'Feature',
+            'properties': {'title': 'Aravis', 'code': 2, 'Departemen': '74', 'Dep2': '73'},
+            'geometry': {'type': 'Polygon', 'coordinates': [
+                [[6.2, 45.6], [6.6, 45.6], [6.6, 46.0], [6.2, 45.6]]]},
+        },
+        {
+            'type': 'Feature',
+            'properties': {'title': 'Cinto-Rotondo', 'code': 40, 'departement': '2B'},
+            'geometry': {'type': 'MultiPolygon', 'coordinates': [
+                [[[8.8, 42.0], [9.1, 42.0], [9.1, 42.3], [8.8, 42.0]]]]},
+        },
+        {
+            'type': 'Feature',
+            'properties': {'title': 'Capcir-Puymorens', 'code': 69, 'Departement': '66',
+                           'Departement2': '09'},
+            'geometry': {'type': 'Polygon', 'coordinates': [
+                [[1.8, 42.5], [2.1, 42.5], [2.1, 42.8], [1.8, 42.5]]]},
+        },
+        {
+            'type': 'Feature',
+            'properties': {'title': 'Sans département', 'code': 99},
+            'geometry': None,
+        },
+    ],
+}).encode('utf-8')
+
 
 def parse_bulletin_xml(xml_doc):
     """Parse XML bulletin and convert to JSON structure."""
@@ -27,6 +78,14 @@ def parse_bulletin_xml(xml_doc):
                 return None
         return None
 
+    def to_bool_or_null(value):
+        """Convert 'true'/'false' to bool or None."""
+        if value == 'true':
+            return True
+        if value == 'false':
+            return False
+        return None
+
     # Parse CARTOUCHERISQUE
     cartouche = root.find('CARTOUCHERISQUE')
     risque_elem = cartouche.find('RISQUE') if cartouche is not None else None
@@ -56,14 +115,14 @@ def parse_bulletin_xml(xml_doc):
             'commentaire': get_text(cartouche.find('CommentaireRisqueJ2')) if cartouche is not None else ''
         },
         'pentes_particulieres': {
-            'NE': to_int_or_null(get_attr(pente_elem, 'NE')) if pente_elem is not None else None,
-            'E': to_int_or_null(get_attr(pente_elem, 'E')) if pente_elem is not None else None,
-            'SE': to_int_or_null(get_attr(pente_elem, 'SE')) if pente_elem is not None else None,
-            'S': to_int_or_null(get_attr(pente_elem, 'S')) if pente_elem is not None else None,
-            'SW': to_int_or_null(get_attr(pente_elem, 'SW')) if pente_elem is not None else None,
-            'W': to_int_or_null(get_attr(pente_elem, 'W')) if pente_elem is not None else None,
-            'NW': to_int_or_null(get_attr(pente_elem, 'NW')) if pente_elem is not None else None,
-            'N': to_int_or_null(get_attr(pente_elem, 'N')) if pente_elem is not None else None,
+            'NE': to_bool_or_null(get_attr(pente_elem, 'NE')) if pente_elem is not None else None,
+            'E': to_bool_or_null(get_attr(pente_elem, 'E')) if pente_elem is not None else None,
+            'SE': to_bool_or_null(get_attr(pente_elem, 'SE')) if pente_elem is not None else None,
+            'S': to_bool_or_null(get_attr(pente_elem, 'S')) if pente_elem is not None else None,
+            'SW': to_bool_or_null(get_attr(pente_elem, 'SW')) if pente_elem is not None else None,
+            'W': to_bool_or_null(get_attr(pente_elem, 'W')) if pente_elem is not None else None,
+            'NW': to_bool_or_null(get_attr(pente_elem, 'NW')) if pente_elem is not None else None,
+            'N': to_bool_or_null(get_attr(pente_elem, 'N')) if pente_elem is not None else None,
             'commentaire': get_attr(pente_elem, 'COMMENTAIRE') if pente_elem is not None else ''
         }
     }
@@ -280,9 +339,11 @@ def test_parse_bulletin_xml():
 
     # Test pentes particulières (boolean conversion)
     pentes = result['risque']['pentes_particulieres']
-    assert pentes['NE'] is None  # "false" in XML
-    assert pentes['E'] is None    # "true" in XML - but parsing as int gives None
-    assert pentes['N'] is None
+    assert pentes['NE'] is False  # "false" in XML
+    assert pentes['E'] is True    # "true" in XML
+    assert pentes['S'] is True
+    assert pentes['N'] is False
+    assert pentes['commentaire'] == ''
 
     # Test estimation J2
     assert result['risque']['estimation_j2']['date'] == '2025-11-23T00:00:00'
@@ -401,8 +462,144 @@ def test_parse_bulletin_xml():
     return result
 
 
+def integration():
+    """Import the integration package, or skip without Home Assistant."""
+    if importlib.util.find_spec('homeassistant') is None:
+        raise unittest.SkipTest('Home Assistant is not installed')
+    sys.path.insert(0, ROOT)
+    return importlib.import_module('custom_components.meteofrance_montagne')
+
+
+def parse_sample(sections=None):
+    """Parse the sample bulletin with the parser of api.py."""
+    api = importlib.import_module('custom_components.meteofrance_montagne.api')
+    xml_doc = etree.fromstring(load_sample_xml().encode('utf-8'))
+    return api.MeteoFranceMontagneApi.parse_bulletin_xml(xml_doc, sections=sections)
+
+
+def without_history(bulletin):
+    """Return a bulletin without its history keys."""
+    bulletin = copy.deepcopy(bulletin)
+    for section in ('risque', 'enneigement', 'neige_fraiche'):
+        bulletin[section].pop('historique', None)
+    bulletin['meteo'].pop('echeances_historique', None)
+    return bulletin
+
+
+def test_parse_sections():
+    """Test the sections parsed for each profile."""
+    package = integration()
+    const = importlib.import_module('custom_components.meteofrance_montagne.const')
+    assert package._parse_sections({}) is None  # pylint: disable=protected-access
+    for profile, sections in (
+            ('full', None),
+            ('lean', const.CURRENT_SECTIONS),
+            ('custom', const.PARSE_SECTIONS)):
+        options = {const.CONF_PARSE_PROFILE: profile}
+        assert package._parse_sections(options) == sections  # pylint: disable=protected-access
+    options = {const.CONF_PARSE_PROFILE: 'custom', const.CONF_PARSE_SECTIONS: ['risque']}
+    assert package._parse_sections(options) == ['risque']  # pylint: disable=protected-access
+    print("✓ Parse profiles")
+
+
+def test_lean_profile():
+    """Test that the lean profile keeps the current sections and skips history."""
+    integration()
+    const = importlib.import_module('custom_components.meteofrance_montagne.const')
+    full = parse_sample()
+    lean = parse_sample(const.PARSE_PROFILES['lean'])
+    assert lean == without_history(full)
+    assert 'historique' not in lean['risque']
+    assert 'echeances_historique' not in lean['meteo']
+    print("✓ Lean profile")
+
+
+def test_custom_profile():
+    """Test that skipped sections are empty and kept ones unchanged."""
+    integration()
+    full = parse_sample()
+    empty = parse_sample([])
+    custom = parse_sample(['risque', 'meteo', 'historique_meteo'])
+
+    for key in ('type', 'id', 'massif', 'dateBulletin', 'amendement'):
+        assert custom[key] == full[key]
+    assert custom['risque'] == without_history(full)['risque']
+    assert custom['meteo'] == full['meteo']
+    assert custom['meteo']['echeances_historique']
+    for section in ('stabilite', 'qualite', 'enneigement', 'neige_fraiche'):
+        assert custom[section] == empty[section] != full[section]
+    assert empty['enneigement'] == {'date': '', 'limite_sud': None, 'limite_nord': None, 'niveaux': []}
+    assert empty['neige_fraiche'] == {'altitude_ss': None, 'mesures': []}
+    assert empty['stabilite'] == {'situations_avalancheuses': [], 'titre': '', 'texte': ''}
+    assert empty['qualite'] == ''
+    print("✓ Custom profile")
+
+
+def test_massif_list():
+    """Test the streamed massif list, fetched once with the spatial index."""
+    integration()
+    api_module = importlib.import_module('custom_components.meteofrance_montagne.api')
+    transport_module = importlib.import_module('custom_components.meteofrance_montagne.transport')
+
+    class FakeTransport:
+        """Transport answering the massif list."""
+
+        def __init__(self):
+            self.requests = []
+
+        async def request(self, method, url, headers, timeout):
+            self.requests.append(url)
+            return transport_module.TransportResponse(200, {}, MASSIF_LIST)
+
+    class StubHass:
+        """Just enough of hass to run executor jobs."""
+
+        def __init__(self):
+            self.data = {}
+            self.jobs = []
+
+        async def async_add_executor_job(self, target, *args):
+            self.jobs.append(target.__name__)
+            return target(*args)
+
+    hass = StubHass()
+    transport = FakeTransport()
+    api = api_module.MeteoFranceMontagneApi(None, hass, 'token', transport=transport)
+    # Departments of the properties decoded with json, as before streaming
+    expected = api.organize_properties(
+        feature['properties'] for feature in json.loads(MASSIF_LIST)['features'])
+    assert expected == {
+        '74': [{'title': 'Chablais', 'code': 1}, {'title': 'Aravis', 'code': 2}],
+        '73': [{'title': 'Aravis', 'code': 2}],
+        '2B': [{'title': 'Cinto-Rotondo', 'code': 40}],
+        '66': [{'title': 'Capcir-Puymorens', 'code': 69}],
+        '09': [{'title': 'Capcir-Puymorens', 'code': 69}],
+    }
+
+    assert api.massifs_by_department(MASSIF_LIST) == expected
+
+    async def run():
+        # Both views come from a single download, parsed in the executor
+        massifs, index = await asyncio.gather(
+            api_module.async_get_massif_list(hass, api),
+            api_module.async_get_massif_index(hass, api),
+        )
+        assert massifs == expected
+        assert index.nearest(46.3, 6.6)['code'] == 1
+        assert await api_module.async_get_massif_list(hass, api) is massifs
+        assert len(transport.requests) == 1
+        assert sorted(hass.jobs) == ['from_geojson', 'massifs_by_department']
+
+    asyncio.run(run())
+    print("✓ Massif list")
+
+
 if __name__ == '__main__':
+    for test in (test_parse_sections, test_lean_profile, test_custom_profile, test_massif_list):
+        try:
+            test()
+        except unittest.SkipTest as err:
+            print(f"- {test.__name__} skipped: {err}")
     result = test_parse_bulletin_xml()
     print("\n=== Parsed Result ===")
-    import json
     print(json.dumps(result, indent=2, ensure_ascii=False))
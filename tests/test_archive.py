@@ -0,0 +1,174 @@
+"""Tests for the local bulletin archive.
+
+The integration package imports Home Assistant, which must be installed.
+"""
+from datetime import datetime
+import importlib.util
+import os
+import sys
+
+from lxml import etree
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from custom_components.meteofrance_montagne.api import MeteoFranceMontagneApi  # noqa: E402
+from custom_components.meteofrance_montagne.archive import BulletinArchive  # noqa: E402
+
+spec = importlib.util.spec_from_file_location(
+    'bulletin_generator', os.path.join(os.path.dirname(__file__), 'bulletin_generator.py'))
+bulletin_generator = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bulletin_generator)
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'sample_bulletin.xml')
+BULLETIN_DATE = datetime(2025, 11, 21, 16)
+
+
+def bulletin(**kwargs):
+    """Generate and parse a bulletin."""
+    xml = bulletin_generator.generate_bulletin(bulletin_date=BULLETIN_DATE, **kwargs)
+    return MeteoFranceMontagneApi.parse_bulletin_xml(etree.fromstring(xml))
+
+
+def forecasts(archive):
+    """Return the per-bulletin rows of an archive."""
+    conn = archive._conn  # pylint: disable=protected-access
+    return (
+        conn.execute('SELECT * FROM risques ORDER BY zone').fetchall(),
+        conn.execute('SELECT * FROM echeances ORDER BY date').fetchall(),
+    )
+
+
+def test_amendment():
+    """Test that an amendment replaces the rows of the bulletin it amends."""
+    original = bulletin()
+    amended = bulletin(amendment=True)
+    assert original['risque'] != amended['risque']
+
+    expected = BulletinArchive(':memory:').open()
+    expected.write_batch([amended])
+    expected_rows = forecasts(expected)
+    expected.close()
+
+    for batches in (
+        [[original], [amended]],
+        [[amended], [original]],
+        [[original, amended]],
+        [[amended, original]],
+    ):
+        archive = BulletinArchive(':memory:').open()
+        for batch in batches:
+            archive.write_batch(batch)
+        assert forecasts(archive) == expected_rows
+        conn = archive._conn  # pylint: disable=protected-access
+        rows = conn.execute('SELECT amendement FROM bulletins ORDER BY amendement')
+        assert [row[0] for row in rows] == [0, 1]
+        archive.close()
+    print("✓ Amendments")
+
+
+def test_older_bulletin_written_later():
+    """Test that daily values keep the most recent bulletin, whatever the batch."""
+    def day_bulletin(hour, value):
+        """Return a bulletin of 2025-01-02 valid on 2025-01-03, with its values set."""
+        xml = bulletin_generator.generate_bulletin(
+            bulletin_date=datetime(2025, 1, 2, hour), bsh_days=0)
+        parsed = MeteoFranceMontagneApi.parse_bulletin_xml(etree.fromstring(xml))
+        parsed['risque'] = dict(parsed['risque'], risque_max=str(value))
+        parsed['enneigement'] = dict(parsed['enneigement'], limite_nord=value * 100, niveaux=[
+            dict(niveau, nord=value) for niveau in parsed['enneigement']['niveaux']])
+        parsed['neige_fraiche'] = dict(parsed['neige_fraiche'], mesures=[
+            dict(mesure, max=value) for mesure in parsed['neige_fraiche']['mesures']])
+        return parsed
+
+    def values(archive):
+        """Return the daily values of 2025-01-02 and 2025-01-03."""
+        conn = archive._conn  # pylint: disable=protected-access
+        query = "SELECT DISTINCT {column} FROM {table} WHERE date >= '2025-01-02'"
+        return tuple(
+            {row[0] for row in conn.execute(query.format(column=column, table=table))}
+            for column, table in (
+                ('risque_max', 'risques_jour'), ('limite_nord', 'enneigement'),
+                ('nord', 'enneigement_niveaux'), ('max', 'neige_fraiche'),
+            )
+        )
+
+    recent = day_bulletin(16, 4)
+    older = day_bulletin(9, 2)
+    for batches in ([[recent], [older]], [[older], [recent]], [[older, recent]]):
+        archive = BulletinArchive(':memory:').open()
+        for batch in batches:
+            archive.write_batch(batch)
+        page = archive.query_history(['72'], '2025-01-03', '2025-01-03', 'risque_max')
+        assert [row['value'] for row in page['results']] == [4]
+        assert values(archive) == ({4}, {400}, {4}, {4})
+        archive.close()
+    print("✓ Older bulletin written later")
+
+
+def sample_archive():
+    """Return an in-memory archive of the sample bulletin, for two massifs."""
+    sample = MeteoFranceMontagneApi.parse_bulletin_xml(etree.parse(SAMPLE_PATH).getroot())
+    other = dict(sample, id='73')
+    other['risque'] = dict(sample['risque'], risque_max='4')
+    archive = BulletinArchive(':memory:').open()
+    archive.write_batch([sample, other])
+    return archive
+
+
+def test_query_daily():
+    """Test daily series, filtered by massif and paged."""
+    archive = sample_archive()
+    page = archive.query_history(['72'], '2025-11-15', '2025-11-22', 'risque_max')
+    assert page['total'] == 8
+    assert [(row['date'], row['value']) for row in page['results']] == [
+        ('2025-11-15', 1), ('2025-11-16', 1), ('2025-11-17', 1), ('2025-11-18', 1),
+        ('2025-11-19', 1), ('2025-11-20', 1), ('2025-11-21', 2), ('2025-11-22', 3),
+    ]
+    assert {row['massif'] for row in page['results']} == {'72'}
+
+    page = archive.query_history([], '2025-11-21', '2025-11-22', 'risque_max', limit=3, offset=1)
+    assert page['total'] == 4
+    assert [(row['massif'], row['date'], row['value']) for row in page['results']] == [
+        ('72', '2025-11-22', 3), ('73', '2025-11-21', 2), ('73', '2025-11-22', 4),
+    ]
+
+    # Forecasts give the daily maximum of their steps
+    page = archive.query_history(['72'], '2025-11-20', '2025-11-23', 'iso_0')
+    assert [(row['date'], row['value']) for row in page['results']] == [
+        ('2025-11-20', 1300), ('2025-11-21', 900), ('2025-11-22', 1200), ('2025-11-23', 1800),
+    ]
+    archive.close()
+    print("✓ Daily queries")
+
+
+def test_query_aggregated():
+    """Test aggregations over the whole range, one row per massif."""
+    archive = sample_archive()
+    page = archive.query_history([], '2025-11-01', '2025-11-30', 'risque_max', 'max')
+    assert page['total'] == 2
+    assert page['results'] == [
+        {'massif': '72', 'value': 3, 'days': 8},
+        {'massif': '73', 'value': 4, 'days': 8},
+    ]
+
+    page = archive.query_history(['72'], '2025-11-16', '2025-11-22', 'neige_fraiche_max', 'sum')
+    assert page['results'] == [{'massif': '72', 'value': 84, 'days': 7}]
+    page = archive.query_history(['72'], '2025-11-16', '2025-11-22', 'neige_fraiche_max', 'min')
+    assert page['results'] == [{'massif': '72', 'value': 0, 'days': 7}]
+    page = archive.query_history(['72'], '2025-11-21', '2025-11-22', 'neige_fraiche_max', 'avg')
+    assert page['results'] == [{'massif': '72', 'value': 20.0, 'days': 2}]
+
+    # No data in range
+    page = archive.query_history([], '2024-01-01', '2024-01-31', 'limite_nord', 'max')
+    assert page == {'total': 0, 'offset': 0, 'limit': 100, 'results': []}
+    archive.close()
+    print("✓ Aggregated queries")
+
+
+if __name__ == '__main__':
+    test_amendment()
+    test_older_bulletin_written_later()
+    test_query_daily()
+    test_query_aggregated()
+    print("✓ All tests passed!")
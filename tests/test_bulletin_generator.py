@@ -0,0 +1,87 @@
+"""Tests for the synthetic bulletin generator."""
+import importlib.util
+import os
+
+from lxml import etree
+
+TESTS_DIR = os.path.dirname(__file__)
+
+
+def load(name):
+    """Load a module of the tests directory by path."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(TESTS_DIR, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+bulletin_generator = load('bulletin_generator')
+parse_bulletin_xml = load('test_api').parse_bulletin_xml
+
+
+def parse(**kwargs):
+    """Generate a bulletin and parse it."""
+    return parse_bulletin_xml(etree.fromstring(bulletin_generator.generate_bulletin(**kwargs)))
+
+
+def test_default_sizes():
+    """Test that the default bulletin has the sizes of the sample."""
+    result = parse()
+    assert result['id'] == '72'
+    assert result['amendement'] is False
+    assert result['risque']['risque_max'] in {'1', '2', '3', '4', '5'}
+    assert isinstance(result['risque']['pentes_particulieres']['NE'], bool)
+    assert len(result['meteo']['echeances']) == 4
+    assert len(result['meteo']['echeances_historique']) == 28
+    assert len(result['risque']['historique']) == 7
+    assert len(result['enneigement']['niveaux']) == 3
+    assert len(result['enneigement']['historique']) == 7
+    assert len(result['neige_fraiche']['historique']) == 6
+    assert result['risque']['historique'][-1]['date'] == '2025-11-21T00:00:00'
+    # Same seed, same bulletin
+    assert bulletin_generator.generate_bulletin(seed=3) == bulletin_generator.generate_bulletin(seed=3)
+    print("✓ Default sizes")
+
+
+def test_scaled_sizes():
+    """Test a bulletin ten times larger than usual."""
+    result = parse(echeances=40, bsh_days=70, niveaux_count=30, text_length=12000)
+    assert len(result['meteo']['echeances']) == 40
+    assert len(result['meteo']['echeances_historique']) == 280
+    assert len(result['risque']['historique']) == 70
+    assert len(result['enneigement']['niveaux']) == 30
+    assert all(len(day['niveaux']) == 30 for day in result['enneigement']['historique'])
+    assert len(result['stabilite']['texte']) > 12000
+    # Accented text survives the round trip
+    assert any(character in result['stabilite']['texte'] for character in 'éèêîà')
+    print("✓ Scaled sizes")
+
+
+def test_edge_cases():
+    """Test missing cartouche, empty attributes and amendments."""
+    result = parse(cartouche=False)
+    assert result['risque']['risque_max'] == ''
+    assert result['risque']['resume'] == ''
+    assert result['risque']['pentes_particulieres']['N'] is None
+
+    result = parse(empty_attributes=True)
+    assert result['risque']['altitude_limite'] is None
+    assert result['risque']['risque_1']['localisation'] == ''
+    assert result['risque']['pentes_particulieres']['S'] is None
+    assert result['enneigement']['limite_sud'] is None
+    assert result['neige_fraiche']['altitude_ss'] is None
+    assert result['neige_fraiche']['mesures'][0]['min'] is None
+    assert result['meteo']['altitude_vent_1'] is None
+
+    original, amended = parse(), parse(amendment=True)
+    assert amended['amendement'] is True
+    assert amended['dateBulletin'] == original['dateBulletin']
+    assert amended['dateDiffusion'] > original['dateDiffusion']
+    print("✓ Edge cases")
+
+
+if __name__ == '__main__':
+    test_default_sizes()
+    test_scaled_sizes()
+    test_edge_cases()
+    print("✓ All tests passed!")
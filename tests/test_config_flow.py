@@ -0,0 +1,190 @@
+"""Tests for the config flow adding several massifs at once.
+
+The integration package imports Home Assistant, which must be installed.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from homeassistant.config_entries import SOURCE_USER  # noqa: E402
+from homeassistant.data_entry_flow import AbortFlow, FlowResultType  # noqa: E402
+
+from custom_components.meteofrance_montagne.config_flow import (  # noqa: E402
+    SOURCE_ADD_MASSIF,
+    MeteoFranceMontagneConfigFlow,
+)
+from custom_components.meteofrance_montagne.const import CONF_MASSIF, CONF_TOKEN, DOMAIN  # noqa: E402
+
+DEPARTMENTS = {
+    'Isère': [
+        {'code': '7', 'title': 'Chartreuse'},
+        {'code': '8', 'title': 'Belledonne'},
+        {'code': '12', 'title': 'Oisans'},
+        {'code': '13', 'title': 'Vercors'},
+    ],
+}
+
+
+class StubFlowManager:
+    """Flow manager running the flows started by another flow."""
+
+    def __init__(self, hass):
+        self.hass = hass
+        self.sources = []
+
+    def async_progress_by_handler(self, handler, include_uninitialized=False, match_context=None):
+        return []
+
+    async def async_init(self, handler, *, context=None, data=None):
+        self.sources.append(context['source'])
+        flow = MeteoFranceMontagneConfigFlow()
+        flow.hass = self.hass
+        flow.handler = handler
+        flow.context = dict(context)
+        try:
+            result = await getattr(flow, f"async_step_{context['source']}")(data)
+        except AbortFlow as err:
+            return {'type': FlowResultType.ABORT, 'reason': err.reason}
+        return self.hass.config_entries.async_add(result, context['source'])
+
+
+class StubConfigEntries:
+    """Config entries of the stubbed hass, the flows adding to them."""
+
+    def __init__(self, hass):
+        self.entries = [argparse.Namespace(
+            entry_id='api', unique_id=None, source=SOURCE_USER, data={CONF_TOKEN: 'token'})]
+        self.flow = StubFlowManager(hass)
+
+    def async_entries(self, _domain, include_ignore=True):
+        return self.entries
+
+    def async_get_entry(self, entry_id):
+        return next((entry for entry in self.entries if entry.entry_id == entry_id), None)
+
+    def async_entry_for_domain_unique_id(self, _domain, unique_id):
+        return next((entry for entry in self.entries if entry.unique_id == unique_id), None)
+
+    def async_add(self, result, source):
+        """Add the entry created by a flow, as the flow manager does."""
+        if result['type'] == FlowResultType.CREATE_ENTRY:
+            self.entries.append(argparse.Namespace(
+                entry_id=result['data'][CONF_MASSIF], unique_id=result['context']['unique_id'],
+                source=source, title=result['title'], data=result['data']))
+        return result
+
+
+class StubHass:
+    """Just enough of hass for the config flow, the massif list cached."""
+
+    def __init__(self):
+        self.data = {DOMAIN: {'massif_index': None, 'massif_list': DEPARTMENTS}}
+        self.config_entries = StubConfigEntries(self)
+
+
+def massif_flow(hass):
+    """Return a user flow at the massif step of Isère."""
+    flow = MeteoFranceMontagneConfigFlow()
+    flow.hass = hass
+    flow.handler = DOMAIN
+    flow.context = {'source': SOURCE_USER}
+    flow._departments_data = DEPARTMENTS  # pylint: disable=protected-access
+    flow._selected_department = 'Isère'  # pylint: disable=protected-access
+    flow._parent_entry_id = 'api'  # pylint: disable=protected-access
+    return flow
+
+
+def massif_entries(hass):
+    """Return the massif entries by code."""
+    return {
+        entry.data[CONF_MASSIF]: entry
+        for entry in hass.config_entries.entries if CONF_MASSIF in entry.data
+    }
+
+
+def test_several_massifs():
+    """Test that every selected massif gets its entry."""
+    async def run():
+        hass = StubHass()
+        with patch('custom_components.meteofrance_montagne.config_flow.async_get_session'):
+            result = await massif_flow(hass).async_step_massif(
+                {'massif': ['Vercors', 'Chartreuse', 'Oisans']})
+        hass.config_entries.async_add(result, SOURCE_USER)
+
+        # The first massif of the department is created by the user flow
+        assert result['type'] == FlowResultType.CREATE_ENTRY
+        assert result['title'] == 'Isère - Chartreuse'
+        assert result['description'] is None
+        assert hass.config_entries.flow.sources == [SOURCE_ADD_MASSIF] * 2
+
+        entries = massif_entries(hass)
+        assert sorted(entries) == ['12', '13', '7']
+        assert entries['7'].source == SOURCE_USER
+        assert entries['13'].source == entries['12'].source == SOURCE_ADD_MASSIF
+        assert entries['13'].title == 'Isère - Vercors'
+        assert entries['13'].unique_id == 'api_13'
+        assert entries['13'].data == {
+            CONF_MASSIF: '13', 'massif_name': 'Vercors', 'parent_entry_id': 'api'}
+        assert not hasattr(MeteoFranceMontagneConfigFlow, 'async_step_import')
+
+    asyncio.run(run())
+    print("✓ Several massifs")
+
+
+def test_skipped_massifs():
+    """Test that the massifs not added are reported."""
+    async def run():
+        hass = StubHass()
+        flow = massif_flow(hass)
+        with patch('custom_components.meteofrance_montagne.config_flow.async_get_session'):
+            # Configured meanwhile, so still in the form
+            hass.config_entries.async_add(
+                await massif_flow(hass).async_step_massif({'massif': ['Oisans']}), SOURCE_USER)
+            result = await flow.async_step_massif({'massif': ['Belledonne', 'Oisans']})
+
+        assert result['type'] == FlowResultType.CREATE_ENTRY
+        assert result['title'] == 'Isère - Belledonne'
+        assert result['description'] == 'massifs_skipped'
+        assert result['description_placeholders'] == {'massifs': 'Oisans'}
+
+    asyncio.run(run())
+    print("✓ Skipped massifs reported")
+
+
+def test_add_massif_checks():
+    """Test that the flows of the other massifs only add known massifs."""
+    async def run():
+        hass = StubHass()
+        flow_manager = hass.config_entries.flow
+        data = {'code': '13', 'department': 'Isère', 'parent_entry_id': 'api'}
+        with patch('custom_components.meteofrance_montagne.config_flow.async_get_session'):
+            await flow_manager.async_init(
+                DOMAIN, context={'source': SOURCE_ADD_MASSIF}, data=dict(data, code='7'))
+            for changes, reason in (
+                ({'code': '99'}, 'unknown_massif'),
+                ({'department': 'Savoie'}, 'unknown_massif'),
+                ({'parent_entry_id': 'missing'}, 'no_api'),
+                # A massif entry is no API entry
+                ({'parent_entry_id': '7'}, 'no_api'),
+                ({'code': '7'}, 'already_configured'),
+            ):
+                result = await flow_manager.async_init(
+                    DOMAIN, context={'source': SOURCE_ADD_MASSIF}, data=dict(data, **changes))
+                assert result['type'] == FlowResultType.ABORT, changes
+                assert result['reason'] == reason, changes
+        assert sorted(massif_entries(hass)) == ['7']
+
+    asyncio.run(run())
+    print("✓ Added massifs checked")
+
+
+if __name__ == '__main__':
+    test_several_massifs()
+    test_skipped_massifs()
+    test_add_massif_checks()
+    print("✓ All tests passed!")
@@ -0,0 +1,59 @@
+"""Tests for the bulletin diff engine."""
+import importlib.util
+import os
+
+# Load diff.py directly, the package itself needs Home Assistant
+DIFF_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'custom_components', 'meteofrance_montagne', 'diff.py')
+spec = importlib.util.spec_from_file_location('diff', DIFF_PATH)
+diff = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(diff)
+
+
+def test_diff_paths():
+    """Test changed paths between two bulletins."""
+    old = {
+        'date': '2025-01-10T16:00:00',
+        'risque': {'risque_max': 3, 'pentes_particulieres': {'N': True, 'S': False}},
+        'enneigement': {'limite_nord': 1200, 'niveaux': [{'altitude': 1500, 'nord': 40}]},
+        'meteo': {'iso_0': 1800},
+    }
+    new = {
+        'date': '2025-01-11T16:00:00',
+        'risque': {'risque_max': 3, 'pentes_particulieres': {'N': True, 'S': True}},
+        'enneigement': {'limite_nord': 1200, 'niveaux': [{'altitude': 1500, 'nord': 55}]},
+        'meteo': {'iso_0': 1800},
+        'qualite': 'good',
+    }
+
+    assert diff.diff_paths(old, old) == []
+    assert diff.diff_paths(old, dict(old)) == []
+    assert diff.diff_paths(old, new) == [
+        'date',
+        'enneigement.niveaux',
+        'qualite',
+        'risque.pentes_particulieres.S',
+    ]
+    # A dict replaced by a scalar is reported at its own path
+    assert diff.diff_paths({'meteo': {'iso_0': 1800}}, {'meteo': None}) == ['meteo']
+    print("✓ diff_paths")
+
+
+def test_paths_match():
+    """Test matching changed paths against entity inputs."""
+    changed = ['enneigement.niveaux', 'risque.pentes_particulieres.S']
+
+    assert diff.paths_match(changed, ('risque',))
+    assert diff.paths_match(changed, ('enneigement.niveaux',))
+    assert not diff.paths_match(changed, ('meteo', 'date'))
+    assert not diff.paths_match(changed, ('risque.estimation_j2',))
+    # A replaced parent touches every key below it
+    assert diff.paths_match(['risque'], ('risque.estimation_j2',))
+    assert not diff.paths_match([], ('risque',))
+    print("✓ paths_match")
+
+
+if __name__ == '__main__':
+    test_diff_paths()
+    test_paths_match()
+    print("✓ All tests passed!")
@@ -0,0 +1,74 @@
+"""Tests for the massif spatial index."""
+import importlib.util
+import json
+import os
+
+# Load geo.py directly, the package itself needs Home Assistant
+GEO_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'custom_components', 'meteofrance_montagne', 'geo.py')
+spec = importlib.util.spec_from_file_location('geo', GEO_PATH)
+geo = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(geo)
+
+
+def square(lon, lat, size):
+    """Return a closed square ring."""
+    return [[lon, lat], [lon + size, lat], [lon + size, lat + size], [lon, lat + size], [lon, lat]]
+
+
+GEOJSON = json.dumps({
+    'type': 'FeatureCollection',
+    'features': [
+        {
+            'type': 'Feature',
+            'properties': {'title': 'Chablais', 'code': 1, 'Departemen': '74'},
+            'geometry': {'type': 'Polygon', 'coordinates': [square(6.4, 46.1, 0.5)]},
+        },
+        {
+            # A ring with a hole, spanning two departments
+            'type': 'Feature',
+            'properties': {'title': 'Aravis', 'code': 2, 'Departemen': '74', 'Dep2': '73'},
+            'geometry': {'type': 'Polygon', 'coordinates': [
+                square(6.2, 45.6, 0.4), square(6.3, 45.7, 0.1)]},
+        },
+        {
+            'type': 'Feature',
+            'properties': {'title': 'Corse', 'code': 40, 'Departemen': '2B'},
+            'geometry': {'type': 'MultiPolygon', 'coordinates': [
+                [square(8.8, 42.0, 0.3)], [square(9.1, 42.4, 0.3)]]},
+        },
+    ],
+}).encode('utf-8')
+
+
+def test_massif_index():
+    """Test point-in-polygon and nearest massif lookups."""
+    index = geo.MassifIndex.from_geojson(GEOJSON)
+    assert len(index) == 3
+
+    found = index.find(46.3, 6.6)
+    assert found['code'] == 1
+    assert found['title'] == 'Chablais'
+    assert found['inside'] is True
+
+    assert index.find(45.65, 6.25)['code'] == 2
+    assert index.find(45.65, 6.25)['departments'] == ['74', '73']
+    # Inside the hole
+    assert index.find(45.75, 6.35) is None
+    # Second polygon of a multipolygon
+    assert index.find(42.5, 9.2)['code'] == 40
+
+    # Between Aravis and Chablais, closer to Chablais
+    nearest = index.nearest(46.07, 6.5)
+    assert nearest['code'] == 1
+    assert nearest['inside'] is False
+    assert 3 < nearest['distance'] < 4
+    # The hole is nearest to its own massif
+    assert index.nearest(45.75, 6.35)['code'] == 2
+    assert index.nearest(45.75, 6.35)['inside'] is False
+    print("✓ MassifIndex")
+
+
+if __name__ == '__main__':
+    test_massif_index()
+    print("✓ All tests passed!")
@@ -0,0 +1,190 @@
+"""Tests for the API health probe.
+
+The integration package imports Home Assistant, which must be installed.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+import aiohttp
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from custom_components.meteofrance_montagne.api import MeteoFranceMontagneApi  # noqa: E402
+from custom_components.meteofrance_montagne.binary_sensor import (  # noqa: E402
+    MeteoFranceMontagneApiSensor,
+)
+from custom_components.meteofrance_montagne.const import DOMAIN  # noqa: E402
+from custom_components.meteofrance_montagne.health import HealthProbe  # noqa: E402
+from custom_components.meteofrance_montagne.transport import TransportResponse  # noqa: E402
+
+TOKEN = 'token'
+
+
+class FakeTransport:
+    """Transport answering from a list of responses or errors, in order."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    async def request(self, method, url, headers, timeout):
+        self.requests.append(method)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class FakePool:
+    """Token pool with no configured token, sharing its transport."""
+
+    def __init__(self, transport):
+        self.transport = transport
+
+    def configured_tokens(self):
+        return []
+
+
+class FakeClock:
+    """Clock moved forward by the tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubHass:
+    """Just enough of hass for the probe."""
+
+    def __init__(self, transport):
+        self.data = {DOMAIN: {'tokens': FakePool(transport)}}
+
+
+def response(status):
+    """Return an empty response with a status."""
+    return TransportResponse(status, {}, b'')
+
+
+def probe(*responses):
+    """Return a probe answered by responses, its transport and its clock."""
+    transport = FakeTransport(responses)
+    clock = FakeClock()
+    return HealthProbe(StubHass(transport), None, ttl=60, clock=clock), transport, clock
+
+
+def test_cached_result():
+    """Test that results are shared within the TTL."""
+    async def run():
+        health, transport, clock = probe(response(200), response(401))
+        result = await health.async_probe(TOKEN)
+        assert result['ok'] and result['error'] is None and result['status'] == 200
+        assert transport.requests == ['HEAD']
+
+        clock.now = 59
+        assert await health.async_probe(TOKEN) is result
+        assert len(transport.requests) == 1
+
+        clock.now = 60
+        result = await health.async_probe(TOKEN)
+        assert result['error'] == 'invalid_auth' and result['status'] == 401
+        assert len(transport.requests) == 2
+
+    asyncio.run(run())
+    print("✓ Cached results")
+
+
+def test_force():
+    """Test that a forced probe ignores the cached result."""
+    async def run():
+        health, transport, _clock = probe(response(401), response(200))
+        assert not (await health.async_probe(TOKEN))['ok']
+        assert (await health.async_probe(TOKEN, force=True))['ok']
+        assert len(transport.requests) == 2
+
+    asyncio.run(run())
+    print("✓ Forced probe")
+
+
+def test_cannot_connect_not_cached():
+    """Test that connection failures are checked again on the next call."""
+    async def run():
+        health, transport, _clock = probe(
+            aiohttp.ClientConnectionError(), asyncio.TimeoutError(), response(503), response(200))
+        for status in (None, None, 503):
+            result = await health.async_probe(TOKEN)
+            assert result['error'] == 'cannot_connect' and result['status'] == status
+        assert (await health.async_probe(TOKEN))['ok']
+        assert len(transport.requests) == 4
+
+    asyncio.run(run())
+    print("✓ Connection failures not cached")
+
+
+def test_status_mapping():
+    """Test the errors of 4xx statuses, 429 meaning a valid but limited token."""
+    async def run():
+        health, _transport, _clock = probe(response(404))
+        result = await health.async_probe(TOKEN)
+        assert result['error'] == 'cannot_connect' and result['status'] == 404
+
+        health, _transport, _clock = probe(response(429))
+        result = await health.async_probe(TOKEN)
+        assert not result['ok']
+        assert result['error'] == 'rate_limited' and result['status'] == 429
+
+    asyncio.run(run())
+    print("✓ Status mapping")
+
+
+def test_head_not_allowed():
+    """Test that a 405 on HEAD falls back to a GET of the massif list."""
+    async def run():
+        health, transport, _clock = probe(response(405), response(200))
+        result = await health.async_probe(TOKEN)
+        assert result['ok'] and result['status'] == 200
+        assert transport.requests == ['HEAD', 'GET']
+
+        # A 405 is never taken for a valid token
+        health, transport, _clock = probe(response(405), response(405))
+        result = await health.async_probe(TOKEN)
+        assert result['error'] == 'cannot_connect' and result['status'] == 405
+        health, transport, _clock = probe(response(405), response(401))
+        result = await health.async_probe(TOKEN)
+        assert result['error'] == 'invalid_auth' and result['status'] == 401
+
+        # A client remembers that HEAD is rejected
+        transport = FakeTransport([response(405), response(200), response(200)])
+        api = MeteoFranceMontagneApi(None, None, TOKEN, transport=transport)
+        await api.probe()
+        await api.probe()
+        assert transport.requests == ['HEAD', 'GET', 'GET']
+
+    asyncio.run(run())
+    print("✓ HEAD not allowed")
+
+
+def test_connectivity_sensor():
+    """Test that a rate-limited token is reported as connected."""
+    entry = argparse.Namespace(data={'token': TOKEN}, title='API', entry_id='api')
+    sensor = MeteoFranceMontagneApiSensor(entry)
+    assert sensor.is_on is None
+    for error, is_on in ((None, True), ('rate_limited', True),
+                         ('invalid_auth', False), ('cannot_connect', False)):
+        sensor._result = {'ok': error is None, 'error': error}  # pylint: disable=protected-access
+        assert sensor.is_on is is_on
+    print("✓ Connectivity sensor")
+
+
+if __name__ == '__main__':
+    test_cached_result()
+    test_force()
+    test_cannot_connect_not_cached()
+    test_status_mapping()
+    test_head_not_allowed()
+    test_connectivity_sensor()
+    print("✓ All tests passed!")
@@ -0,0 +1,128 @@
+"""Tests for the rolling history store.
+
+The integration package imports Home Assistant, which must be installed.
+"""
+import asyncio
+import copy
+from datetime import datetime, timedelta
+import os
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from custom_components.meteofrance_montagne.const import DOMAIN  # noqa: E402
+from custom_components.meteofrance_montagne.history import HistoryStore  # noqa: E402
+
+
+class StubConfig:
+    """Configuration directory of the stubbed hass."""
+
+    def __init__(self, directory):
+        self.config_dir = directory
+
+    def path(self, *parts):
+        return os.path.join(self.config_dir, *parts)
+
+
+class StubHass:
+    """Just enough of hass for a history store."""
+
+    def __init__(self, directory):
+        self.data = {DOMAIN: {}}
+        self.config = StubConfig(directory)
+        self.loop = asyncio.get_running_loop()
+
+
+class RecordingStore:
+    """History store backend counting the saves."""
+
+    def __init__(self):
+        self.saves = 0
+
+    def async_delay_save(self, data_func, delay=0):
+        self.saves += 1
+
+
+def day(offset):
+    """Return the date of a day of November 2025."""
+    return (datetime(2025, 11, 20) + timedelta(days=offset)).isoformat()
+
+
+def bulletin(last_day, window=3):
+    """Return a bulletin resending the risk and weather of the last days."""
+    days = range(last_day - window + 1, last_day + 1)
+    return {
+        'id': '72',
+        'risque': {'risque_max': '3', 'historique': [
+            {'date': day(offset), 'risque_max': str(offset % 5 + 1)} for offset in days]},
+        'meteo': {'echeances': [], 'echeances_historique': [
+            {'date': day(offset), 'iso_0': 1000 + offset} for offset in days]},
+    }
+
+
+def history_store(retention):
+    """Return a history store of the given retention, with a stub backend."""
+    store = HistoryStore(StubHass(tempfile.gettempdir()), '72', retention)
+    store._store = RecordingStore()  # pylint: disable=protected-access
+    return store
+
+
+def test_merge_accumulates():
+    """Test that the history grows beyond the window of a bulletin."""
+    async def run():
+        store = history_store(retention=30)
+        for last_day in range(0, 6):
+            merged = store.merge(bulletin(last_day))
+        dates = [entry['date'] for entry in merged['risque']['historique']]
+        assert dates == [day(offset) for offset in range(-2, 6)]
+        assert [e['date'] for e in merged['meteo']['echeances_historique']] == dates
+        # Other keys of the sections are kept
+        assert merged['risque']['risque_max'] == '3'
+        assert merged['meteo']['echeances'] == []
+        assert store._store.saves == 6  # pylint: disable=protected-access
+
+        # A bulletin with no new day does not save
+        store.merge(bulletin(5))
+        assert store._store.saves == 6  # pylint: disable=protected-access
+
+    asyncio.run(run())
+    print("✓ History accumulated")
+
+
+def test_merge_prunes():
+    """Test that entries older than the retention are dropped."""
+    async def run():
+        store = history_store(retention=4)
+        for last_day in range(0, 10):
+            merged = store.merge(bulletin(last_day))
+        dates = [entry['date'] for entry in merged['risque']['historique']]
+        assert dates == [day(offset) for offset in range(5, 10)]
+
+    asyncio.run(run())
+    print("✓ History pruned")
+
+
+def test_merge_keeps_bulletin():
+    """Test that the bulletin is not modified and missing sections are skipped."""
+    async def run():
+        store = history_store(retention=30)
+        store.merge(bulletin(0))
+        lean = bulletin(3)
+        del lean['meteo']['echeances_historique']
+        original = copy.deepcopy(lean)
+        merged = store.merge(lean)
+        assert lean == original
+        assert len(merged['risque']['historique']) == 6
+        assert 'echeances_historique' not in merged['meteo']
+
+    asyncio.run(run())
+    print("✓ Bulletin kept")
+
+
+if __name__ == '__main__':
+    test_merge_accumulates()
+    test_merge_prunes()
+    test_merge_keeps_bulletin()
+    print("✓ All tests passed!")
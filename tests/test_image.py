@@ -0,0 +1,116 @@
+"""Tests for the massif image entities.
+
+The integration package imports Home Assistant, which must be installed.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from custom_components.meteofrance_montagne.const import DOMAIN  # noqa: E402
+from custom_components.meteofrance_montagne.coordinator import (  # noqa: E402
+    MeteoFranceMontagneDataUpdateCoordinator,
+)
+from custom_components.meteofrance_montagne.image import MeteoFranceMontagneImage  # noqa: E402
+from custom_components.meteofrance_montagne.image_store import ImageStore  # noqa: E402
+from custom_components.meteofrance_montagne.variants import ImageVariantCache  # noqa: E402
+
+
+class StubConfig:
+    """Configuration directory of the stubbed hass."""
+
+    def __init__(self, directory):
+        self.config_dir = directory
+
+    def path(self, *parts):
+        return os.path.join(self.config_dir, *parts)
+
+
+class StubHass:
+    """Just enough of hass for coordinators and entities."""
+
+    def __init__(self, directory):
+        self.data = {DOMAIN: {}}
+        self.config = StubConfig(directory)
+        self.loop = asyncio.get_running_loop()
+
+    async def async_add_executor_job(self, target, *args):
+        return target(*args)
+
+
+def test_content_type_follows_local_images():
+    """Test that the content type changes when another entry renders locally."""
+    async def run():
+        with tempfile.TemporaryDirectory() as directory:
+            coordinator = MeteoFranceMontagneDataUpdateCoordinator(
+                StubHass(directory), None, images=None, massif_id=72, massif_name='Orlu')
+            coordinator.add_subscriber('first', 'token', local_images=['rose_pentes'])
+            coordinator.data = {'rose_pentes': 'a' * 32}
+            entity = MeteoFranceMontagneImage(coordinator, 'first', 'rose_pentes', 'webp')
+            assert entity.content_type == 'image/svg+xml'
+
+            # Images are local only if every entry of the massif wants them so
+            coordinator.add_subscriber('second', 'token')
+            assert entity.content_type == 'image/webp'
+            coordinator.remove_subscriber('second')
+            assert entity.content_type == 'image/svg+xml'
+
+    asyncio.run(run())
+    print("✓ Content type of local images")
+
+
+def test_content_type_of_placeholder():
+    """Test that the placeholder shown while downloading is served as SVG."""
+    async def run():
+        with tempfile.TemporaryDirectory() as directory:
+            coordinator = MeteoFranceMontagneDataUpdateCoordinator(
+                StubHass(directory), None, images=None, massif_id=72, massif_name='Orlu')
+            coordinator.add_subscriber('first', 'token')
+            coordinator.data = {'montagne_risques': None}
+            entity = MeteoFranceMontagneImage(coordinator, 'first', 'montagne_risques', 'thumbnail_webp')
+            assert entity.content_type == 'image/svg+xml'
+            assert entity.variant_etag('thumbnail_webp').endswith('-svg"')
+
+            entity._set_image('a' * 32)  # pylint: disable=protected-access
+            assert entity.content_type == 'image/webp'
+
+    asyncio.run(run())
+    print("✓ Content type of the placeholder")
+
+
+def test_spilled_image_deleted():
+    """Test serving a spilled image whose file is deleted meanwhile."""
+    async def run():
+        with tempfile.TemporaryDirectory() as directory:
+            hass = StubHass(directory)
+            store = ImageStore(hass, os.path.join(directory, 'images'), max_size=1)
+            store.setup()
+            hass.data[DOMAIN]['images'] = store
+            hass.data[DOMAIN]['image_variants'] = ImageVariantCache(hass)
+            coordinator = MeteoFranceMontagneDataUpdateCoordinator(
+                hass, None, images=store, massif_id=72, massif_name='Orlu')
+            coordinator.add_subscriber('first', 'token')
+            digest = await store.async_put(b'spilled')
+            await store.async_put(b'in memory')
+            coordinator.data = {'montagne_risques': digest}
+            entity = MeteoFranceMontagneImage(coordinator, 'first', 'montagne_risques')
+            entity.hass = hass
+            assert await entity.async_image_variant('original') == b'spilled'
+
+            # Replaced by a new bulletin while being served
+            store.path(digest).unlink()
+            assert await entity.async_image_variant('original') is None
+            assert await entity.async_image_variant('webp') is None
+
+    asyncio.run(run())
+    print("✓ Deleted spilled image")
+
+
+if __name__ == '__main__':
+    test_content_type_follows_local_images()
+    test_content_type_of_placeholder()
+    test_spilled_image_deleted()
+    print("✓ All tests passed!")
@@ -0,0 +1,145 @@
+"""Tests for the memory-bounded image store.
+
+The integration package imports Home Assistant, which must be installed.
+"""
+import asyncio
+import os
+from pathlib import Path
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from custom_components.meteofrance_montagne.const import DOMAIN  # noqa: E402
+from custom_components.meteofrance_montagne.image_store import ImageStore  # noqa: E402
+
+IMAGE_SIZE = 1000
+
+
+class StubHass:
+    """Just enough of hass for the image store, with a real executor."""
+
+    def __init__(self):
+        self.data = {DOMAIN: {}}
+        self.loop = asyncio.get_running_loop()
+        self.jobs = []
+
+    def async_add_executor_job(self, target, *args):
+        job = self.loop.run_in_executor(None, target, *args)
+        self.jobs.append(job)
+        return job
+
+    async def async_block_till_done(self):
+        # Failures were handled by the awaiting code
+        await asyncio.gather(*self.jobs, return_exceptions=True)
+
+
+def image(index):
+    """Return image content of IMAGE_SIZE bytes."""
+    return bytes([index]) * IMAGE_SIZE
+
+
+def run_with_store(test, max_size=2 * IMAGE_SIZE):
+    """Run an async test with a fresh store in a temporary directory."""
+    async def run():
+        with tempfile.TemporaryDirectory() as directory:
+            hass = StubHass()
+            store = ImageStore(hass, os.path.join(directory, 'images'), max_size)
+            store.setup()
+            await test(hass, store)
+            await hass.async_block_till_done()
+
+    asyncio.run(run())
+
+
+def test_lru_spill():
+    """Test that the least recently used images are spilled to disk."""
+    async def test(hass, store):
+        first = await store.async_put(image(1))
+        second = await store.async_put(image(2))
+        # Using the first image makes the second one the least recently used
+        assert store.source(first) == image(1)
+        third = await store.async_put(image(3))
+
+        assert store.as_dict()['memory_images'] == 2
+        assert store.as_dict()['spilled_images'] == 1
+        assert store.source(first) == image(1)
+        assert store.source(third) == image(3)
+        path = store.source(second)
+        assert isinstance(path, Path) and path.read_bytes() == image(2)
+        assert await store.async_get(second) == image(2)
+
+    run_with_store(test)
+    print("✓ LRU spill")
+
+
+def test_refcount():
+    """Test that images are deleted once no massif uses them."""
+    async def test(hass, store):
+        shared = await store.async_put(image(1))
+        assert await store.async_put(image(1)) == shared
+        await store.async_put(image(2))
+        await store.async_put(image(3))
+        path = store.path(shared)
+        assert path.exists()
+
+        store.async_release(shared)
+        assert store.path(shared) == path
+        store.async_release(shared)
+        await hass.async_block_till_done()
+        assert store.source(shared) is None
+        assert not path.exists()
+        assert store.as_dict()['spilled_images'] == 0
+
+        # Released images in memory free their share of the budget
+        store.async_release(await store.async_put(image(4)))
+        assert store.as_dict()['memory_bytes'] == IMAGE_SIZE
+        # Unknown digests are ignored
+        store.async_release(None)
+        store.async_release('unknown')
+
+    run_with_store(test)
+    print("✓ Reference counts")
+
+
+def test_release_while_spilling():
+    """Test that an image released while written to disk is deleted."""
+    async def test(hass, store):
+        first = await store.async_put(image(1))
+        await store.async_put(image(2))
+        path = store.directory / first
+
+        async def release():
+            # Readable while being written
+            assert store.source(first) == image(1)
+            store.async_release(first)
+
+        await asyncio.gather(store.async_put(image(3)), release())
+        await hass.async_block_till_done()
+        assert store.source(first) is None
+        assert not path.exists()
+
+    run_with_store(test)
+    print("✓ Release while spilling")
+
+
+def test_read_deleted():
+    """Test reading a spilled image deleted meanwhile."""
+    async def test(hass, store):
+        first = await store.async_put(image(1))
+        await store.async_put(image(2))
+        await store.async_put(image(3))
+        store.path(first).unlink()
+        assert await store.async_get(first) is None
+
+    run_with_store(test)
+    print("✓ Read of a deleted image")
+
+
+if __name__ == '__main__':
+    test_lru_spill()
+    test_refcount()
+    test_release_while_spilling()
+    test_read_deleted()
+    print("✓ All tests passed!")
@@ -0,0 +1,117 @@
+"""Tests for the bulk bulletin importer.
+
+The integration package imports Home Assistant, which must be installed.
+"""
+from datetime import datetime, timedelta
+import importlib.util
+import os
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from custom_components.meteofrance_montagne.archive import BulletinArchive  # noqa: E402
+from custom_components.meteofrance_montagne.importer import (  # noqa: E402
+    _source_key,
+    import_bulletins,
+)
+
+spec = importlib.util.spec_from_file_location(
+    'bulletin_generator', os.path.join(os.path.dirname(__file__), 'bulletin_generator.py'))
+bulletin_generator = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bulletin_generator)
+
+BULLETINS = 5
+
+
+def write_bulletins(directory, season=2025):
+    """Write BULLETINS daily bulletins of a massif and return their names.
+
+    Every season uses the same file names.
+    """
+    names = []
+    for day in range(BULLETINS):
+        name = f'bra_{day}.xml'
+        xml = bulletin_generator.generate_bulletin(
+            bulletin_date=datetime(season, 12, 1, 16) + timedelta(days=day), seed=day)
+        with open(os.path.join(directory, name), 'wb') as file:
+            file.write(xml)
+        names.append(name)
+    return names
+
+
+def test_import_and_resume():
+    """Test importing a directory, then resuming after every bulletin is stored."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'bulletins')
+        os.mkdir(source)
+        names = write_bulletins(source)
+        with open(os.path.join(source, 'broken.xml'), 'wb') as file:
+            file.write(b'<BULLETINS_NEIGE_AVALANCHE')
+        db = os.path.join(tmp, 'archive.db')
+
+        progress = []
+        summary = import_bulletins(source, db, workers=1, batch_size=2, progress=progress.append)
+        assert summary == {'imported': BULLETINS, 'skipped': 0, 'errors': 1}
+        # At most four bulletins are in flight, so several batches are written
+        assert len(progress) >= 2
+        assert [p['imported'] for p in progress] == sorted(p['imported'] for p in progress)
+        assert progress[-1]['imported'] == BULLETINS
+
+        archive = BulletinArchive(db).open()
+        try:
+            assert archive.imported_sources() == {
+                _source_key(open(os.path.join(source, name), 'rb').read()) for name in names}
+        finally:
+            archive.close()
+
+        # Broken bulletins are not recorded and are parsed again
+        summary = import_bulletins(source, db, workers=1)
+        assert summary == {'imported': 0, 'skipped': BULLETINS, 'errors': 1}
+    print("✓ Import and resume")
+
+
+def test_seasons_with_same_names():
+    """Test importing directories and tarballs whose files have the same names."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'archive.db')
+        for season in (2024, 2025):
+            source = os.path.join(tmp, str(season))
+            os.mkdir(source)
+            write_bulletins(source, season)
+            summary = import_bulletins(source, db, workers=1)
+            assert summary == {'imported': BULLETINS, 'skipped': 0, 'errors': 0}
+
+        # The same bulletins are skipped, whatever their file names
+        tarball = os.path.join(tmp, 'season.tar.gz')
+        with tarfile.open(tarball, 'w:gz') as tar:
+            tar.add(os.path.join(tmp, '2025', 'bra_0.xml'), arcname='renamed.xml')
+            tar.add(os.path.join(tmp, '2025', 'bra_0.xml'), arcname='copy/renamed.xml')
+        summary = import_bulletins(tarball, db, workers=1)
+        assert summary == {'imported': 0, 'skipped': 2, 'errors': 0}
+
+        archive = BulletinArchive(db).open()
+        try:
+            conn = archive._conn  # pylint: disable=protected-access
+            assert conn.execute('SELECT COUNT(*) FROM bulletins').fetchone()[0] == 2 * BULLETINS
+        finally:
+            archive.close()
+
+        # A new tarball of the same names is imported
+        other = os.path.join(tmp, '2026')
+        os.mkdir(other)
+        write_bulletins(other, 2026)
+        tarball = os.path.join(tmp, 'other.tar')
+        with tarfile.open(tarball, 'w') as tar:
+            tar.add(os.path.join(other, 'bra_0.xml'), arcname='bra_0.xml')
+        summary = import_bulletins(tarball, db, workers=1)
+        assert summary == {'imported': 1, 'skipped': 0, 'errors': 0}
+    print("✓ Seasons with the same file names")
+
+
+if __name__ == '__main__':
+    test_import_and_resume()
+    test_seasons_with_same_names()
+    print("✓ All tests passed!")
@@ -0,0 +1,156 @@
+"""Tests for the token pool and its per-token statistics.
+
+The integration package imports Home Assistant, which must be installed.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from custom_components.meteofrance_montagne.const import (  # noqa: E402
+    CONF_TOKEN,
+    TOKEN_ERROR_DECAY,
+    TOKEN_UNAUTHORIZED_COOLDOWN,
+)
+from custom_components.meteofrance_montagne.pool import TokenPool, TokenStats  # noqa: E402
+
+
+class FakeClock:
+    """Clock moved forward by the tests."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubConfigEntries:
+    """Config entries of the stubbed hass, one API entry per token."""
+
+    def __init__(self, tokens):
+        self.entries = [argparse.Namespace(data={CONF_TOKEN: token}) for token in tokens]
+
+    def async_entries(self, _domain):
+        return self.entries
+
+
+class StubHass:
+    """Just enough of hass for the pool."""
+
+    def __init__(self, tokens):
+        self.config_entries = StubConfigEntries(tokens)
+
+
+def pool(tokens, clock):
+    """Return a pool of tokens whose statistics use a clock."""
+    token_pool = TokenPool(StubHass(tokens), None)
+    for token in tokens:
+        token_pool.api(token).stats.clock = clock
+    return token_pool
+
+
+def test_quota_window():
+    """Test that requests leave the quota after the sliding period."""
+    async def run():
+        clock = FakeClock()
+        stats = TokenStats(quota=3, period=60, clock=clock)
+        assert stats.headroom() == 3
+        for delay in (0, 10, 20):
+            clock.now += delay
+            await stats.async_acquire()
+        assert stats.headroom() == 0
+
+        # The first request leaves the window exactly one period later
+        clock.now = 1059
+        assert stats.headroom() == 0
+        clock.now = 1060
+        assert stats.headroom() == 1
+        clock.now = 1090
+        assert stats.headroom() == 3
+
+    asyncio.run(run())
+    print("✓ Sliding quota window")
+
+
+def test_error_rate():
+    """Test that the error rate decays towards the latest outcomes."""
+    stats = TokenStats(quota=10, clock=FakeClock())
+    stats.record(500)
+    assert stats.error_rate == TOKEN_ERROR_DECAY
+    stats.record(None)
+    assert abs(stats.error_rate - (1 - (1 - TOKEN_ERROR_DECAY) ** 2)) < 1e-9
+    for _ in range(50):
+        stats.record(200)
+    assert stats.error_rate < 1e-4
+    assert stats.score() == stats.headroom() * (1 - stats.error_rate)
+
+    # Errors lower the score of a token with the same headroom
+    stats.record(404)
+    assert stats.score() < stats.headroom()
+    assert not stats.blocked
+    print("✓ Decayed error rate")
+
+
+def test_blocking():
+    """Test that 401 and 429 block a token for their cooldown."""
+    clock = FakeClock()
+    stats = TokenStats(clock=clock)
+    stats.record(401)
+    assert stats.blocked
+    clock.now += TOKEN_UNAUTHORIZED_COOLDOWN - 1
+    assert stats.blocked
+    clock.now += 1
+    assert not stats.blocked
+
+    stats.record(429, '30')
+    clock.now += 29
+    assert stats.blocked
+    clock.now += 1
+    assert not stats.blocked
+
+    # Without a usable Retry-After, the token waits for a whole period
+    stats.record(429, 'soon')
+    assert stats.blocked_until == clock.now + stats.period
+    print("✓ Blocking on 401 and 429")
+
+
+def test_candidates():
+    """Test the order of the tokens to try."""
+    async def run():
+        clock = FakeClock()
+        token_pool = pool(['busy', 'failing', 'idle'], clock)
+        await token_pool.api('busy').stats.async_acquire()
+        token_pool.api('failing').stats.record(500)
+
+        # Ranked by headroom and error rate
+        assert [api.token for api in token_pool.candidates()] == ['idle', 'busy', 'failing']
+
+        # Given tokens keep their order
+        assert [api.token for api in token_pool.candidates(['failing', 'idle'])] == [
+            'failing', 'idle']
+
+        # Blocked tokens are tried last, in both cases
+        token_pool.api('idle').stats.record(429, '60')
+        assert [api.token for api in token_pool.candidates()] == ['busy', 'failing', 'idle']
+        assert [api.token for api in token_pool.candidates(['idle', 'failing'])] == [
+            'failing', 'idle']
+
+        # Unblocked, the token is ranked again
+        clock.now += 60
+        token_pool.api('idle').stats.record(200)
+        assert [api.token for api in token_pool.candidates()] == ['busy', 'idle', 'failing']
+
+    asyncio.run(run())
+    print("✓ Candidates order")
+
+
+if __name__ == '__main__':
+    test_quota_window()
+    test_error_rate()
+    test_blocking()
+    test_candidates()
+    print("✓ All tests passed!")
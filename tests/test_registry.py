@@ -0,0 +1,139 @@
+"""Tests for the refresh slots of the massif coordinators.
+
+The integration package imports Home Assistant, which must be installed.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from custom_components.meteofrance_montagne.const import DOMAIN, UPDATE_INTERVAL  # noqa: E402
+from custom_components.meteofrance_montagne.coordinator import (  # noqa: E402
+    MassifRegistry,
+    MeteoFranceMontagneDataUpdateCoordinator,
+)
+
+INTERVAL = UPDATE_INTERVAL * 3600
+NOW = datetime(2025, 1, 2, 16, 0, 7, tzinfo=timezone.utc)
+
+
+class StubConfig:
+    """Configuration directory of the stubbed hass, never written."""
+
+    def __init__(self):
+        self.config_dir = tempfile.gettempdir()
+
+
+class StubHass:
+    """Just enough of hass for coordinators."""
+
+    def __init__(self):
+        self.data = {DOMAIN: {}}
+        self.config = StubConfig()
+        self.loop = asyncio.get_running_loop()
+
+
+class FailingApi:
+    """API client whose requests all fail."""
+
+    async def bulletin(self, massif_id, sections=None):
+        raise ConnectionError('unreachable')
+
+
+class FakePool:
+    """Token pool whose every candidate fails."""
+
+    def candidates(self, tokens=None):
+        return [FailingApi(), FailingApi()]
+
+
+class FakeImages:
+    """Image store holding nothing."""
+
+    def async_release(self, digest):
+        pass
+
+
+def registry(hass, massif_ids):
+    """Return a registry of coordinators for massif codes, spread."""
+    massifs = MassifRegistry(hass, FakePool(), FakeImages())
+    for massif_id in massif_ids:
+        coordinator = MeteoFranceMontagneDataUpdateCoordinator(
+            hass, massifs.pool, massifs.images, massif_id, f'Massif {massif_id}')
+        coordinator.add_subscriber('entry', 'token')
+        massifs.coordinators[massif_id] = coordinator
+    massifs._spread()  # pylint: disable=protected-access
+    return massifs
+
+
+def slot(coordinator):
+    """Return the time into the interval of the next refresh."""
+    return (NOW.timestamp() + coordinator.update_interval.total_seconds()) % INTERVAL
+
+
+def test_spread():
+    """Test that N massifs get distinct phases, evenly spaced."""
+    async def run():
+        hass = StubHass()
+        for count in (1, 2, 7, 23):
+            massifs = registry(hass, [str(massif_id) for massif_id in range(1, count + 1)])
+            phases = sorted(c.phase for c in massifs.coordinators.values())
+            assert phases == [index * INTERVAL / count for index in range(count)]
+
+        # Slots only depend on the set of massifs, not on their order
+        first = registry(hass, ['72', '1', '40'])
+        second = registry(hass, ['40', '72', '1'])
+        assert {m: c.phase for m, c in first.coordinators.items()} == {
+            m: c.phase for m, c in second.coordinators.items()}
+
+        # Removing a massif spreads the others again
+        del first.coordinators['1']
+        first._spread()  # pylint: disable=protected-access
+        assert sorted(c.phase for c in first.coordinators.values()) == [0, INTERVAL / 2]
+
+    asyncio.run(run())
+    print("✓ Spread phases")
+
+
+def test_set_phase():
+    """Test that the next refresh falls on the phase of the massif."""
+    async def run():
+        coordinator = registry(StubHass(), ['72']).coordinators['72']
+        with patch('homeassistant.util.dt.utcnow', return_value=NOW):
+            for phase in (0.0, 1234.5, INTERVAL - 1):
+                coordinator.set_phase(phase)
+                assert slot(coordinator) == phase
+                assert 0 < coordinator.update_interval.total_seconds() <= INTERVAL
+
+            # Exactly on the slot, the next one is a whole interval away
+            coordinator.set_phase(NOW.timestamp() % INTERVAL)
+            assert coordinator.update_interval == timedelta(seconds=INTERVAL)
+
+    asyncio.run(run())
+    print("✓ Phase of the next refresh")
+
+
+def test_failed_refresh_keeps_slot():
+    """Test that the refresh delay is reset after a failed refresh."""
+    async def run():
+        coordinator = registry(StubHass(), ['72']).coordinators['72']
+        coordinator.set_phase(600)
+        coordinator.update_interval = timedelta(seconds=1)
+        with patch('homeassistant.util.dt.utcnow', return_value=NOW):
+            assert await coordinator._async_update_data() is None  # pylint: disable=protected-access
+        assert slot(coordinator) == 600
+
+    asyncio.run(run())
+    print("✓ Slot kept after a failed refresh")
+
+
+if __name__ == '__main__':
+    test_spread()
+    test_set_phase()
+    test_failed_refresh_keeps_slot()
+    print("✓ All tests passed!")
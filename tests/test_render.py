@@ -0,0 +1,132 @@
+"""Tests for the local SVG rendering of bulletin charts.
+
+The integration package imports Home Assistant, which must be installed.
+"""
+import importlib.util
+import os
+import sys
+
+from lxml import etree
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from custom_components.meteofrance_montagne.api import MeteoFranceMontagneApi  # noqa: E402
+from custom_components.meteofrance_montagne.const import AVALANCHE_RISK_COLORS  # noqa: E402
+from custom_components.meteofrance_montagne.render import (  # noqa: E402
+    NORD_COLOR,
+    SAFE_COLOR,
+    SUD_COLOR,
+    render_image,
+    render_placeholder,
+)
+
+spec = importlib.util.spec_from_file_location(
+    'bulletin_generator', os.path.join(os.path.dirname(__file__), 'bulletin_generator.py'))
+bulletin_generator = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bulletin_generator)
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'sample_bulletin.xml')
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+def sample(sections=None):
+    """Parse the sample bulletin."""
+    root = etree.parse(SAMPLE_PATH).getroot()
+    return MeteoFranceMontagneApi.parse_bulletin_xml(root, sections=sections)
+
+
+def render(image_type, bulletin):
+    """Render an image and parse it back, which checks it is valid XML."""
+    return etree.fromstring(render_image(image_type, bulletin))
+
+
+def fills(svg, tag):
+    """Return the fill colors of the elements of a tag."""
+    return [element.get('fill') for element in svg.iter(f'{SVG}{tag}')]
+
+
+def texts(svg):
+    """Return the text of every text element."""
+    return [element.text for element in svg.iter(f'{SVG}text')]
+
+
+def bars(svg):
+    """Return the (fill, width) of the snow depth bars."""
+    return [
+        (element.get('fill'), float(element.get('width')))
+        for element in svg.iter(f'{SVG}rect')
+    ]
+
+
+def test_rose_pentes():
+    """Test that the dangerous aspects of the sample are filled."""
+    svg = render('rose_pentes', sample())
+    color = AVALANCHE_RISK_COLORS['3']
+    # E, SE, S, SW and W are dangerous, in the order of ASPECTS (N first)
+    assert fills(svg, 'path') == [SAFE_COLOR, SAFE_COLOR, color, color, color, color, color, SAFE_COLOR]
+    assert texts(svg) == ['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW']
+    print("✓ Slope rose")
+
+
+def test_enneigement():
+    """Test the snow depth bars of the sample, highest altitude first."""
+    svg = render('montagne_enneigement', sample())
+    assert bars(svg) == [
+        (NORD_COLOR, 100.0), (SUD_COLOR, 100.0),
+        (NORD_COLOR, 80.0), (SUD_COLOR, 80.0),
+        (NORD_COLOR, 50.0), (SUD_COLOR, 50.0),
+    ]
+    assert '2500 m' in texts(svg) and '50/50 cm' in texts(svg)
+    assert texts(svg)[-1] == 'Limite N : 600 m - Limite S : 600 m'
+    print("✓ Snow cover")
+
+
+def test_missing_sections():
+    """Test rendering bulletins without snow cover or slopes."""
+    # Custom parse without enneigement
+    svg = render('montagne_enneigement', sample(sections=['risque']))
+    assert bars(svg) == []
+    assert texts(svg)[-1] is None
+
+    # Custom parse keeping the risk: the slopes are kept
+    svg = render('rose_pentes', sample(sections=['risque', 'meteo']))
+    assert fills(svg, 'path').count(AVALANCHE_RISK_COLORS['3']) == 5
+
+    # Custom parse without risque
+    svg = render('rose_pentes', sample(sections=['enneigement']))
+    assert set(fills(svg, 'path')) == {SAFE_COLOR}
+
+    # Bulletin without CARTOUCHERISQUE, so without PENTE
+    xml = bulletin_generator.generate_bulletin(cartouche=False)
+    bulletin = MeteoFranceMontagneApi.parse_bulletin_xml(etree.fromstring(xml))
+    assert set(fills(render('rose_pentes', bulletin), 'path')) == {SAFE_COLOR}
+    print("✓ Missing sections")
+
+
+def test_escaping():
+    """Test that text fields are escaped."""
+    bulletin = sample()
+    bulletin['risque'] = dict(bulletin['risque'], altitude_limite='<2000 & "plus">')
+    bulletin['enneigement'] = dict(bulletin['enneigement'], limite_nord='1000 & <1200>')
+    assert '<2000 & "plus"> m' in texts(render('rose_pentes', bulletin))
+    assert texts(render('montagne_enneigement', bulletin))[-1] == (
+        'Limite N : 1000 & <1200> m - Limite S : 600 m')
+    print("✓ Escaping")
+
+
+def test_placeholder():
+    """Test that the placeholder is valid SVG."""
+    svg = etree.fromstring(render_placeholder())
+    assert svg.tag == f'{SVG}svg'
+    assert texts(svg) == ['Chargement…']
+    print("✓ Placeholder")
+
+
+if __name__ == '__main__':
+    test_rose_pentes()
+    test_enneigement()
+    test_missing_sections()
+    test_escaping()
+    test_placeholder()
+    print("✓ All tests passed!")
@@ -0,0 +1,162 @@
+"""Tests for the numeric risk, fresh snow and slope aspect sensors.
+
+The integration package imports Home Assistant, which must be installed.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+
+from lxml import etree
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass  # noqa: E402
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass  # noqa: E402
+from homeassistant.const import UnitOfLength  # noqa: E402
+
+from custom_components.meteofrance_montagne.api import MeteoFranceMontagneApi  # noqa: E402
+from custom_components.meteofrance_montagne.binary_sensor import (  # noqa: E402
+    MeteoFranceMontagnePenteSensor,
+)
+from custom_components.meteofrance_montagne.const import ASPECTS  # noqa: E402
+from custom_components.meteofrance_montagne.sensor import (  # noqa: E402
+    MeteoFranceMontagneNeigeFraicheCumulSensor,
+    MeteoFranceMontagneRisqueNiveauSensor,
+)
+
+spec = importlib.util.spec_from_file_location(
+    'bulletin_generator', os.path.join(os.path.dirname(__file__), 'bulletin_generator.py'))
+bulletin_generator = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bulletin_generator)
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'sample_bulletin.xml')
+ZONES = ('max', 'bas', 'haut', 'j2')
+
+
+def coordinator(bulletin):
+    """Return a coordinator holding the data of a parsed bulletin."""
+    data = None
+    if bulletin is not None:
+        data = {section: bulletin[section] for section in ('risque', 'neige_fraiche')}
+    return argparse.Namespace(massif_id=72, massif_name='Orlu', data=data, changed_paths=None)
+
+
+def sample():
+    """Parse the sample bulletin."""
+    return MeteoFranceMontagneApi.parse_bulletin_xml(etree.parse(SAMPLE_PATH).getroot())
+
+
+def generated(**kwargs):
+    """Generate and parse a bulletin."""
+    xml = bulletin_generator.generate_bulletin(**kwargs)
+    return MeteoFranceMontagneApi.parse_bulletin_xml(etree.fromstring(xml))
+
+
+def levels(bulletin):
+    """Return the numeric risk levels of every zone."""
+    return tuple(
+        MeteoFranceMontagneRisqueNiveauSensor(
+            coordinator(bulletin), f'risque_{zone}_niveau', 'Niveau', 'mdi:alert', zone
+        ).native_value
+        for zone in ZONES
+    )
+
+
+def test_risk_levels():
+    """Test the risk levels, below and above the altitude limit."""
+    # No altitude limit: the single risk applies to both zones
+    assert sample()['risque']['altitude_limite'] is None
+    assert levels(sample()) == (3, 3, 3, 3)
+
+    bulletin = generated()
+    assert bulletin['risque']['altitude_limite'] == 2000
+    assert levels(bulletin) == (5, 5, 4, 5)
+
+    # Fields left blank by the forecaster
+    bulletin['risque'] = dict(bulletin['risque'], risque_max='', risque_2={'valeur': ''})
+    bulletin['risque']['estimation_j2'] = dict(bulletin['risque']['estimation_j2'], risque_max='')
+    assert levels(bulletin) == (None, 5, None, None)
+
+    # Empty RISQUE2 attribute, so no altitude limit
+    bulletin = generated(empty_attributes=True)
+    assert bulletin['risque']['risque_2']['valeur'] == ''
+    assert levels(bulletin) == (5, 5, 5, 5)
+
+    assert levels(None) == (None,) * len(ZONES)
+    bulletin['risque'] = {}
+    assert levels(bulletin) == (None,) * len(ZONES)
+    print("✓ Risk levels")
+
+
+def test_risk_level_classes():
+    """Test that risk levels are plain numbers for long-term statistics."""
+    sensor = MeteoFranceMontagneRisqueNiveauSensor(
+        coordinator(sample()), 'risque_max_niveau', 'Niveau Risque', 'mdi:alert', 'max')
+    assert sensor.state_class == SensorStateClass.MEASUREMENT
+    assert sensor.device_class is None
+    assert sensor.native_unit_of_measurement is None
+    assert sensor.unique_id == '72_risque_max_niveau'
+    print("✓ Risk level classes")
+
+
+def test_fresh_snow_total():
+    """Test the fresh snow summed over the days of the bulletin."""
+    def sensor(bulletin):
+        return MeteoFranceMontagneNeigeFraicheCumulSensor(
+            coordinator(bulletin), 'neige_fraiche_cumul', 'Cumul', 'mdi:weather-snowy-heavy')
+
+    bulletin = sample()
+    mesures = bulletin['neige_fraiche']['mesures']
+    cumul = sensor(bulletin)
+    assert cumul.native_value == sum(mesure['max'] for mesure in mesures)
+    assert cumul.extra_state_attributes == {
+        'cumul_min_cm': sum(mesure['min'] for mesure in mesures)}
+
+    # Days without a measure are left out, None when never measured
+    bulletin = generated(empty_attributes=True)
+    cumul = sensor(bulletin)
+    assert cumul.native_value == 141
+    assert cumul.extra_state_attributes == {'cumul_min_cm': None}
+    bulletin['neige_fraiche'] = {'altitude_ss': None, 'mesures': []}
+    assert sensor(bulletin).native_value is None
+    assert sensor(None).native_value is None
+
+    assert cumul.device_class == SensorDeviceClass.DISTANCE
+    assert cumul.native_unit_of_measurement == UnitOfLength.CENTIMETERS
+    assert cumul.state_class == SensorStateClass.MEASUREMENT
+    print("✓ Fresh snow total")
+
+
+def test_slope_aspects():
+    """Test the SAFETY sensors of each slope aspect."""
+    def states(bulletin):
+        return {
+            aspect: MeteoFranceMontagnePenteSensor(coordinator(bulletin), aspect).is_on
+            for aspect in ASPECTS
+        }
+
+    # On means unsafe
+    assert states(sample()) == {
+        'N': False, 'NE': False, 'E': True, 'SE': True,
+        'S': True, 'SW': True, 'W': True, 'NW': False,
+    }
+    # Empty attributes are unknown, not safe
+    assert states(generated(empty_attributes=True)) == dict.fromkeys(ASPECTS)
+    # No slope rose, or no data
+    assert states(generated(cartouche=False)) == dict.fromkeys(ASPECTS)
+    assert states(None) == dict.fromkeys(ASPECTS)
+
+    sensor = MeteoFranceMontagnePenteSensor(coordinator(sample()), 'NE')
+    assert sensor.device_class == BinarySensorDeviceClass.SAFETY
+    assert sensor.unique_id == '72_pente_ne'
+    print("✓ Slope aspects")
+
+
+if __name__ == '__main__':
+    test_risk_levels()
+    test_risk_level_classes()
+    test_fresh_snow_total()
+    test_slope_aspects()
+    print("✓ All tests passed!")
@@ -0,0 +1,131 @@
+"""Tests for the HTTP session dedicated to the API.
+
+The integration package imports Home Assistant, which must be installed.
+"""
+import asyncio
+import inspect
+import os
+import sys
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE  # noqa: E402
+
+from custom_components.meteofrance_montagne.const import (  # noqa: E402
+    DOMAIN,
+    HTTP_LIMIT_PER_HOST,
+)
+from custom_components.meteofrance_montagne.session import async_get_session  # noqa: E402
+
+
+class StubBus:
+    """Event bus keeping the listeners, fired by the tests."""
+
+    def __init__(self):
+        self.listeners = {}
+
+    def async_listen_once(self, event_type, listener):
+        self.listeners.setdefault(event_type, []).append(listener)
+
+    async def async_fire(self, event_type):
+        for listener in self.listeners.pop(event_type, []):
+            result = listener(None)
+            if inspect.isawaitable(result):
+                await result
+
+
+class StubHass:
+    """Just enough of hass for the session."""
+
+    def __init__(self):
+        self.data = {}
+        self.bus = StubBus()
+
+
+async def serve():
+    """Return a started local server answering every request."""
+    async def handler(request):
+        return web.Response(text='ok')
+
+    app = web.Application()
+    app.router.add_get('/{path:.*}', handler)
+    server = TestServer(app, host='127.0.0.1')
+    await server.start_server()
+    return server
+
+
+def test_shared_session():
+    """Test that the session is created once, with its own connector."""
+    async def run():
+        hass = StubHass()
+        session = async_get_session(hass)
+        assert async_get_session(hass) is session
+        assert hass.data[DOMAIN]['session'] is session
+        assert session.connector.limit_per_host == HTTP_LIMIT_PER_HOST
+        await hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+
+    asyncio.run(run())
+    print("✓ Shared session")
+
+
+def test_closed_on_close():
+    """Test that the session and its connections are closed with Home Assistant."""
+    async def run():
+        server = await serve()
+        hass = StubHass()
+        session = async_get_session(hass)
+        connector = session.connector
+        try:
+            async with session.get(f'http://127.0.0.1:{server.port}/') as response:
+                await response.read()
+            assert len(connector._conns) == 1  # pylint: disable=protected-access
+            await hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+        finally:
+            await server.close()
+        assert session.closed
+        assert connector.closed
+        assert not connector._conns  # pylint: disable=protected-access
+
+    asyncio.run(run())
+    print("✓ Closed with Home Assistant")
+
+
+def test_trace_stats():
+    """Test the request and connection counters."""
+    async def run():
+        server = await serve()
+        hass = StubHass()
+        session = async_get_session(hass)
+        stats = hass.data[DOMAIN]['http_stats']
+        assert stats.as_dict()['connection_reuse_ratio'] is None
+        try:
+            for path in ('bulletin', 'image', 'image'):
+                async with session.get(f'http://127.0.0.1:{server.port}/{path}') as response:
+                    assert await response.text() == 'ok'
+        finally:
+            await hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+            await server.close()
+
+        # Keep-alive connections are reused, IP addresses are not resolved
+        assert stats.as_dict() == {
+            'requests': 3,
+            'connections_created': 1,
+            'connections_reused': 2,
+            'connection_reuse_ratio': 0.667,
+            'dns_cache_hits': 0,
+            'dns_cache_misses': 0,
+        }
+
+    asyncio.run(run())
+    print("✓ Trace statistics")
+
+
+if __name__ == '__main__':
+    test_shared_session()
+    test_closed_on_close()
+    test_trace_stats()
+    print("✓ All tests passed!")
@@ -0,0 +1,159 @@
+"""Tests for the batched writes of entity states.
+
+The integration package imports Home Assistant, which must be installed.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.meteofrance_montagne.entity import StateWriter  # noqa: E402
+
+DELAY = 0.2
+
+
+class FakeEntity:
+    """Entity recording its state writes."""
+
+    def __init__(self, writes, name):
+        self.writes = writes
+        self.name = name
+
+    def async_write_ha_state(self):
+        self.writes.append(self.name)
+
+
+async def dispatched():
+    """Let the writer decide on the entities queued so far."""
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+
+def run_with_hass(test):
+    """Run a test coroutine with a Home Assistant core and a short delay."""
+    async def run():
+        with tempfile.TemporaryDirectory() as directory:
+            hass = HomeAssistant(directory)
+            with patch('custom_components.meteofrance_montagne.entity.STATE_WRITE_DELAY', DELAY):
+                await test(hass)
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+def test_single_entity_written_now():
+    """Test that a lone entity is written as soon as its update is dispatched."""
+    async def test(hass):
+        writes = []
+        writer = StateWriter(hass)
+        writer.async_schedule(FakeEntity(writes, 'image'))
+        assert writes == []
+        await dispatched()
+        assert writes == ['image']
+        assert writer.as_dict() == {'written': 1, 'pending': 0}
+
+    run_with_hass(test)
+    print("✓ Single entity written now")
+
+
+def test_burst_batched():
+    """Test that the entities of a burst are written together after the delay."""
+    async def test(hass):
+        writes = []
+        writer = StateWriter(hass)
+        entities = [FakeEntity(writes, name) for name in ('risque', 'meteo', 'neige')]
+        for entity in entities + entities[:1]:
+            writer.async_schedule(entity)
+        await dispatched()
+        assert writes == []
+        assert writer.as_dict() == {'written': 0, 'pending': 3}
+
+        # Another massif refreshing meanwhile joins the same write
+        writer.async_schedule(FakeEntity(writes, 'other'))
+        await asyncio.sleep(DELAY * 1.5)
+        assert writes == ['risque', 'meteo', 'neige', 'other']
+
+        # A lone entity right after a write still waits for the burst to end
+        writer.async_schedule(FakeEntity(writes, 'late'))
+        await dispatched()
+        assert writes[-1] == 'other'
+        await asyncio.sleep(DELAY * 1.5)
+        assert writes[-1] == 'late'
+
+        # Once the burst is over, it is written at once again
+        await asyncio.sleep(DELAY * 1.5)
+        writer.async_schedule(FakeEntity(writes, 'quiet'))
+        await dispatched()
+        assert writes[-1] == 'quiet'
+        assert writer.as_dict() == {'written': 6, 'pending': 0}
+
+    run_with_hass(test)
+    print("✓ Bursts batched")
+
+
+def test_cancel_on_remove():
+    """Test that removed entities are not written."""
+    async def test(hass):
+        writes = []
+        writer = StateWriter(hass)
+        removed = FakeEntity(writes, 'removed')
+        writer.async_schedule(FakeEntity(writes, 'kept'))
+        writer.async_schedule(removed)
+        writer.async_cancel(removed)
+        await asyncio.sleep(DELAY * 1.5)
+        assert writes == ['kept']
+
+        # Removed before its update is dispatched
+        writer = StateWriter(hass)
+        writer.async_schedule(removed)
+        writer.async_cancel(removed)
+        await asyncio.sleep(DELAY * 1.5)
+        assert writes == ['kept']
+        assert writer.as_dict() == {'written': 0, 'pending': 0}
+
+    run_with_hass(test)
+    print("✓ Cancel on remove")
+
+
+def test_flush_on_stop():
+    """Test that queued states are written when Home Assistant stops."""
+    async def test(hass):
+        writes = []
+        writer = StateWriter(hass)
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, writer.async_flush)
+        for name in ('risque', 'meteo'):
+            writer.async_schedule(FakeEntity(writes, name))
+        await dispatched()
+        assert writes == []
+
+        hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+        await hass.async_block_till_done()
+        assert writes == ['risque', 'meteo']
+
+        # The delayed write was cancelled
+        await asyncio.sleep(DELAY * 1.5)
+        assert writes == ['risque', 'meteo']
+
+        # Flushing before the update is dispatched
+        writer.async_schedule(FakeEntity(writes, 'neige'))
+        writer.async_flush()
+        await dispatched()
+        assert writes == ['risque', 'meteo', 'neige']
+
+    run_with_hass(test)
+    print("✓ Flush on stop")
+
+
+if __name__ == '__main__':
+    test_single_entity_written_now()
+    test_burst_batched()
+    test_cancel_on_remove()
+    test_flush_on_stop()
+    print("✓ All tests passed!")
@@ -0,0 +1,106 @@
+"""Tests for the cassette transports."""
+import asyncio
+import importlib.util
+import os
+import tempfile
+
+# Load transport.py directly, the package itself needs Home Assistant
+TRANSPORT_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'custom_components', 'meteofrance_montagne', 'transport.py')
+spec = importlib.util.spec_from_file_location('transport', TRANSPORT_PATH)
+transport = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(transport)
+
+BULLETIN_URL = 'https://example.org/massif/BRA?id-massif=1&format=xml'
+IMAGE_URL = 'https://example.org/massif/image/rose-pentes?id-massif=1'
+
+
+class FakeTransport:
+    """Transport answering from a list of responses, in order."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.headers = []
+
+    async def request(self, method, url, headers, timeout):
+        self.headers.append(headers)
+        return self.responses.pop(0)
+
+
+class FakeClock:
+    """Clock moving by a quarter of a second at each reading."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 0.25
+        return self.now
+
+
+def test_record_and_replay():
+    """Test recording a session to a cassette file and replaying it."""
+    inner = FakeTransport([
+        transport.TransportResponse(200, {'Content-Type': 'application/xml'}, '<BULLETINS_NEIGE_AVALANCHE/>'.encode()),
+        transport.TransportResponse(429, {'Retry-After': '30'}, b''),
+        transport.TransportResponse(200, {'Content-Type': 'image/png'}, bytes(range(256))),
+    ])
+    recorder = transport.RecordingTransport(inner, clock=FakeClock())
+
+    async def record():
+        headers = {'apikey': 'secret'}
+        await recorder.request('GET', BULLETIN_URL, headers, None)
+        await recorder.request('GET', BULLETIN_URL, headers, None)
+        return await recorder.request('GET', IMAGE_URL, headers, None)
+
+    response = asyncio.run(record())
+    assert response.body == bytes(range(256))
+    assert response.header('content-type') == 'image/png'
+    assert [i['latency'] for i in recorder.cassette.interactions] == [0.25] * 3
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'session.json.gz')
+        recorder.cassette.save(path)
+        # The token is never written
+        with open(path, 'rb') as file:
+            assert b'secret' not in file.read()
+        cassette = transport.Cassette.load(path)
+
+    assert cassette.interactions == recorder.cassette.interactions
+    sleeps = []
+
+    async def sleep(delay):
+        sleeps.append(delay)
+
+    replay = transport.ReplayTransport(cassette, latency=True, sleep=sleep)
+
+    async def run():
+        first = await replay.request('GET', BULLETIN_URL, {}, None)
+        second = await replay.request('GET', BULLETIN_URL, {}, None)
+        # The last response repeats
+        third = await replay.request('GET', BULLETIN_URL, {}, None)
+        image = await replay.request('GET', IMAGE_URL, {}, None)
+        return first, second, third, image
+
+    first, second, third, image = asyncio.run(run())
+    assert first.status == 200
+    assert first.body == '<BULLETINS_NEIGE_AVALANCHE/>'.encode()
+    assert second.status == 429
+    assert second.header('retry-after') == '30'
+    assert third.status == 429
+    assert image.body == bytes(range(256))
+    assert sleeps == [0.25] * 4
+    assert replay.requests == 4
+
+    try:
+        asyncio.run(replay.request('HEAD', BULLETIN_URL, {}, None))
+    except transport.CassetteMissError:
+        pass
+    else:
+        raise AssertionError('unrecorded request replayed')
+    print("✓ Record and replay")
+
+
+if __name__ == '__main__':
+    test_record_and_replay()
+    print("✓ All tests passed!")
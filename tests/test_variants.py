@@ -0,0 +1,71 @@
+"""Tests for the image variants.
+
+The integration package imports Home Assistant, which must be installed.
+"""
+import io
+import os
+from pathlib import Path
+import sys
+import tempfile
+
+from PIL import Image
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from custom_components.meteofrance_montagne.variants import (  # noqa: E402
+    content_hash,
+    transcode,
+    variant_content_type,
+)
+
+
+def png(width=800, height=600):
+    """Return a PNG image of the given size."""
+    output = io.BytesIO()
+    Image.new('RGB', (width, height), (40, 90, 160)).save(output, 'PNG')
+    return output.getvalue()
+
+
+def decode(content):
+    """Return the format and size of encoded image content."""
+    with Image.open(io.BytesIO(content)) as img:
+        return img.format, img.size
+
+
+def test_transcode():
+    """Test every variant of an image held in memory."""
+    content = png()
+    assert decode(transcode(content, 'original')) == ('PNG', (800, 600))
+    assert decode(transcode(content, 'webp')) == ('WEBP', (800, 600))
+    assert decode(transcode(content, 'thumbnail')) == ('PNG', (320, 240))
+    assert decode(transcode(content, 'thumbnail_webp', 100)) == ('WEBP', (100, 75))
+    # Images smaller than the thumbnail are not enlarged
+    assert decode(transcode(png(200, 100), 'thumbnail')) == ('PNG', (200, 100))
+    print("✓ Transcode")
+
+
+def test_transcode_spilled():
+    """Test transcoding content spilled to disk, given as its path."""
+    content = png()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / content_hash(content)
+        path.write_bytes(content)
+        assert transcode(path, 'thumbnail_webp') == transcode(content, 'thumbnail_webp')
+    print("✓ Transcode spilled content")
+
+
+def test_content_types():
+    """Test the content type served for each variant."""
+    assert variant_content_type('original') == 'image/png'
+    assert variant_content_type('thumbnail') == 'image/png'
+    assert variant_content_type('webp') == 'image/webp'
+    assert variant_content_type('thumbnail_webp') == 'image/webp'
+    print("✓ Content types")
+
+
+if __name__ == '__main__':
+    test_transcode()
+    test_transcode_spilled()
+    test_content_types()
+    print("✓ All tests passed!")
@@ -0,0 +1,58 @@
+"""Tests for the image view headers.
+
+The integration package imports Home Assistant, which must be installed.
+"""
+from datetime import datetime, timedelta, timezone
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from custom_components.meteofrance_montagne.views import (  # noqa: E402
+    MAX_MAX_AGE,
+    cache_control,
+    etag_matches,
+)
+
+# 2025-11-22T18:00:00 in Paris, during winter time
+VALIDITE = '2025-11-22T18:00:00'
+VALIDITE_UTC = datetime(2025, 11, 22, 17, tzinfo=timezone.utc)
+
+
+def test_cache_control():
+    """Test Cache-Control values around the bulletin validity."""
+    assert cache_control(VALIDITE, VALIDITE_UTC - timedelta(minutes=30)) == 'private, max-age=1800'
+    # Capped for bulletins valid for a long time
+    assert cache_control(VALIDITE, VALIDITE_UTC - timedelta(days=2)) == f'private, max-age={MAX_MAX_AGE}'
+    # Expired or about to expire
+    assert cache_control(VALIDITE, VALIDITE_UTC - timedelta(seconds=30)) == 'private, no-cache'
+    assert cache_control(VALIDITE, VALIDITE_UTC + timedelta(hours=1)) == 'private, no-cache'
+    # Explicit offsets are kept
+    assert cache_control('2025-11-22T18:00:00+00:00', VALIDITE_UTC) == 'private, max-age=3600'
+    assert cache_control(None) == 'private, no-cache'
+    assert cache_control('') == 'private, no-cache'
+    print("✓ Cache-Control")
+
+
+def test_etag_matches():
+    """Test If-None-Match comparisons."""
+    etag = '"abc-thumbnail"'
+    assert etag_matches('"abc-thumbnail"', etag)
+    assert etag_matches('"other", "abc-thumbnail"', etag)
+    assert etag_matches('*', etag)
+    # Weak comparison
+    assert etag_matches('W/"abc-thumbnail"', etag)
+    assert etag_matches('"other",W/"abc-thumbnail"', etag)
+    assert etag_matches('"abc-thumbnail"', 'W/"abc-thumbnail"')
+    assert not etag_matches('"abc-webp"', etag)
+    assert not etag_matches('W/"abc-webp"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('', etag)
+    print("✓ ETag matching")
+
+
+if __name__ == '__main__':
+    test_cache_control()
+    test_etag_matches()
+    print("✓ All tests passed!")